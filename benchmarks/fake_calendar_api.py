@@ -0,0 +1,446 @@
+"""Local stand-in for the Google Calendar v3 API used by benchmarks and tests.
+
+Implements the subset of ``events`` endpoints the extension calls (list with
+paging and sync tokens, get, insert, import, update, patch, delete, and batch
+requests of those) against an in-memory store, so performance work can be
+measured without a Google account.
+"""
+
+import email.parser
+import json
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+EVENTS_PREFIX = '/calendar/v3/calendars/'
+BATCH_PATH = '/batch/calendar/v3'
+
+_TITLES = [
+    'Standup', 'Design review', 'Lunch with Sam', '1:1 with Dana', 'Sprint planning',
+    'Customer call', 'Dentist', 'Team retro', 'Budget sync', 'Interview loop',
+]
+_LOCATIONS = ['', '', 'Room 4B', 'Cafe Roma', 'https://meet.example.com/abc', 'HQ Atrium']
+_PEOPLE = ['dana@example.com', 'sam@example.com', 'alex@example.com', 'kim@example.com']
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse an RFC 3339 timestamp or a bare date into an aware datetime."""
+    if len(value) == 10:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _event_bounds(event: dict):
+    """Return the (start, end) datetimes of an event resource."""
+    start = event.get('start', {})
+    end = event.get('end', start)
+    start_dt = _parse_time(start.get('dateTime') or start.get('date'))
+    end_dt = _parse_time(end.get('dateTime') or end.get('date'))
+    return start_dt, end_dt
+
+
+def synthetic_events(count: int, seed: int = 0, start: Optional[datetime] = None,
+                     days: int = 365) -> List[dict]:
+    """Generate ``count`` plausible event resources spread over ``days`` days."""
+    rng = random.Random(seed)
+    start = start or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    events = []
+    for i in range(count):
+        title = f"{rng.choice(_TITLES)} #{i}"
+        offset = timedelta(minutes=rng.randrange(days * 24 * 4) * 15)
+        begin = start + offset
+        event = {'id': f"syn{i:07d}", 'summary': title}
+        if rng.random() < 0.1:
+            event['start'] = {'date': begin.date().isoformat()}
+            event['end'] = {'date': (begin.date() + timedelta(days=1)).isoformat()}
+        else:
+            length = timedelta(minutes=rng.choice([15, 30, 45, 60, 90, 120]))
+            event['start'] = {'dateTime': begin.isoformat(), 'timeZone': 'UTC'}
+            event['end'] = {'dateTime': (begin + length).isoformat(), 'timeZone': 'UTC'}
+        location = rng.choice(_LOCATIONS)
+        if location:
+            event['location'] = location
+        if rng.random() < 0.5:
+            event['description'] = 'Agenda: ' + ' '.join(rng.choice(_TITLES) for _ in range(rng.randrange(1, 40)))
+        if rng.random() < 0.6:
+            event['attendees'] = [{'email': email} for email in rng.sample(_PEOPLE, rng.randrange(1, 4))]
+            event['organizer'] = {'email': rng.choice(_PEOPLE)}
+        events.append(event)
+    return events
+
+
+class FakeCalendarStore:
+    """Thread-safe in-memory calendars with a change sequence for sync tokens."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calendars: Dict[str, Dict[str, dict]] = {}
+        self._sequence = 0
+        self._by_ical_uid: Dict[tuple, str] = {}
+        self.requests = 0
+        self.batches = 0
+
+    def seed(self, events: List[dict], calendar_id: str = 'primary') -> None:
+        """Insert ``events`` into ``calendar_id`` without counting as requests."""
+        with self._lock:
+            calendar = self._calendars.setdefault(calendar_id, {})
+            for event in events:
+                stored = self._stamp(dict(event))
+                calendar[stored['id']] = stored
+
+    def _stamp(self, event: dict) -> dict:
+        self._sequence += 1
+        event.setdefault('id', uuid.uuid4().hex)
+        event.setdefault('status', 'confirmed')
+        event['etag'] = f'"{self._sequence}"'
+        event['updated'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        event.setdefault('created', event['updated'])
+        event['_seq'] = self._sequence
+        event['_bounds'] = _event_bounds(event)
+        return event
+
+    @staticmethod
+    def _public(event: dict) -> dict:
+        return {key: value for key, value in event.items() if not key.startswith('_')}
+
+    def list(self, calendar_id: str, params: Dict[str, str]):
+        """Return ``(status, body)`` for an events.list call."""
+        with self._lock:
+            calendar = self._calendars.setdefault(calendar_id, {})
+            sync_token = params.get('syncToken')
+            if sync_token:
+                try:
+                    since = int(sync_token.split(':', 1)[1])
+                except (IndexError, ValueError):
+                    return 410, _error(410, 'Sync token is no longer valid, a full sync is required.')
+                items = [e for e in calendar.values() if e['_seq'] > since]
+                include_deleted = True
+            else:
+                items = list(calendar.values())
+                include_deleted = params.get('showDeleted') == 'true'
+                if 'timeMin' in params:
+                    time_min = _parse_time(params['timeMin'])
+                    items = [e for e in items if e['_bounds'][1] > time_min]
+                if 'timeMax' in params:
+                    time_max = _parse_time(params['timeMax'])
+                    items = [e for e in items if e['_bounds'][0] < time_max]
+                if 'updatedMin' in params:
+                    updated_min = _parse_time(params['updatedMin'])
+                    items = [e for e in items if _parse_time(e['updated']) >= updated_min]
+                if 'q' in params:
+                    terms = params['q'].lower().split()
+                    items = [e for e in items if all(t in _searchable(e) for t in terms)]
+                if 'iCalUID' in params:
+                    items = [e for e in items if e.get('iCalUID') == params['iCalUID']]
+            if not include_deleted:
+                items = [e for e in items if e['status'] != 'cancelled']
+            if params.get('orderBy') == 'startTime':
+                items.sort(key=lambda e: e['_bounds'][0])
+            else:
+                items.sort(key=lambda e: e['_seq'])
+            sequence = self._sequence
+
+        offset = int(params.get('pageToken') or 0)
+        page_size = min(int(params.get('maxResults') or 250), 2500)
+        page = items[offset:offset + page_size]
+        body = {
+            'kind': 'calendar#events',
+            'etag': f'"{sequence}"',
+            'summary': calendar_id,
+            'items': [self._public(e) for e in page],
+        }
+        if offset + page_size < len(items):
+            body['nextPageToken'] = str(offset + page_size)
+        else:
+            body['nextSyncToken'] = f"seq:{sequence}"
+        return 200, body
+
+    def get(self, calendar_id: str, event_id: str):
+        with self._lock:
+            event = self._calendars.get(calendar_id, {}).get(event_id)
+            if event is None:
+                return 404, _error(404, 'Not Found')
+            return 200, self._public(event)
+
+    def insert(self, calendar_id: str, body: dict):
+        with self._lock:
+            calendar = self._calendars.setdefault(calendar_id, {})
+            if body.get('id') in calendar:
+                return 409, _error(409, 'The requested identifier already exists.')
+            event = self._stamp(dict(body))
+            calendar[event['id']] = event
+            return 200, self._public(event)
+
+    def import_event(self, calendar_id: str, body: dict):
+        """``events.import``: insert, or update the event with the same iCalUID."""
+        if not body.get('iCalUID'):
+            return 400, _error(400, 'Missing iCalUID.')
+        with self._lock:
+            calendar = self._calendars.setdefault(calendar_id, {})
+            key = (calendar_id, body['iCalUID'])
+            event = dict(body)
+            event.pop('id', None)
+            if key in self._by_ical_uid:
+                event['id'] = self._by_ical_uid[key]
+            event = self._stamp(event)
+            calendar[event['id']] = event
+            self._by_ical_uid[key] = event['id']
+            return 200, self._public(event)
+
+    def update(self, calendar_id: str, event_id: str, body: dict, if_match: Optional[str],
+               merge: bool):
+        with self._lock:
+            calendar = self._calendars.setdefault(calendar_id, {})
+            current = calendar.get(event_id)
+            if current is None or current['status'] == 'cancelled':
+                return 404, _error(404, 'Not Found')
+            if if_match and if_match != current['etag']:
+                return 412, _error(412, 'Precondition Failed')
+            if merge:
+                event = dict(current)
+                event.update(body)
+            else:
+                event = dict(body)
+            event['id'] = event_id
+            for key in ('etag', '_seq', '_bounds', 'status'):
+                event.pop(key, None)
+            event = self._stamp(event)
+            calendar[event_id] = event
+            return 200, self._public(event)
+
+    def delete(self, calendar_id: str, event_id: str, if_match: Optional[str]):
+        with self._lock:
+            calendar = self._calendars.setdefault(calendar_id, {})
+            current = calendar.get(event_id)
+            if current is None or current['status'] == 'cancelled':
+                return 410, _error(410, 'Resource has been deleted')
+            if if_match and if_match != current['etag']:
+                return 412, _error(412, 'Precondition Failed')
+            tombstone = {'id': event_id, 'status': 'cancelled',
+                         'start': current['start'], 'end': current['end']}
+            calendar[event_id] = self._stamp(tombstone)
+            return 204, None
+
+
+def _searchable(event: dict) -> str:
+    people = ' '.join(a.get('email', '') for a in event.get('attendees', []))
+    return ' '.join([
+        event.get('summary', ''), event.get('description', ''),
+        event.get('location', ''), people,
+    ]).lower()
+
+
+def _error(code: int, message: str) -> dict:
+    return {'error': {'code': code, 'message': message, 'errors': [{'message': message}]}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    store: FakeCalendarStore = None
+    latency: float = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _route(self, path: str):
+        url = urlparse(path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if not url.path.startswith(EVENTS_PREFIX):
+            return None, None, params
+        parts = url.path[len(EVENTS_PREFIX):].split('/')
+        if len(parts) < 2 or parts[1] != 'events':
+            return None, None, params
+        calendar_id = unquote(parts[0])
+        event_id = unquote(parts[2]) if len(parts) > 2 and parts[2] else None
+        return calendar_id, event_id, params
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status: int, body: Optional[dict]):
+        if (status == 200 and body is not None and self.command == 'GET'
+                and self.headers.get('If-None-Match') == body.get('etag')):
+            # Conditional GET of an unchanged resource, like Google's 304s
+            self.send_response(304)
+            self.send_header('ETag', body['etag'])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        if self.command == 'GET':
+            self.send_header('Cache-Control', 'private, max-age=0, must-revalidate, no-transform')
+        if body is not None:
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            if 'etag' in body:
+                self.send_header('ETag', body['etag'])
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str, path: str, headers, raw_body: bytes):
+        """Return ``(status, body)`` for one API call."""
+        calendar_id, event_id, params = self._route(path)
+        if calendar_id is None:
+            return 404, _error(404, 'Not Found')
+        body = json.loads(raw_body) if raw_body else {}
+        if_match = headers.get('If-Match')
+        if method == 'GET' and event_id is None:
+            return self.store.list(calendar_id, params)
+        if method == 'GET':
+            return self.store.get(calendar_id, event_id)
+        if method == 'POST' and event_id is None:
+            return self.store.insert(calendar_id, body)
+        if method == 'POST' and event_id == 'import':
+            return self.store.import_event(calendar_id, body)
+        if method in ('PUT', 'PATCH') and event_id:
+            return self.store.update(
+                calendar_id, event_id, body, if_match, merge=method == 'PATCH')
+        if method == 'DELETE' and event_id:
+            return self.store.delete(calendar_id, event_id, if_match)
+        return 405, _error(405, 'Method Not Allowed')
+
+    def _batch(self):
+        """Answer a ``multipart/mixed`` batch request part by part."""
+        self.store.batches += 1
+        content_type = self.headers.get('Content-Type', '')
+        message = email.parser.BytesParser().parsebytes(
+            b'Content-Type: ' + content_type.encode('ascii') + b'\r\n\r\n' + self._read_body())
+        boundary = uuid.uuid4().hex
+        chunks = []
+        for part in message.get_payload():
+            inner = part.get_payload(decode=True) or part.get_payload().encode('utf-8')
+            head, _, raw_body = inner.replace(b'\r\n', b'\n').partition(b'\n\n')
+            request_line, *header_lines = head.decode('utf-8').split('\n')
+            method, path = request_line.split(' ')[:2]
+            headers = dict(line.split(': ', 1) for line in header_lines if ': ' in line)
+            status, body = self._handle(method, path, headers, raw_body.strip())
+            payload = '' if body is None else json.dumps(body)
+            content_id = part.get('Content-ID', '<0>').strip('<>')
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(payload.encode('utf-8'))}\r\n\r\n{payload}\r\n"
+            )
+        chunks.append(f"--{boundary}--\r\n")
+        response = ''.join(chunks).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/mixed; boundary={boundary}')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def _dispatch(self, method: str):
+        self.store.requests += 1
+        if self.latency:
+            threading.Event().wait(self.latency)
+        if method == 'POST' and urlparse(self.path).path == BATCH_PATH:
+            return self._batch()
+        return self._send(*self._handle(method, self.path, self.headers, self._read_body()))
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+class FakeCalendarServer:
+    """Run a :class:`FakeCalendarStore` behind a local HTTP server.
+
+    Usable as a context manager::
+
+        with FakeCalendarServer(events=synthetic_events(1000)) as server:
+            service = server.service()
+    """
+
+    def __init__(self, events: Optional[List[dict]] = None, host: str = '127.0.0.1',
+                 port: int = 0, latency: float = 0.0):
+        self.store = FakeCalendarStore()
+        if events:
+            self.store.seed(events)
+        handler = type('Handler', (_Handler,), {'store': self.store, 'latency': latency})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> 'FakeCalendarServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeCalendarServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def service(self):
+        """Build a Calendar API client bound to this server."""
+        return build_service(self.url)
+
+
+def build_service(root_url: str):
+    """Build a Calendar v3 client whose requests go to ``root_url``."""
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+
+    document = json.loads(get_static_doc('calendar', 'v3'))
+    document['rootUrl'] = root_url
+    return build_from_document(document, http=httplib2.Http())
+
+
+def main():
+    """Serve a seeded fake Calendar API until interrupted."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Artificial per-request latency in seconds")
+    args = parser.parse_args()
+
+    server = FakeCalendarServer(synthetic_events(args.events), port=args.port,
+                                latency=args.latency)
+    print(f"Fake Calendar API with {args.events} events at {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+"""Concurrent load generator for the calendar MCP server.
+
+With ``--transport stdio`` one ``python -m goose_calendar`` process is spawned
+per simulated Goose session; with ``--transport streamable-http`` a single
+server process serves every session. Either way the server talks to the local
+fake Calendar API and receives a configurable mix of tool calls with bounded
+concurrency, and latency percentiles and error rates are reported.
+
+Examples::
+
+    python -m benchmarks.load_harness --sessions 4 --concurrency 8 --requests 400
+    python -m benchmarks.load_harness --mix list_events=80,add_event=20 --api-latency 0.05
+    python -m benchmarks.load_harness --transport streamable-http --sessions 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+
+DEFAULT_MIX = 'list_events=70,add_event=10,edit_event=10,delete_event=10'
+TRANSPORTS = ('stdio', 'streamable-http')
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse ``tool=weight,...`` into a weight mapping."""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+class LoadStats:
+    """Latency samples and error counts per tool."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, tool: str, seconds: float, ok: bool) -> None:
+        self.latencies[tool].append(seconds)
+        if not ok:
+            self.errors[tool] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        report = {}
+        everything = []
+        for tool, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            everything.extend(samples)
+            report[tool] = self._summarize(samples, self.errors[tool])
+        everything.sort()
+        report['ALL'] = self._summarize(everything, sum(self.errors.values()))
+        report['ALL']['throughput_rps'] = len(everything) / elapsed if elapsed else 0.0
+        return report
+
+    @staticmethod
+    def _summarize(samples: List[float], errors: int) -> dict:
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': errors / len(samples) if samples else 0.0,
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'p99_ms': percentile(samples, 99) * 1000,
+        }
+
+
+# Replies of edit_event and delete_event whose event was not found; counted as
+# errors, since the harness only targets events it created
+NOT_FOUND = "No events found"
+
+
+def _succeeded(result) -> bool:
+    if result.isError:
+        return False
+    text = ''.join(getattr(item, 'text', '') for item in result.content)
+    return not text.startswith(NOT_FOUND)
+
+
+class _Session:
+    """One simulated Goose session and the events it has created.
+
+    An event is only offered to edits and deletes once its insert has
+    succeeded, and is held by one call at a time, so concurrent calls never
+    target an event that does not exist (yet).
+    """
+
+    def __init__(self, client: ClientSession):
+        self.client = client
+        self.created: List[str] = []
+
+    def arguments(self, tool: str) -> Optional[dict]:
+        """Pick arguments for ``tool``; None when there is nothing to target."""
+        if tool == 'list_events':
+            return {'days_ahead': random.choice([1, 7, 7, 7, 30]), 'max_results': 10}
+        if tool == 'add_event':
+            # Within the year edit_event and delete_event search
+            start = date.today() + timedelta(days=random.randint(2, 14))
+            return {'title': f"load-{uuid.uuid4().hex}", 'start_time': f"{start} 10:00"}
+        if not self.created:
+            return None
+        title = self.created.pop(random.randrange(len(self.created)))
+        if tool == 'edit_event':
+            return {'event_query': title, 'new_location': 'Room 9'}
+        if tool == 'delete_event':
+            return {'event_query': title}
+        self.created.append(title)
+        return {}
+
+    def finished(self, tool: str, arguments: dict, ok: bool) -> None:
+        """Make the event a call created or edited available to later calls."""
+        if tool == 'add_event' and ok:
+            self.created.append(arguments['title'])
+        elif tool == 'edit_event':
+            self.created.append(arguments['event_query'])
+
+
+async def _worker(session: _Session, tools: List[str], weights: List[int],
+                  remaining: List[int], stats: LoadStats) -> None:
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        tool = random.choices(tools, weights)[0]
+        arguments = session.arguments(tool)
+        if arguments is None:
+            tool, arguments = 'list_events', session.arguments('list_events')
+        started = time.perf_counter()
+        try:
+            ok = _succeeded(await session.client.call_tool(tool, arguments))
+        except Exception:
+            ok = False
+        stats.record(tool, time.perf_counter() - started, ok)
+        session.finished(tool, arguments, ok)
+
+
+async def _run_stdio_session(env: Dict[str, str], concurrency: int, requests: int,
+                             mix: Dict[str, int], stats: LoadStats) -> None:
+    params = StdioServerParameters(command=sys.executable, args=['-m', 'goose_calendar'], env=env)
+    with open(os.devnull, 'w') as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as client:
+                await client.initialize()
+                await _drive(_Session(client), concurrency, requests, mix, stats)
+
+
+async def _drive(session: _Session, concurrency: int, requests: int,
+                 mix: Dict[str, int], stats: LoadStats) -> None:
+    remaining = [requests]
+    tools, weights = list(mix), list(mix.values())
+    await asyncio.gather(*(
+        _worker(session, tools, weights, remaining, stats) for _ in range(concurrency)
+    ))
+
+
+async def _run_http_session(url: str, concurrency: int, requests: int,
+                            mix: Dict[str, int], stats: LoadStats) -> None:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as client:
+            await client.initialize()
+            await _drive(_Session(client), concurrency, requests, mix, stats)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"MCP server did not start listening on port {port}")
+
+
+async def run_load(api_root: str, transport: str, sessions: int, concurrency: int,
+                   requests: int, mix: Dict[str, int]) -> dict:
+    """Drive ``sessions`` sessions with ``concurrency`` in-flight calls each."""
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unsupported transport: {transport}")
+    env = dict(os.environ, GOOSE_CALENDAR_API_ROOT=api_root)
+    stats = LoadStats()
+    per_session = max(1, requests // sessions)
+
+    if transport == 'stdio':
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _run_stdio_session(env, concurrency, per_session, mix, stats) for _ in range(sessions)
+        ))
+        return stats.summary(time.perf_counter() - started)
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'goose_calendar', '--transport', transport, '--port', str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await _wait_for_port(port)
+        url = f"http://127.0.0.1:{port}/mcp"
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _run_http_session(url, concurrency, per_session, mix, stats) for _ in range(sessions)
+        ))
+        return stats.summary(time.perf_counter() - started)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def _print_report(report: dict) -> None:
+    print(f"{'tool':<16} {'requests':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for tool, row in report.items():
+        print(f"{tool:<16} {row['requests']:>8} {row['errors']:>7} {row['p50_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+    print(f"throughput: {report['ALL']['throughput_rps']:.1f} req/s, "
+          f"error rate: {report['ALL']['error_rate']:.2%}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the calendar MCP server.")
+    parser.add_argument('--transport', choices=TRANSPORTS, default='stdio')
+    parser.add_argument('--sessions', type=int, default=1, help="Concurrent MCP sessions")
+    parser.add_argument('--concurrency', type=int, default=8, help="In-flight calls per session")
+    parser.add_argument('--requests', type=int, default=200, help="Total tool calls")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Tool mix as tool=weight,...")
+    parser.add_argument('--events', type=int, default=1000, help="Events seeded in the fake API")
+    parser.add_argument('--api-latency', type=float, default=0.0,
+                        help="Artificial fake API latency per request in seconds")
+    parser.add_argument('--json', dest='json_path', help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    with FakeCalendarServer(synthetic_events(args.events), latency=args.api_latency) as server:
+        report = asyncio.run(run_load(server.url, args.transport, args.sessions,
+                                      args.concurrency, args.requests, parse_mix(args.mix)))
+    _print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Latency/throughput benchmarks for every calendar tool against the fake API.
+
+Examples::
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 100 100000 --json results.json
+    python -m benchmarks.run_benchmarks --baseline results.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+class _BlockingTools:
+    """Call the MCP server's async tools synchronously on one event loop."""
+
+    def __init__(self, module):
+        self._module = module
+        self._loop = asyncio.new_event_loop()
+
+    def __getattr__(self, name):
+        tool = getattr(self._module, name)
+        return lambda **kwargs: self._loop.run_until_complete(tool(**kwargs))
+
+
+def _engine(service):
+    """A new engine using ``service``, so no cache carries over between calendars."""
+    from goose_calendar.engine import CalendarEngine
+
+    engine = CalendarEngine()
+    engine._service = service
+    # Per-thread connections, as with GOOSE_CALENDAR_API_ROOT: the batches of
+    # an import run on several threads and must not share one httplib2 client.
+    engine._offline = True
+    return engine
+
+
+def _mcp_frontend(service):
+    """Return the MCP server tools bound to a new engine using ``service``."""
+    from goose_calendar import mcp_server
+
+    engine = _engine(service)
+    mcp_server.calendar_manager = mcp_server.engines.default_engine = engine
+    return _BlockingTools(mcp_server)
+
+
+def _toolkit_frontend(service):
+    """Return a CalendarToolkit bound to a new engine using ``service``, or
+    None without goose."""
+    try:
+        from goose_calendar.toolkit import CalendarToolkit
+    except ImportError:
+        return None
+    return CalendarToolkit(engine=_engine(service))
+
+
+FRONTENDS = {
+    'mcp_server': _mcp_frontend,
+    'toolkit': _toolkit_frontend,
+}
+
+
+def _cases(tools, directory: str) -> Dict[str, Callable[[], str]]:
+    """Build the benchmark cases for one front end.
+
+    Bulk tools run in variants that leave the calendar as it was:
+    shift_events as a dry run, find_duplicates without deleting, and
+    import_ics re-importing the same file, which updates rather than adds.
+    Files are written to ``directory``.
+
+    Write cases create their own uniquely titled events so edit/delete always
+    resolve to exactly one match regardless of the seeded data.
+    """
+    from goose_calendar import ics
+
+    created: List[str] = []
+    today = date.today()
+    tomorrow = (today + timedelta(days=1)).isoformat()
+    next_week = (today + timedelta(days=8)).isoformat()
+    # Within the year edit_event and delete_event search
+    new_event_start = f"{today + timedelta(days=30)} 10:00"
+    import_path = os.path.join(directory, 'import.ics')
+    with open(import_path, 'w', encoding='utf-8', newline='') as f:
+        ics.write_calendar(synthetic_events(100, seed=1, days=30), f)
+
+    def add():
+        title = f"Bench {uuid.uuid4().hex}"
+        created.append(title)
+        return tools.add_event(title=title, start_time=new_event_start)
+
+    def edit():
+        return tools.edit_event(event_query=created[-1], new_location='Room 9')
+
+    def delete():
+        return tools.delete_event(event_query=created.pop())
+
+    cases = {
+        'list_events(7d, 10)': lambda: tools.list_events(days_ahead=7, max_results=10),
+        'list_events(365d, 2500)': lambda: tools.list_events(days_ahead=365, max_results=2500),
+        'find_events_with(14d)': lambda: tools.find_events_with(person='dana@example.com'),
+        'shift_events(7d, dry run)': lambda: tools.shift_events(
+            range_start=tomorrow, range_end=next_week, days=1, dry_run=True),
+        'find_duplicates(30d)': lambda: tools.find_duplicates(days_back=0, days_ahead=30),
+        'export_ics(30d)': lambda: tools.export_ics(path=os.path.join(directory, 'export.ics'),
+                                                    days_back=0, days_ahead=30),
+    }
+    if importlib.util.find_spec('numpy') is not None:
+        cases['calendar_analytics(90d)'] = lambda: tools.calendar_analytics(days_back=0, days_ahead=90)
+    cases.update({
+        'import_ics(100)': lambda: tools.import_ics(path=import_path),
+        'add_event': add,
+        'edit_event': edit,
+        'delete_event': delete,
+    })
+    return cases
+
+
+def _measure(fn: Callable[[], str], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': samples[len(samples) // 2] * 1000,
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        'ops_per_s': iterations / sum(samples) if sum(samples) else float('inf'),
+    }
+
+
+def run(sizes: List[int], iterations: int, frontends: List[str]) -> dict:
+    """Run every case for every calendar size and front end."""
+    results: dict = {}
+    for size in sizes:
+        with FakeCalendarServer(synthetic_events(size)) as server, \
+                tempfile.TemporaryDirectory() as directory:
+            for name in frontends:
+                tools = FRONTENDS[name](server.service())
+                if tools is None:
+                    print(f"  skipping {name}: dependencies not installed", file=sys.stderr)
+                    continue
+                cases = _cases(tools, directory)
+                by_case = results.setdefault(name, {}).setdefault(str(size), {})
+                # Insertion order matters: add_event creates the events that
+                # edit_event and delete_event then target.
+                for case, fn in cases.items():
+                    by_case[case] = _measure(fn, iterations)
+    return results
+
+
+def _print_table(results: dict) -> None:
+    print(f"{'frontend':<12} {'events':>7}  {'case':<28} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>9}")
+    for frontend, by_size in results.items():
+        for size, cases in by_size.items():
+            for case, stats in cases.items():
+                print(f"{frontend:<12} {size:>7}  {case:<28} {stats['p50_ms']:>9.2f} "
+                      f"{stats['p95_ms']:>9.2f} {stats['ops_per_s']:>9.1f}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return a description of every case whose p50 regressed past ``tolerance``."""
+    regressions = []
+    for frontend, by_size in results.items():
+        for size, cases in by_size.items():
+            for case, stats in cases.items():
+                before = baseline.get(frontend, {}).get(size, {}).get(case)
+                if before and stats['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+                    regressions.append(
+                        f"{frontend} {size} {case}: {before['p50_ms']:.2f}ms -> {stats['p50_ms']:.2f}ms"
+                    )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark calendar tools against a local fake API.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Number of seeded events per run")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--frontend', choices=sorted(FRONTENDS), action='append',
+                        help="Front end(s) to benchmark (default: all)")
+    parser.add_argument('--json', dest='json_path', help="Write results to this file")
+    parser.add_argument('--baseline', help="Fail if p50 regresses against this results file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed fractional p50 slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.iterations, args.frontend or sorted(FRONTENDS))
+    _print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -116,7 +116,7 @@ def main():
     print("\n5. Test by asking: 'What tools do you have?'")
     
     print_section("ALTERNATIVE COMMANDS (if the first doesn't work)")
-    print(f"Option A: {venv_python} {project_dir}/src/goose_calendar/mcp_server.py")
+    print(f"Option A: {venv_python} -m goose_calendar.mcp_server")
     print(f"Option B: cd {project_dir} && source venv/bin/activate && python -m goose_calendar")
     
     print_section("GOOGLE CALENDAR SETUP")
@@ -1,14 +1,58 @@
 """Google Calendar integration for Goose AI."""
 
+import argparse
+import os
+
+from .engine import CalendarEngine
+
+__all__ = ["CalendarEngine"]
+
 # Only import toolkit if goose dependencies are available
 try:
     from .toolkit import CalendarToolkit
-    __all__ = ["CalendarToolkit"]
+    __all__.append("CalendarToolkit")
 except ImportError:
     # MCP server mode - toolkit dependencies not available
-    __all__ = []
+    pass
+
+def main(argv=None):
+    """Main entry point for the MCP server and the ``doctor`` and ``login`` commands."""
+    parser = argparse.ArgumentParser(prog='goose-calendar', description="Google Calendar MCP server.")
+    parser.add_argument(
+        '--transport', choices=['stdio', 'streamable-http', 'sse'],
+        default=os.environ.get('GOOSE_CALENDAR_TRANSPORT', 'stdio'),
+        help="stdio serves one Goose session; the HTTP transports serve many clients from one process",
+    )
+    parser.add_argument('--host', default=os.environ.get('GOOSE_CALENDAR_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('GOOSE_CALENDAR_PORT', '8000')))
+    parser.add_argument(
+        '--warmup', action='store_true',
+        default=os.environ.get('GOOSE_CALENDAR_WARMUP', '').lower() in ('1', 'true', 'yes'),
+        help="load credentials, build the service and prefetch upcoming events at startup",
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    doctor = commands.add_parser(
+        'doctor', help="time each stage of a first tool call and compare with a saved baseline")
+    doctor.add_argument(
+        '--baseline', default=os.environ.get('GOOSE_CALENDAR_DOCTOR_BASELINE', '~/.goose_calendar_doctor.json'),
+        help="file holding the baseline times",
+    )
+    doctor.add_argument('--save-baseline', action='store_true', help="record this run as the baseline")
+    login = commands.add_parser('login', help="sign in to Google and store the account's token")
+    login.add_argument('--account', default='default', help="account name used by the server")
+    args = parser.parse_args(argv)
+
+    if args.command == 'login':
+        from .accounts import token_path
+        path = token_path(args.account, os.environ.get('GOOSE_CALENDAR_TOKEN_DIR', '~/.goose_calendar_tokens'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        CalendarEngine(token_file=path)._get_credentials()
+        print(f"Signed in; the token for account '{args.account}' is saved in {path}")
+        return
+
+    if args.command == 'doctor':
+        from . import doctor
+        raise SystemExit(doctor.main(args.baseline, save=args.save_baseline))
 
-def main():
-    """Main entry point for MCP server."""
-    from .mcp_server import mcp
-    mcp.run()
+    from .mcp_server import serve
+    serve(args.transport, args.host, args.port, warmup=args.warmup)
@@ -0,0 +1,181 @@
+"""Per-account calendar engines for servers shared by several users.
+
+Each account gets its own token file and its own :class:`CalendarEngine`
+(service, credentials and in-flight requests). Engines are kept in an LRU
+pool bounded by count, by estimated memory and by idle time; an evicted
+account is rebuilt from its token file on next use. The default account is
+pinned and never evicted.
+
+HTTP clients prove which account they act for with a bearer token listed
+in :class:`AccountTokens`. Pooled engines never start the interactive
+sign-in on the server; each account signs in once with
+``goose-calendar login --account NAME`` on the server host.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from . import metrics
+from .engine import CalendarEngine
+
+DEFAULT_ACCOUNT = 'default'
+
+
+def token_path(account: str, token_dir: str = '~/.goose_calendar_tokens') -> str:
+    """Return the token file for ``account``.
+
+    The default account keeps the single-user location so existing installs
+    are not asked to re-authenticate. Other account names are sanitized and
+    suffixed with a short hash so distinct names never share a file.
+    """
+    if account == DEFAULT_ACCOUNT:
+        return os.path.expanduser('~/.goose_calendar_token.pickle')
+    safe = re.sub(r'[^A-Za-z0-9._@-]', '_', account)[:64]
+    digest = hashlib.sha256(account.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(os.path.expanduser(token_dir), f"{safe}-{digest}.pickle")
+
+
+class AccountTokens:
+    """Bearer tokens accepted by a shared server, each naming the one account
+    its holder may act for.
+
+    Only SHA-256 digests of the tokens are kept. ``tokens`` maps token to
+    account, as in the JSON file named by ``GOOSE_CALENDAR_ACCOUNT_TOKENS``.
+    """
+
+    def __init__(self, tokens: Optional[Dict[str, str]] = None):
+        self._accounts = {self._digest(token): account for token, account in (tokens or {}).items()}
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_environment(cls) -> 'AccountTokens':
+        """Load the file named by ``GOOSE_CALENDAR_ACCOUNT_TOKENS``, if set."""
+        path = os.environ.get('GOOSE_CALENDAR_ACCOUNT_TOKENS')
+        if not path:
+            return cls()
+        with open(os.path.expanduser(path), encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __bool__(self) -> bool:
+        return bool(self._accounts)
+
+    def account(self, token: str) -> Optional[str]:
+        """The account ``token`` was issued for, or None if it is not known."""
+        return self._accounts.get(self._digest(token)) if token else None
+
+
+class EnginePool:
+    """LRU pool of :class:`CalendarEngine` instances keyed by account.
+
+    Args:
+        default_engine: Engine for the default account (created if omitted).
+        max_accounts: Most non-default engines kept at once.
+        max_memory_bytes: Evict least-recently-used engines while the summed
+            :meth:`CalendarEngine.memory_estimate` exceeds this.
+        idle_timeout: Seconds after which an unused engine is dropped.
+        token_dir: Directory holding per-account token files.
+        credentials_file: OAuth client file shared by all accounts.
+        engine_factory: Builds the engine for an account (for tests).
+    """
+
+    def __init__(self, default_engine: Optional[CalendarEngine] = None,
+                 max_accounts: int = 16, max_memory_bytes: int = 256 * 1024 * 1024,
+                 idle_timeout: float = 3600.0, token_dir: str = '~/.goose_calendar_tokens',
+                 credentials_file: str = '~/credentials.json',
+                 engine_factory: Optional[Callable[[str], CalendarEngine]] = None):
+        self.default_engine = default_engine or CalendarEngine(credentials_file=credentials_file)
+        self.max_accounts = max(1, max_accounts)
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_timeout = idle_timeout
+        self._token_dir = token_dir
+        self._credentials_file = credentials_file
+        self._factory = engine_factory or self._create_engine
+        self._engines: 'OrderedDict[str, CalendarEngine]' = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, default_engine: Optional[CalendarEngine] = None) -> 'EnginePool':
+        """Build a pool configured by ``GOOSE_CALENDAR_MAX_ACCOUNTS``,
+        ``GOOSE_CALENDAR_POOL_MEMORY_MB``, ``GOOSE_CALENDAR_ACCOUNT_IDLE_SECONDS``
+        and ``GOOSE_CALENDAR_TOKEN_DIR``."""
+        return cls(
+            default_engine=default_engine,
+            max_accounts=int(os.environ.get('GOOSE_CALENDAR_MAX_ACCOUNTS', '16')),
+            max_memory_bytes=int(os.environ.get('GOOSE_CALENDAR_POOL_MEMORY_MB', '256')) * 1024 * 1024,
+            idle_timeout=float(os.environ.get('GOOSE_CALENDAR_ACCOUNT_IDLE_SECONDS', '3600')),
+            token_dir=os.environ.get('GOOSE_CALENDAR_TOKEN_DIR', '~/.goose_calendar_tokens'),
+        )
+
+    def _create_engine(self, account: str) -> CalendarEngine:
+        path = token_path(account, self._token_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return CalendarEngine(credentials_file=self._credentials_file, token_file=path,
+                              interactive=False)
+
+    def get(self, account: Optional[str] = None) -> CalendarEngine:
+        """Return the engine for ``account``, creating it if needed."""
+        if not account or account == DEFAULT_ACCOUNT:
+            return self.default_engine
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            engine = self._engines.get(account)
+            if engine is None:
+                engine = self._factory(account)
+                self._engines[account] = engine
+            self._engines.move_to_end(account)
+            self._last_used[account] = now
+            self._evict_over_budget(keep=account)
+            return engine
+
+    def _drop(self, account: str, reason: str) -> None:
+        if self._engines.pop(account, None) is not None:
+            metrics.ACCOUNT_EVICTIONS.inc(reason=reason)
+        self._last_used.pop(account, None)
+
+    def _evict_idle(self, now: float) -> None:
+        for account, last_used in list(self._last_used.items()):
+            if now - last_used > self.idle_timeout:
+                self._drop(account, 'idle')
+
+    def _evict_over_budget(self, keep: str) -> None:
+        while self._engines:
+            oldest = next(iter(self._engines))
+            if oldest == keep:
+                break
+            if len(self._engines) > self.max_accounts:
+                self._drop(oldest, 'count')
+            elif self._memory_estimate() > self.max_memory_bytes:
+                self._drop(oldest, 'memory')
+            else:
+                break
+
+    def _memory_estimate(self) -> int:
+        engines = [self.default_engine, *self._engines.values()]
+        return sum(engine.memory_estimate() for engine in engines)
+
+    def evict(self, account: str) -> None:
+        """Forget ``account``'s engine, e.g. after its token was revoked."""
+        with self._lock:
+            self._drop(account, 'explicit')
+
+    def memory_estimate(self) -> int:
+        """Estimated bytes held by every pooled engine, default included."""
+        with self._lock:
+            return self._memory_estimate()
+
+    def accounts(self) -> List[str]:
+        """Non-default accounts currently pooled, least recently used first."""
+        with self._lock:
+            return list(self._engines)
@@ -0,0 +1,129 @@
+"""Pre-rendered agenda views for the most common ``list_events`` windows.
+
+Nearly all ``list_events`` calls ask for the next day, two days or week.
+For each such ``(days_ahead, max_results)`` pair an :class:`AgendaViews`
+keeps the rendered response together with the time until which it stays
+correct: the first listed event ending, or, when fewer events than the
+limit are listed, the next cached event coming into the window. Reads
+before that time are a dictionary lookup.
+
+The views subscribe to the event cache. A delta sync or local write marks
+stale only the views whose window the changed events overlap. Stale views
+are re-rendered together on a timer :data:`REFRESH_DELAY` after the first
+change, so a burst of writes (an import, a bulk shift) costs one render per
+view rather than one per write. A read before then renders its view itself.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import metrics, tracing
+from .cache import EventCache
+from .records import EventRecord
+
+# Views kept ready from the first load: the next day, two days and week at
+# the default ``max_results``.
+DEFAULT_VIEWS = ((1, 10), (2, 10), (7, 10))
+
+# Most views kept at once; the least recently read is dropped first.
+MAX_VIEWS = 8
+
+# Seconds from a cache change to re-rendering the views it made stale.
+REFRESH_DELAY = 0.1
+
+
+class _View(NamedTuple):
+    text: str
+    rendered_at: float
+    valid_until: float
+
+
+class AgendaViews:
+    """Rendered ``list_events`` responses over one :class:`EventCache`.
+
+    ``render(events, days_ahead)`` formats the listed events, as
+    ``list_events`` would.
+    """
+
+    def __init__(self, cache: EventCache, render: Callable[[List[EventRecord], int], str],
+                 keys: Iterable[Tuple[int, int]] = DEFAULT_VIEWS):
+        self._cache = cache
+        self._render = render
+        self._lock = threading.Lock()
+        self._views: 'OrderedDict[Tuple[int, int], Optional[_View]]' = OrderedDict(
+            (key, None) for key in keys)
+        # Bumped by every cache change so a render that raced one is not kept
+        self._generation = 0
+        self._timer: Optional[threading.Timer] = None
+        cache.subscribe(self._changed)
+
+    def get(self, days_ahead: int, max_results: int) -> str:
+        """The response for the next ``days_ahead`` days, rendered now if
+        no current view exists. The cache must cover the window."""
+        key = (days_ahead, max_results)
+        now = time.time()
+        with self._lock:
+            view = self._views.get(key)
+            if key in self._views:
+                self._views.move_to_end(key)
+        if view is not None and view.rendered_at <= now < view.valid_until:
+            metrics.CACHE_REQUESTS.inc(cache='agenda', result='hit')
+            return view.text
+        metrics.CACHE_REQUESTS.inc(cache='agenda', result='miss')
+        return self._build(key, now).text
+
+    def _build(self, key: Tuple[int, int], now: float) -> _View:
+        days_ahead, max_results = key
+        window = days_ahead * 86400
+        with self._lock:
+            generation = self._generation
+        events = self._cache.between(now, now + window, max_results)
+        with tracing.span('format', events=len(events), view=days_ahead):
+            text = self._render(events, days_ahead)
+        valid_until = min((event.end for event in events), default=float('inf'))
+        if len(events) < max_results:
+            valid_until = min(valid_until, self._cache.next_start(now + window) - window)
+        cache_window = self._cache.window
+        if cache_window is not None:
+            valid_until = min(valid_until, cache_window[1] - window)
+        view = _View(text, now, valid_until)
+        with self._lock:
+            if generation == self._generation:
+                self._views[key] = view
+                self._views.move_to_end(key)
+                while len(self._views) > MAX_VIEWS:
+                    self._views.popitem(last=False)
+        return view
+
+    def _changed(self, spans: Optional[List[Tuple[float, float]]]) -> None:
+        """Mark stale the views that events changed over ``spans`` (None: all
+        events) could appear in, and schedule their re-rendering."""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, view in self._views.items()
+                     if spans is None or view is None or any(
+                         start < view.valid_until + key[0] * 86400 and end > view.rendered_at
+                         for start, end in spans)]
+            for key in stale:
+                self._views[key] = None
+            if not stale or self._timer is not None:
+                return
+            self._timer = timer = threading.Timer(REFRESH_DELAY, self.refresh)
+            timer.daemon = True
+        timer.start()
+
+    def refresh(self) -> None:
+        """Re-render every stale view the cache covers now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            stale = [key for key, view in self._views.items() if view is None]
+        if self._cache.window is None:
+            return
+        now = time.time()
+        for key in stale:
+            if self._cache.covers(now, now + key[0] * 86400):
+                self._build(key, now)
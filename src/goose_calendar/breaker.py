@@ -0,0 +1,89 @@
+"""Circuit breaker around Google Calendar API calls.
+
+After ``failure_threshold`` consecutive failures (network errors, timeouts,
+429 and 5xx responses) the breaker opens and calls are refused without
+being sent, so a struggling API is not hammered and callers fail fast, or
+fall back to cached data, instead of waiting for timeouts. After
+``reset_timeout`` seconds one probe call is let through; its success closes
+the breaker again and its failure re-opens it.
+"""
+
+import threading
+import time
+
+from . import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker shared by one engine's API calls."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being refused (without claiming a probe)."""
+        with self._lock:
+            if self._state == OPEN:
+                return time.monotonic() - self._opened_at < self.reset_timeout
+            return self._state == HALF_OPEN and self._probing
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed."""
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now. In the half-open state only one
+        probe is allowed at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    metrics.BREAKER_REJECTIONS.inc()
+                    return False
+                self._transition(HALF_OPEN)
+            if self._probing:
+                metrics.BREAKER_REJECTIONS.inc()
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != OPEN:
+                    self._transition(OPEN)
+
+    def release(self) -> None:
+        """End a call that says nothing about the API's health (e.g. one
+        abandoned when its caller ran out of time)."""
+        with self._lock:
+            self._probing = False
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        metrics.BREAKER_TRANSITIONS.inc(state=state)
@@ -0,0 +1,247 @@
+"""In-memory cache of the near-term window of calendar events.
+
+The engine loads a window (e.g. the next 14 days) with one paginated
+``events.list`` and keeps it current with cheap ``updatedMin`` delta syncs and
+with the results of its own writes, so most ``list_events`` calls are served
+without a round trip. Events are held as compact :class:`EventRecord` objects.
+Subscribers (see :mod:`goose_calendar.agenda`) are told which spans of time
+each change touched. A cache can start from a memory-mapped
+:class:`~goose_calendar.snapshot.Snapshot`: reads decode only the events
+they return, and later changes are kept alongside it, so a restart followed
+by a delta sync never decodes the whole snapshot. A
+:class:`~goose_calendar.people.PeopleIndex` of the cached events is built on
+the first people lookup and then kept current with every change.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .people import PeopleIndex
+from .records import EventRecord
+from .snapshot import Snapshot
+
+# ``listener(spans)`` with the ``(start, end)`` of every changed event, old
+# and new, or None when the whole cache was replaced.
+ChangeListener = Callable[[Optional[List[Tuple[float, float]]]], None]
+
+
+def rfc3339(timestamp: float) -> str:
+    """Format epoch seconds the way the Calendar API expects."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+
+
+class EventCache:
+    """Events overlapping a time window, kept in sync with the calendar.
+
+    Args:
+        ttl: Seconds a load or sync stays fresh; after that the engine
+            re-syncs before serving. ``0`` disables the cache.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._events: Dict[str, EventRecord] = {}
+        # With a snapshot attached, _events holds only events added or changed
+        # since, and _superseded the snapshot's events changed or removed since
+        self._snapshot: Optional[Snapshot] = None
+        self._superseded: Set[str] = set()
+        self._people: Optional[PeopleIndex] = None
+        self.window: Optional[Tuple[float, float]] = None
+        self.synced_at: Optional[float] = None
+        self._listeners: List[ChangeListener] = []
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Call ``listener`` after every change, outside the cache's lock."""
+        self._listeners.append(listener)
+
+    def _notify(self, spans: Optional[List[Tuple[float, float]]]) -> None:
+        if spans is None or spans:
+            for listener in self._listeners:
+                listener(spans)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def covers(self, start: float, end: float) -> bool:
+        """Whether ``[start, end)`` lies inside the loaded window."""
+        window = self.window
+        return window is not None and window[0] <= start and end <= window[1]
+
+    def age(self) -> float:
+        """Seconds since the last load or sync."""
+        return time.time() - self.synced_at if self.synced_at is not None else float('inf')
+
+    def fresh(self) -> bool:
+        """Whether the last load or sync is younger than the TTL."""
+        return self.synced_at is not None and time.time() - self.synced_at < self.ttl
+
+    def attach(self, snapshot: Snapshot) -> None:
+        """Start from a saved snapshot instead of an empty cache."""
+        with self._lock:
+            self._events = {}
+            self._snapshot = snapshot
+            self._superseded = set()
+            self._people = None
+            self.window = snapshot.window
+            self.synced_at = snapshot.synced_at
+        self._notify(None)
+
+    def _decoded(self) -> Dict[str, EventRecord]:
+        """Every event by ID, decoding an attached snapshot first. Call with the lock held."""
+        if self._snapshot is not None:
+            events = {record.id: record for record in self._snapshot.records()
+                      if record.id not in self._superseded}
+            events.update(self._events)
+            self._events = events
+            self._snapshot = None
+            self._superseded = set()
+        return self._events
+
+    def load(self, start: float, end: float, events: List[Dict[str, Any]], synced_at: float) -> None:
+        """Replace the cache with a full listing of ``[start, end)``."""
+        entries = {}
+        for event in events:
+            if event.get('status') != 'cancelled':
+                entries[event['id']] = EventRecord.from_api(event)
+        with self._lock:
+            self._events = entries
+            self._snapshot = None
+            self._superseded = set()
+            self._people = None
+            self.window = (start, end)
+            self.synced_at = synced_at
+        self._notify(None)
+
+    def merge(self, events: List[Dict[str, Any]], synced_at: float) -> None:
+        """Apply a delta listing; cancelled events are removed."""
+        changed: List[Tuple[float, float]] = []
+        with self._lock:
+            for event in events:
+                self._apply(event, changed)
+            self.synced_at = synced_at
+        self._notify(changed)
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Record an event created or changed by this process."""
+        changed: List[Tuple[float, float]] = []
+        with self._lock:
+            if self.window is not None:
+                self._apply(event, changed)
+        self._notify(changed)
+
+    def put(self, record: EventRecord) -> None:
+        """Record an event changed locally but not yet confirmed by the API."""
+        changed: List[Tuple[float, float]] = []
+        with self._lock:
+            if self.window is not None:
+                self._put(record, changed)
+        self._notify(changed)
+
+    def _apply(self, event: Dict[str, Any], changed: List[Tuple[float, float]]) -> None:
+        if event.get('status') == 'cancelled':
+            self._pop(event['id'], changed)
+            return
+        self._put(EventRecord.from_api(event), changed)
+
+    def _put(self, record: EventRecord, changed: List[Tuple[float, float]]) -> None:
+        self._pop(record.id, changed)
+        if record.end > self.window[0] and record.start < self.window[1]:
+            self._events[record.id] = record
+            if self._people is not None:
+                self._people.add(record)
+            changed.append((record.start, record.end))
+
+    def _pop(self, event_id: str, changed: List[Tuple[float, float]]) -> None:
+        previous = self._events.pop(event_id, None)
+        if previous is None and self._snapshot is not None and event_id not in self._superseded:
+            previous = self._snapshot.get(event_id)
+            if previous is not None:
+                self._superseded.add(event_id)
+        if previous is not None:
+            if self._people is not None:
+                self._people.discard(previous)
+            changed.append((previous.start, previous.end))
+
+    def _lookup(self, event_id: str) -> Optional[EventRecord]:
+        record = self._events.get(event_id)
+        if record is None and self._snapshot is not None and event_id not in self._superseded:
+            record = self._snapshot.get(event_id)
+        return record
+
+    def remove(self, event_id: str) -> None:
+        """Forget an event deleted by this process."""
+        changed: List[Tuple[float, float]] = []
+        with self._lock:
+            self._pop(event_id, changed)
+        self._notify(changed)
+
+    def get(self, event_id: str) -> Optional[EventRecord]:
+        with self._lock:
+            return self._lookup(event_id)
+
+    def between(self, start: float, end: float, limit: Optional[int] = None) -> List[EventRecord]:
+        """Events overlapping ``[start, end)`` ordered by start time, like
+        ``events.list(orderBy='startTime')``."""
+        with self._lock:
+            records = [record for record in self._events.values()
+                       if record.end > start and record.start < end]
+            if self._snapshot is not None:
+                # Enough snapshot events to fill ``limit`` after dropping superseded ones
+                wanted = None if limit is None else limit + len(self._superseded)
+                records = [record for record in self._snapshot.between(start, end, wanted)
+                           if record.id not in self._superseded] + records
+        records.sort(key=attrgetter('start'))
+        return records[:limit]
+
+    def next_start(self, after: float) -> float:
+        """Start of the first cached event starting at or after ``after``
+        (infinity if there is none)."""
+        with self._lock:
+            first = min((record.start for record in self._events.values() if record.start >= after),
+                        default=float('inf'))
+            if self._snapshot is not None:
+                first = min(first, self._snapshot.next_start(after, self._superseded))
+            return first
+
+    def with_person(self, person: str, start: float, end: float,
+                    limit: Optional[int] = None) -> List[EventRecord]:
+        """Cached events overlapping ``[start, end)`` that ``person`` (an
+        email address or name) organizes or attends, ordered by start time."""
+        with self._lock:
+            if self._people is None:
+                self._people = PeopleIndex(self._decoded().values())
+            records = [self._events[event_id] for event_id in self._people.find(person)]
+        records = [record for record in records if record.end > start and record.start < end]
+        records.sort(key=attrgetter('start'))
+        return records[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events = {}
+            self._snapshot = None
+            self._superseded = set()
+            self._people = None
+            self.window = None
+            self.synced_at = None
+        self._notify(None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._snapshot is None:
+                return len(self._events)
+            return len(self._snapshot) - len(self._superseded) + len(self._events)
+
+    def records(self) -> List[EventRecord]:
+        """Every cached event. An attached snapshot is decoded outside the
+        lock and stays attached."""
+        with self._lock:
+            saved, superseded = self._snapshot, set(self._superseded)
+            events = list(self._events.values())
+        if saved is None:
+            return events
+        return [record for record in saved.records() if record.id not in superseded] + events
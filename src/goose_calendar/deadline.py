@@ -0,0 +1,162 @@
+"""Per-call deadlines and cancellation for tool invocations.
+
+Each tool call runs under a :class:`Deadline`, held in a context variable
+so it follows the call onto worker threads. The engine checks it before
+every Google API request, caps socket timeouts at the time left, skips
+retries that would not finish in time, and stops paginating once it has
+passed. Bulk tools return what they completed so far.
+
+Limits come from the environment (seconds; ``0`` means no limit):
+
+- ``GOOSE_CALENDAR_TOOL_TIMEOUT``: most tools (default 60).
+- ``GOOSE_CALENDAR_BULK_TIMEOUT``: imports, exports, analytics,
+  ``shift_events`` and ``find_duplicates`` (default 900).
+
+A cancelled deadline (the MCP client gave up on the call) behaves like an
+expired one. A request already waiting on the network is not interrupted;
+the call stops at the next check or when its socket timeout fires.
+"""
+
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Iterator, Optional
+
+from .errors import DeadlineExceededError
+
+# Tools that page through or write many events get the longer limit.
+BULK_OPERATIONS = frozenset({'import_ics', 'export_ics', 'calendar_analytics', 'shift_events',
+                             'find_duplicates'})
+
+# How often a thread blocked on another thread's work looks for cancellation.
+POLL_SECONDS = 0.25
+
+_current: contextvars.ContextVar = contextvars.ContextVar('goose_calendar_deadline', default=None)
+
+
+class Deadline:
+    """A point in time a tool call must finish by, which may be cancelled early.
+
+    ``seconds`` of None or 0 means the call is only bounded by cancellation.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds or None
+        self._expires = time.monotonic() + seconds if seconds else None
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None when there is no time limit."""
+        if self._cancelled.is_set():
+            return 0.0
+        if self._expires is None:
+            return None
+        return max(0.0, self._expires - time.monotonic())
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def check(self) -> None:
+        """Raise if the call was cancelled or has run out of time.
+
+        Raises:
+            DeadlineExceededError: No time is left.
+        """
+        if self._cancelled.is_set():
+            raise DeadlineExceededError("The request was cancelled.")
+        if self.expired():
+            raise DeadlineExceededError(
+                f"The request did not finish within its {self.seconds:.0f} second time limit.")
+
+    @contextlib.contextmanager
+    def paused(self) -> Iterator[None]:
+        """Leave time spent in the block (e.g. waiting for the user to sign
+        in) off the clock."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            if self._expires is not None:
+                self._expires += time.monotonic() - started
+
+
+def for_operation(operation: str) -> Deadline:
+    """A new deadline for one invocation of the tool named ``operation``."""
+    if operation in BULK_OPERATIONS:
+        seconds = float(os.environ.get('GOOSE_CALENDAR_BULK_TIMEOUT', '900'))
+    else:
+        seconds = float(os.environ.get('GOOSE_CALENDAR_TOOL_TIMEOUT', '60'))
+    return Deadline(seconds)
+
+
+@contextlib.contextmanager
+def bound(deadline: Deadline) -> Iterator[Deadline]:
+    """Run the block under ``deadline``."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[Deadline]:
+    """The deadline of the tool call running in this context, if any."""
+    return _current.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current call, or None when it is unbounded."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def expired() -> bool:
+    deadline = _current.get()
+    return deadline is not None and deadline.expired()
+
+
+def check() -> None:
+    """Raise :class:`DeadlineExceededError` if the current call is out of time."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+@contextlib.contextmanager
+def paused() -> Iterator[None]:
+    """:meth:`Deadline.paused` for the current call, if it has a deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        yield
+    else:
+        with deadline.paused():
+            yield
+
+
+def wait(future: Future) -> Any:
+    """``future.result()``, giving up when the current call runs out of time.
+
+    Raises:
+        DeadlineExceededError: The deadline passed or was cancelled first.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return future.result()
+    while True:
+        deadline.check()
+        left = deadline.remaining()
+        try:
+            return future.result(timeout=POLL_SECONDS if left is None else min(left, POLL_SECONDS))
+        except FutureTimeoutError:
+            if future.done():
+                raise  # The work itself timed out (socket.timeout is a TimeoutError)
@@ -0,0 +1,210 @@
+"""``goose-calendar doctor``: where a slow calendar spends its time.
+
+Runs, in order, each stage a first tool call waits on and times it:
+
+- ``import``: importing the server in a fresh interpreter, with write-behind
+  and snapshots off;
+- ``credentials.load``: reading the stored OAuth token;
+- ``credentials.refresh``: exchanging an expired token for a new one;
+- ``service.build``: building the Calendar service from its discovery document;
+- ``events.list``: the first listing (a new connection) and a second one;
+- ``cache.load``: loading the cached window, then the cache's state.
+
+The doctor's engine leaves the write-behind journal and the cache snapshot
+alone: queued writes are counted, not sent, and the snapshot is not rewritten.
+
+Times are compared with a baseline saved by an earlier ``--save-baseline``
+run, so "the calendar is slow" can be answered with which stage got slower.
+"""
+
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+
+from google.auth.transport.requests import Request
+
+from . import snapshot
+from .engine import CalendarEngine
+from .write_queue import Journal
+
+DEFAULT_BASELINE = '~/.goose_calendar_doctor.json'
+
+# A stage is reported as slower when it takes this many times its baseline,
+# and at least SLOWER_MIN_SECONDS more.
+SLOWER_FACTOR = 2.0
+SLOWER_MIN_SECONDS = 0.05
+
+# Importing the server builds its engine; without these it is one that
+# leaves the journal and the snapshot alone, like the doctor's own.
+_IMPORT_UNSET = ('GOOSE_CALENDAR_WRITE_BEHIND', 'GOOSE_CALENDAR_SNAPSHOT', 'GOOSE_CALENDAR_WARMUP')
+
+
+class Stage(NamedTuple):
+    name: str
+    seconds: Optional[float]  # None when the stage was skipped
+    detail: str = ''
+    ok: bool = True
+
+
+def _timed(operation: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    operation()
+    return time.perf_counter() - started
+
+
+def _time_import() -> Stage:
+    """Import the MCP server (and so every dependency) in a new interpreter."""
+    module = f"{__package__}.mcp_server"
+    code = ("import time; started = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - started)")
+    env = {name: value for name, value in os.environ.items() if name not in _IMPORT_UNSET}
+    env['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if path)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            env=env, timeout=120)
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ['unknown error'])[-1]
+        return Stage('import', None, f"could not import {module}: {error}", ok=False)
+    return Stage('import', float(result.stdout.strip().splitlines()[-1]),
+                 f"python -X importtime -c 'import {module}' shows each module")
+
+
+def _credential_stages(engine: CalendarEngine) -> List[Stage]:
+    """Load the stored token and refresh it if it has expired, saving it
+    back as the engine would."""
+    path = engine._token_file
+    if not os.path.exists(path):
+        return [Stage('credentials.load', None,
+                      f"no token at {path}; run the server once to sign in", ok=False)]
+    started = time.perf_counter()
+    with open(path, 'rb') as token:
+        creds = pickle.load(token)
+    stages = [Stage('credentials.load', time.perf_counter() - started, path)]
+
+    if creds.valid:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # expiry is naive UTC
+        left = (creds.expiry - now).total_seconds() / 60 if creds.expiry else None
+        detail = f"token valid for {left:.0f} more minutes" if left is not None else "token valid"
+        stages.append(Stage('credentials.refresh', None, detail))
+    elif creds.expired and creds.refresh_token:
+        try:
+            seconds = _timed(lambda: creds.refresh(Request()))
+        except Exception as error:
+            stages.append(Stage('credentials.refresh', None, f"refresh failed: {error}", ok=False))
+            return stages
+        with open(path, 'wb') as token:
+            pickle.dump(creds, token)
+        stages.append(Stage('credentials.refresh', seconds, "token was expired"))
+    else:
+        stages.append(Stage('credentials.refresh', None,
+                            "token cannot be refreshed; run the server to sign in again", ok=False))
+    return stages
+
+
+def _cache_state(engine: CalendarEngine) -> str:
+    """The cache, and the snapshot and write-behind journal saved beside the
+    token, read without touching either file."""
+    cache = engine._cache
+    if not cache.enabled:
+        return "event cache disabled (GOOSE_CALENDAR_CACHE_TTL=0)"
+    state = f"{len(cache)} events cached over the next {engine._cache_days} days, TTL {cache.ttl:.0f}s"
+    base = os.path.splitext(engine._token_file)[0]
+    saved = snapshot.load(base + '.snapshot')
+    if saved is not None:
+        state += (f"; snapshot of {len(saved)} events synced "
+                  f"{datetime.fromtimestamp(saved.synced_at):%Y-%m-%d %H:%M}")
+    pending = len(Journal(base + '.journal').replay())
+    if pending:
+        state += f"; {pending} writes waiting to be sent"
+    return state
+
+
+def run(engine: Optional[CalendarEngine] = None) -> List[Stage]:
+    """Time every stage, stopping at the first one later stages depend on that fails."""
+    stages = [_time_import()]
+    engine = engine or CalendarEngine(read_only=True)
+    if os.environ.get('GOOSE_CALENDAR_API_ROOT'):
+        stages.append(Stage('credentials.load', None, "offline API; no credentials needed"))
+    else:
+        stages.extend(_credential_stages(engine))
+        if not all(stage.ok for stage in stages[1:]):
+            return stages
+
+    steps = [
+        ('service.build', engine._get_service, ''),
+        ('events.list', lambda: engine.upcoming_events(1, 10), "first request, on a new connection"),
+        ('events.list', lambda: engine._execute(engine._get_service().events().list(
+            calendarId='primary', maxResults=1), 'events.list'), "again, on the open connection"),
+    ]
+    if engine._cache.enabled:
+        steps.append(('cache.load', engine.prefetch, ''))
+    for name, operation, detail in steps:
+        try:
+            stages.append(Stage(name, _timed(operation), detail))
+        except Exception as error:
+            stages.append(Stage(name, None, f"failed: {error}", ok=False))
+            return stages
+    stages.append(Stage('cache', None, _cache_state(engine)))
+    return stages
+
+
+def _key(stages: List[Stage], index: int) -> str:
+    """Baseline key of ``stages[index]``; a repeated name gets a ``#2`` suffix."""
+    name = stages[index].name
+    repeat = sum(1 for stage in stages[:index] if stage.name == name)
+    return f"{name}#{repeat + 1}" if repeat else name
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    try:
+        with open(os.path.expanduser(path), encoding='utf-8') as f:
+            return json.load(f).get('stages', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path: str, stages: List[Stage]) -> None:
+    times = {_key(stages, index): stage.seconds
+             for index, stage in enumerate(stages) if stage.seconds is not None}
+    path = os.path.expanduser(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'recorded_at': datetime.now().isoformat(timespec='seconds'), 'stages': times},
+                  f, indent=2)
+
+
+def report(stages: List[Stage], baseline: Dict[str, float], out: TextIO) -> None:
+    """Print one line per stage, with its baseline and a warning when it got slower."""
+    print("goose-calendar doctor", file=out)
+    for index, stage in enumerate(stages):
+        icon = '✅' if stage.ok else '❌'
+        took = f"{stage.seconds * 1000:8.0f} ms" if stage.seconds is not None else f"{'-':>11}"
+        line = f"{icon} {stage.name:<20}{took}"
+        before = baseline.get(_key(stages, index))
+        if stage.seconds is not None and before is not None:
+            line += f"  (baseline {before * 1000:.0f} ms)"
+            if stage.seconds > before * SLOWER_FACTOR and stage.seconds - before > SLOWER_MIN_SECONDS:
+                line += f" ⚠️ {stage.seconds / max(before, 1e-9):.1f}x slower"
+        if stage.detail:
+            line += f"  {stage.detail}"
+        print(line, file=out)
+    timed = [stage for stage in stages if stage.seconds is not None]
+    if timed:
+        slowest = max(timed, key=lambda stage: stage.seconds)
+        total = sum(stage.seconds for stage in timed)
+        print(f"Total {total * 1000:.0f} ms; slowest stage: {slowest.name} "
+              f"({slowest.seconds * 1000:.0f} ms)", file=out)
+
+
+def main(baseline_path: str = DEFAULT_BASELINE, save: bool = False,
+         engine: Optional[CalendarEngine] = None, out: TextIO = sys.stdout) -> int:
+    """Run the diagnostics and print the report; returns the exit status."""
+    stages = run(engine)
+    report(stages, load_baseline(baseline_path), out)
+    if save:
+        save_baseline(baseline_path, stages)
+        print(f"Saved these times as the baseline in {baseline_path}", file=out)
+    return 0 if all(stage.ok for stage in stages) else 1
@@ -0,0 +1,1474 @@
+"""Google Calendar engine shared by the Goose toolkit and the MCP server.
+
+The engine owns credentials, the API service, request coalescing, searching
+and response formatting. ``toolkit.py`` and ``mcp_server.py`` are thin
+adapters that expose its operations as tools and translate its exceptions
+into their own error conventions.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from google.auth.exceptions import TransportError
+from dateutil import parser as date_parser, tz
+
+from . import deadline, ics, metrics, people, snapshot, tracing
+from .agenda import AgendaViews
+from .breaker import CircuitBreaker
+from .cache import EventCache, rfc3339
+from .errors import (  # noqa: F401 (re-exported)
+    ApiUnavailableError, AuthenticationError, CalendarError, DeadlineExceededError, InvalidInputError,
+)
+from .http_cache import ResponseCache
+from .records import EventRecord, event_records
+from .write_queue import JournalInUseError, WriteQueue
+
+# Approximate resident size of one built Calendar v3 service object (the
+# parsed discovery document and generated resource methods), measured with
+# tracemalloc. Used to bound pools of engines, together with the size of one
+# cached EventRecord (with a typical description and attendee list).
+SERVICE_MEMORY_BYTES = 1024 * 1024
+CACHED_EVENT_BYTES = 640
+
+# Delta syncs ask for changes since a little before the previous sync so
+# modest clock skew between this host and Google cannot hide an update.
+SYNC_OVERLAP_SECONDS = 60
+
+# Calls per batch request (Google's recommended maximum) and batch requests
+# in flight at once during bulk imports.
+BATCH_SIZE = 50
+BATCH_CONCURRENCY = 4
+
+# Longest a bulk write waits for queued write-behind writes to reach Google.
+PENDING_WRITES_WAIT_SECONDS = 30.0
+
+# Event IDs Google accepts from clients: base32hex characters, 5 to 1024 long.
+_EVENT_ID = re.compile(r'[a-v0-9]{5,1024}')
+
+# ``progress(done, total, message)``, as accepted by MCP progress notifications.
+ProgressCallback = Callable[[float, Optional[float], str], None]
+
+
+def _build_offline_service(api_root: str):
+    """Build an unauthenticated service against a local Calendar API stand-in.
+
+    Used when ``GOOSE_CALENDAR_API_ROOT`` points at a fake server such as
+    ``benchmarks/fake_calendar_api.py``; no credentials are loaded.
+    """
+    document = json.loads(get_static_doc('calendar', 'v3'))
+    document['rootUrl'] = api_root
+    return build_from_document(document, http=httplib2.Http())
+
+
+def _list_window(days: int) -> Tuple[str, str]:
+    """``timeMin``/``timeMax`` for the next ``days`` days.
+
+    Both are truncated to the minute so repeated reads within a minute
+    send identical URLs, which the response cache can then revalidate.
+    """
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    return now.isoformat() + 'Z', (now + timedelta(days=days)).isoformat() + 'Z'
+
+
+def parse_time(value: str, label: str) -> datetime:
+    """Parse a natural-language or ISO time, naming ``label`` on failure."""
+    try:
+        return date_parser.parse(value)
+    except Exception:
+        raise InvalidInputError(f"Could not parse {label}: {value}")
+
+
+def _event_time(event: EventRecord, moment: datetime) -> Dict[str, str]:
+    """A ``start``/``end`` object moving ``event`` to ``moment``, keeping its
+    all-day-ness and time zone."""
+    if event.all_day:
+        return {'date': moment.date().isoformat()}
+    if event.time_zone:
+        return {'dateTime': moment.isoformat(), 'timeZone': event.time_zone}
+    return {'dateTime': moment.isoformat()}
+
+
+def _shifted(event: EventRecord, timestamp: int, offset: timedelta) -> datetime:
+    """``timestamp`` of ``event`` moved by ``offset`` on the wall clock of the
+    event's time zone, so moves across a DST change keep the local time."""
+    if event.all_day:
+        return datetime.fromtimestamp(timestamp, tz.UTC) + offset
+    zone = (tz.gettz(event.time_zone) if event.time_zone else None) or event.local_start().tzinfo
+    return datetime.fromtimestamp(timestamp, zone) + offset
+
+
+def _format_move(event: EventRecord, moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d (All day)' if event.all_day else '%Y-%m-%d %I:%M %p')
+
+
+def _describe_offset(offset: timedelta) -> str:
+    """E.g. ``later by 1 day 2 hours`` or ``earlier by 30 minutes``."""
+    seconds = abs(int(offset.total_seconds()))
+    parts = []
+    for unit, size in (('day', 86400), ('hour', 3600), ('minute', 60)):
+        count, seconds = divmod(seconds, size)
+        if count:
+            parts.append(f"{count} {unit}{'s' if count != 1 else ''}")
+    return f"{'later' if offset > timedelta(0) else 'earlier'} by {' '.join(parts)}"
+
+
+def _unavailable(error: Exception) -> bool:
+    """Whether ``error`` means the API is down, failing or too slow to answer
+    in time, rather than a bad request."""
+    if isinstance(error, HttpError):
+        return error.resp.status in metrics.RETRYABLE_STATUSES
+    return isinstance(error, (ApiUnavailableError, DeadlineExceededError, httplib2.HttpLib2Error,
+                              OSError, TransportError))
+
+
+def _set_timeout(http: Optional[Any], seconds: Optional[float]) -> None:
+    """Apply a socket timeout to an httplib2 client and its open connections."""
+    http = getattr(http, 'http', http)  # AuthorizedHttp wraps an httplib2.Http
+    if not isinstance(http, httplib2.Http):
+        return
+    http.timeout = seconds
+    for connection in http.connections.values():
+        connection.timeout = seconds
+        if connection.sock is not None:
+            connection.sock.settimeout(seconds)
+
+
+def _duplicate_key(event: EventRecord) -> Tuple:
+    """What makes two events copies of each other: the same title and location
+    (ignoring case and spacing) at the same times."""
+    def normalized(text: Optional[str]) -> str:
+        return ' '.join((text or '').casefold().split())
+    return (normalized(event.summary), event.start, event.end, event.all_day,
+            normalized(event.location))
+
+
+def _describe_age(seconds: float) -> str:
+    """E.g. ``45 seconds`` or ``3 minutes``."""
+    if seconds < 120:
+        return f"{seconds:.0f} seconds"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} minutes"
+    return f"{seconds / 3600:.0f} hours"
+
+
+class _UntilDeadline:
+    """Iterate ``pages`` until the tool call's deadline passes, then stop
+    quietly with :attr:`stopped` set, so bulk reads return what they got."""
+
+    def __init__(self, pages: Iterator[List[Dict[str, Any]]]):
+        self._pages = pages
+        self.stopped = False
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        try:
+            yield from self._pages
+        except DeadlineExceededError:
+            self.stopped = True
+
+
+def _export_file(path: str, suffix: str) -> str:
+    """Resolve where an export named ``path`` may be written.
+
+    The file gets ``suffix`` if it lacks it. When ``GOOSE_CALENDAR_EXPORT_DIR``
+    is set, relative paths are taken inside it and paths outside it are
+    refused. Anything already at the path other than a regular file (a
+    directory, a link, a device) is never replaced.
+    """
+    path = os.path.expanduser(path)
+    if not path.lower().endswith(suffix):
+        path += suffix
+    directory = os.environ.get('GOOSE_CALENDAR_EXPORT_DIR')
+    if directory:
+        directory = os.path.realpath(os.path.expanduser(directory))
+        path = os.path.realpath(os.path.join(directory, path))
+        if os.path.commonpath([directory, path]) != directory:
+            raise InvalidInputError(f"Exports can only be written inside {directory}")
+    if os.path.islink(path) or (os.path.lexists(path) and not os.path.isfile(path)):
+        raise InvalidInputError(f"Not replacing {path}: it is not a regular file")
+    return path
+
+
+@contextlib.contextmanager
+def _replacing(path: str, mode: str = 'w', **kwargs) -> Iterator[Any]:
+    """Write to a new file beside ``path``, moved over it only once complete.
+
+    A failed or interrupted write leaves ``path`` as it was and removes the
+    partial file.
+    """
+    descriptor, partial = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.",
+                                           suffix='.tmp', dir=os.path.dirname(path) or None)
+    try:
+        with open(descriptor, mode, **kwargs) as out:
+            yield out
+        os.replace(partial, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(partial)
+        raise
+
+
+def format_event_list(events: List[EventRecord], days_ahead: int) -> str:
+    """Render upcoming events as the list_events response."""
+    if not events:
+        return f"No upcoming events found in the next {days_ahead} days."
+
+    result = f"Upcoming events (next {days_ahead} days):\\n\\n"
+    for event in events:
+        result += _format_event(event) + "\\n"
+    return result
+
+
+def _format_event(event: EventRecord, people: bool = False) -> str:
+    """One event's lines of a listing, optionally with its organizer and attendees."""
+    summary = event.summary or 'No title'
+
+    # Format the date/time in the offset the event was returned with
+    if event.all_day:
+        formatted_time = event.local_start().strftime('%Y-%m-%d (All day)')
+    else:
+        formatted_time = event.local_start().strftime('%Y-%m-%d at %I:%M %p')
+
+    location = event.location
+    description = event.description
+
+    result = f"📅 **{summary}**\\n"
+    result += f"   🕒 {formatted_time}\\n"
+    if location:
+        result += f"   📍 {location}\\n"
+    if people:
+        if event.organizer:
+            result += f"   👤 Organizer: {event.organizer}\\n"
+        if event.attendees:
+            shown = ', '.join(event.attendees[:8])
+            more = f" and {len(event.attendees) - 8} more" if len(event.attendees) > 8 else ""
+            result += f"   👥 {shown}{more}\\n"
+    if description:
+        result += f"   📝 {description[:100]}{'...' if len(description) > 100 else ''}\\n"
+    return result
+
+
+def format_people_events(events: List[EventRecord], person: str, days_ahead: int) -> str:
+    """Render the find_events_with response."""
+    if not events:
+        return f"No events with '{person}' found in the next {days_ahead} days."
+    result = f"Events with '{person}' (next {days_ahead} days):\\n\\n"
+    for event in events:
+        result += _format_event(event, people=True) + "\\n"
+    return result
+
+
+def format_ambiguous(events: List[EventRecord], query: str) -> str:
+    """Ask the user to narrow down a query that matched several events."""
+    result = f"Multiple events found matching '{query}'. Please be more specific:\\n\\n"
+    for i, event in enumerate(events[:5], 1):
+        summary = event.summary or 'No title'
+        result += f"{i}. {summary} ({event.start_text()})\\n"
+    return result
+
+
+class CalendarEngine:
+    """Google Calendar operations shared by every front end."""
+
+    def __init__(self, credentials_file: str = '~/credentials.json',
+                 token_file: str = '~/.goose_calendar_token.pickle', interactive: bool = True,
+                 read_only: bool = False):
+        self._service = None
+        # Whether a missing or revoked token may start the browser sign-in;
+        # never in a server shared over HTTP
+        self.interactive = interactive
+        self._scopes = ['https://www.googleapis.com/auth/calendar']
+        self._credentials_file = os.path.expanduser(credentials_file)
+        self._token_file = os.path.expanduser(token_file)
+        self._inflight: Dict[Tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._service_lock = threading.Lock()
+        self._credentials: Optional[Credentials] = None
+        self._offline = False
+        self._local = threading.local()
+        self._cache = EventCache(ttl=float(os.environ.get('GOOSE_CALENDAR_CACHE_TTL', '60')))
+        self._cache_days = int(os.environ.get('GOOSE_CALENDAR_CACHE_DAYS', '14'))
+        self._agenda = AgendaViews(self._cache, format_event_list)
+        http_cache_mb = float(os.environ.get('GOOSE_CALENDAR_HTTP_CACHE_MB', '16'))
+        self._http_cache = (
+            ResponseCache(max_bytes=int(http_cache_mb * 1024 * 1024)) if http_cache_mb > 0 else None
+        )
+        self._http_timeout = float(os.environ.get('GOOSE_CALENDAR_HTTP_TIMEOUT', '30'))
+        self._max_stale = float(os.environ.get('GOOSE_CALENDAR_MAX_STALE_SECONDS', '600'))
+        self._revalidation: Optional[threading.Thread] = None
+        self._breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get('GOOSE_CALENDAR_BREAKER_FAILURES', '5')),
+            reset_timeout=float(os.environ.get('GOOSE_CALENDAR_BREAKER_RESET_SECONDS', '30')),
+        )
+        self._writes: Optional[WriteQueue] = None
+        self._writes_unavailable: Optional[str] = None
+        # A read-only engine (the doctor's) neither replays the write-behind
+        # journal nor loads or rewrites the cache snapshot
+        if not read_only and \
+                os.environ.get('GOOSE_CALENDAR_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes'):
+            journal = os.path.splitext(self._token_file)[0] + '.journal'
+            try:
+                self._writes = WriteQueue.for_journal(self, journal)
+            except JournalInUseError as error:
+                # Writes are sent directly rather than racing the other process's queue
+                self._writes_unavailable = str(error)
+                print(f"Write-behind is off: {error}", file=sys.stderr)
+        self._snapshot_path: Optional[str] = None
+        self._snapshot_dirty = False
+        self._snapshot_writer: Optional[threading.Thread] = None
+        if self._cache.enabled and not read_only and \
+                os.environ.get('GOOSE_CALENDAR_SNAPSHOT', '').lower() in ('1', 'true', 'yes'):
+            self._snapshot_path = os.path.splitext(self._token_file)[0] + '.snapshot'
+            saved = snapshot.load(self._snapshot_path)
+            if saved is not None:
+                self._cache.attach(saved)
+                if self._writes is not None and self._writes.pending():
+                    self._writes.overlay(self._cache)
+            self._cache.subscribe(self._cache_changed)
+
+    def _get_credentials(self) -> Optional[Credentials]:
+        """Get or create Google Calendar API credentials.
+
+        Raises:
+            FileNotFoundError: No stored token and no OAuth client file.
+            AuthenticationError: The OAuth flow failed.
+        """
+        creds = None
+
+        # Load existing token
+        if os.path.exists(self._token_file):
+            with tracing.span('credentials.load'), open(self._token_file, 'rb') as token:
+                creds = pickle.load(token)
+
+        # If there are no valid credentials, get new ones
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                started = time.perf_counter()
+                try:
+                    with tracing.span('credentials.refresh'):
+                        creds.refresh(Request())
+                    metrics.TOKEN_REFRESHES.inc(outcome='ok')
+                except Exception:
+                    metrics.TOKEN_REFRESHES.inc(outcome='error')
+                    # Delete the old token and start fresh
+                    if os.path.exists(self._token_file):
+                        os.remove(self._token_file)
+                    creds = None
+                finally:
+                    metrics.TOKEN_REFRESH_LATENCY.observe(time.perf_counter() - started)
+
+            if not creds:
+                if not self.interactive:
+                    raise AuthenticationError(
+                        f"No Google sign-in is stored in {self._token_file}. Sign in on the "
+                        "server host with: goose-calendar login --account NAME"
+                    )
+                if not os.path.exists(self._credentials_file):
+                    raise FileNotFoundError(
+                        f"Credentials file not found at {self._credentials_file}. "
+                        "Please download your OAuth 2.0 credentials from Google Cloud Console."
+                    )
+
+                try:
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        self._credentials_file, self._scopes
+                    )
+                    with tracing.span('credentials.oauth_flow'), deadline.paused():
+                        creds = flow.run_local_server(port=0)
+                except Exception as e:
+                    if "access_denied" in str(e):
+                        raise AuthenticationError(
+                            "Error 403: access_denied - Your app hasn't completed Google verification.\n"
+                            "Solutions:\n"
+                            "1. Go to Google Cloud Console > OAuth consent screen\n"
+                            "2. Add your email as a 'Test user'\n"
+                            "3. Ensure OAuth consent screen is properly configured\n"
+                            "4. Use the same Google account that's listed as a test user\n"
+                            "See project documentation for detailed setup instructions."
+                        )
+                    raise AuthenticationError(f"Authentication failed: {e}")
+
+            # Save the credentials for next time
+            with open(self._token_file, 'wb') as token:
+                pickle.dump(creds, token)
+
+        return creds
+
+    def _get_service(self):
+        """Get the Google Calendar service."""
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    api_root = os.environ.get('GOOSE_CALENDAR_API_ROOT')
+                    if api_root:
+                        with tracing.span('service.build', offline=True):
+                            self._service = _build_offline_service(api_root)
+                        self._offline = True
+                    else:
+                        creds = self._get_credentials()
+                        with tracing.span('service.build'):
+                            self._service = build('calendar', 'v3', credentials=creds)
+                        self._credentials = creds
+        return self._service
+
+    def memory_estimate(self) -> int:
+        """Rough number of bytes this engine keeps alive."""
+        service = SERVICE_MEMORY_BYTES if self._service is not None else 0
+        responses = self._http_cache.size if self._http_cache is not None else 0
+        return service + responses + len(self._cache) * CACHED_EVENT_BYTES
+
+    def _http(self) -> Optional[httplib2.Http]:
+        """Return this thread's HTTP client for executing requests.
+
+        httplib2 connections are not thread-safe, so concurrent tool calls
+        share the service object but each worker thread gets its own
+        connection pool. Returns None when the service was supplied without
+        known credentials, in which case the service's own client is used.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            if self._offline:
+                http = httplib2.Http(cache=self._http_cache)
+            elif self._credentials is not None:
+                http = AuthorizedHttp(self._credentials, http=httplib2.Http(cache=self._http_cache))
+            else:
+                return None
+            self._local.http = http
+        return http
+
+    def _execute(self, request, method: str, convert: Optional[Callable[[Any], Any]] = None):
+        """Execute an API request on this thread's HTTP client.
+
+        ``convert``, if given, is applied to the decoded body (e.g. to turn a
+        listing into :class:`EventRecord` objects). Reads that httplib2
+        revalidated against the response cache (a 304) reuse the converted
+        body from when the response was first stored.
+        """
+        http = self._http()
+        cache = self._http_cache
+        stored: Dict[str, Any] = {}
+        if cache is not None and http is not None and getattr(request, 'method', None) == 'GET':
+            key = httplib2.urlnorm(request.uri)[-1]
+            decode = request.postproc
+
+            def postproc(resp, content):
+                etag = resp.get('etag')
+                if etag is None:
+                    return decode(resp, content)
+                if getattr(resp, 'fromcache', False):
+                    decoded = cache.decoded(key, etag)
+                    hit = decoded is not None
+                    metrics.CACHE_REQUESTS.inc(cache='http', result='hit' if hit else 'revalidated')
+                    if hit:
+                        stored['hit'] = True
+                        return decoded
+                else:
+                    metrics.CACHE_REQUESTS.inc(cache='http', result='miss')
+                stored['etag'] = etag
+                return decode(resp, content)
+
+            request.postproc = postproc
+        result = self._send(request, method, http=http)
+        if stored.get('hit'):
+            return result
+        if convert is not None:
+            result = convert(result)
+        if 'etag' in stored:
+            cache.remember_decoded(key, stored['etag'], result)
+        return result
+
+    def _send(self, request, method: str, **kwargs):
+        """``metrics.execute`` behind the circuit breaker, within the call's deadline.
+
+        The socket timeout is the smaller of ``GOOSE_CALENDAR_HTTP_TIMEOUT``
+        and the time the current tool call has left. Network errors, 429s and
+        5xx responses count as failures; any other response shows the API is
+        up. A request cut short by the deadline counts as neither.
+
+        Raises:
+            ApiUnavailableError: The breaker is open.
+            DeadlineExceededError: The call is out of time or was cancelled.
+        """
+        deadline.check()
+        if not self._breaker.allow():
+            raise ApiUnavailableError(
+                "Google Calendar is not responding; not sending requests for another "
+                f"{self._breaker.retry_in():.0f} seconds.")
+        timeout = self._http_timeout or None
+        left = deadline.remaining()
+        if left is not None:
+            timeout = min(timeout, left) if timeout else left
+        _set_timeout(kwargs.get('http'), timeout)
+        try:
+            result = metrics.execute(request, method, **kwargs)
+        except HttpError as error:
+            if error.resp.status in metrics.RETRYABLE_STATUSES:
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
+            raise
+        except (httplib2.HttpLib2Error, OSError, TransportError) as error:
+            if deadline.expired():
+                self._breaker.release()
+                raise DeadlineExceededError(
+                    f"Google Calendar did not answer before the time limit ({error}).") from error
+            self._breaker.record_failure()
+            raise
+        except Exception:
+            self._breaker.record_success()
+            raise
+        self._breaker.record_success()
+        return result
+
+    def _coalesce(self, key: Tuple, fetch):
+        """Run ``fetch`` once for all concurrent callers sharing ``key``.
+
+        The first caller performs the request; callers arriving while it is
+        still in flight wait for and receive the same result (or exception).
+        Results are shared, so callers must not mutate them. If the first
+        caller runs out of time, waiters with time left do not share its
+        :class:`DeadlineExceededError`: one of them fetches again.
+        """
+        while True:
+            with self._inflight_lock:
+                future = self._inflight.get(key)
+                owner = future is None or future.done()
+                if owner:
+                    future = Future()
+                    self._inflight[key] = future
+
+            metrics.CACHE_REQUESTS.inc(cache='inflight', result='miss' if owner else 'hit')
+            if owner:
+                break
+            try:
+                return deadline.wait(future)
+            except DeadlineExceededError:
+                if deadline.expired() or not future.done():
+                    raise  # This caller's own time ran out
+
+        try:
+            result = fetch()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def upcoming_events(self, days_ahead: int, max_results: int) -> List[EventRecord]:
+        """Fetch upcoming events, sharing identical in-flight requests."""
+        def fetch():
+            service = self._get_service()
+            now, end_time = _list_window(days_ahead)
+            return self._execute(service.events().list(
+                calendarId='primary',
+                timeMin=now,
+                timeMax=end_time,
+                maxResults=max_results,
+                singleEvents=True,
+                orderBy='startTime'
+            ), 'events.list', convert=event_records)
+
+        return self._coalesce(('list', days_ahead, max_results), fetch)
+
+    def _iter_pages(self, **params) -> Iterator[List[Dict[str, Any]]]:
+        """Yield each page of a paginated ``events.list`` over ``primary``."""
+        service = self._get_service()
+        params.setdefault('singleEvents', True)
+        page_token = None
+        while True:
+            page = self._execute(service.events().list(
+                calendarId='primary', maxResults=2500, pageToken=page_token, **params
+            ), 'events.list')
+            yield page.get('items', [])
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+
+    def _list_all(self, **params) -> List[Dict[str, Any]]:
+        """Run a paginated ``events.list`` over ``primary`` and return every item."""
+        return [event for page in self._iter_pages(**params) for event in page]
+
+    def prefetch(self, days: Optional[int] = None) -> None:
+        """Load the next ``days`` days (default ``GOOSE_CALENDAR_CACHE_DAYS``) into the cache.
+
+        The window gets an extra day so requests keep falling inside it as
+        the clock advances until the next reload.
+        """
+        days = self._cache_days if days is None else days
+
+        def fetch():
+            started = time.time()
+            end = started + (days + 1) * 86400
+            with tracing.span('cache.load', days=days):
+                events = self._list_all(timeMin=rfc3339(started), timeMax=rfc3339(end))
+            self._cache.load(started, end, events, synced_at=started)
+            if self._writes is not None:
+                self._writes.overlay(self._cache)
+            self._save_snapshot_in_background()
+
+        self._coalesce(('prefetch',), fetch)
+
+    def _sync(self) -> None:
+        """Bring the cached window up to date with an ``updatedMin`` delta."""
+        def fetch():
+            started = time.time()
+            start, end = self._cache.window
+            try:
+                with tracing.span('cache.sync'):
+                    changes = self._list_all(
+                        timeMin=rfc3339(start), timeMax=rfc3339(end), showDeleted=True,
+                        updatedMin=rfc3339(self._cache.synced_at - SYNC_OVERLAP_SECONDS),
+                    )
+            except HttpError as error:
+                if error.resp.status != 410:
+                    raise
+                # Google expired the delta window; start over with a full load
+                self._cache.clear()
+                self.prefetch()
+                return
+            self._cache.merge(changes, synced_at=started)
+            if self._writes is not None:
+                self._writes.overlay(self._cache)
+            self._save_snapshot_in_background()
+
+        self._coalesce(('sync',), fetch)
+
+    def window_events(self, days_ahead: int, max_results: int) -> List[EventRecord]:
+        """Upcoming events, served from the event cache when it is enabled.
+
+        Windows longer than the cache, or a disabled cache, go straight to
+        the API through :meth:`upcoming_events`.
+        """
+        return self._window(days_ahead, max_results)[0]
+
+    def _window(self, days_ahead: int, max_results: int) -> Tuple[List[EventRecord], Optional[str]]:
+        """:meth:`window_events`, plus a note for the user when the events
+        may be out of date.
+
+        A stale cache is served at once while a background sync brings it up
+        to date (stale-while-revalidate). Past ``GOOSE_CALENDAR_MAX_STALE_SECONDS``
+        the sync is waited for instead, unless the API is failing, in which
+        case cached events are still better than an error.
+        """
+        if not self._cache.enabled or days_ahead > self._cache_days:
+            return self.upcoming_events(days_ahead, max_results), None
+
+        now = time.time()
+        end = now + days_ahead * 86400
+        note = None
+        if not self._cache.covers(now, end):
+            metrics.CACHE_REQUESTS.inc(cache='events', result='miss')
+            try:
+                self.prefetch()
+            except Exception as error:
+                if self._cache.window is None or not _unavailable(error):
+                    raise
+                note = (f"Google Calendar is not responding; showing events cached "
+                        f"{_describe_age(self._cache.age())} ago, which may be incomplete.")
+        elif not self._cache.fresh():
+            metrics.CACHE_REQUESTS.inc(cache='events', result='stale')
+            age = self._cache.age()
+            if age <= self._max_stale or self._breaker.is_open():
+                self._revalidate_in_background()
+                note = f"From events cached {_describe_age(age)} ago; refreshing in the background."
+            else:
+                try:
+                    self._sync()
+                except Exception as error:
+                    if not _unavailable(error):
+                        raise
+                    note = (f"Google Calendar is not responding; showing events cached "
+                            f"{_describe_age(age)} ago.")
+        else:
+            metrics.CACHE_REQUESTS.inc(cache='events', result='hit')
+        return self._cache.between(now, end, max_results), note
+
+    def _revalidate_in_background(self) -> None:
+        """Start a background delta sync unless one is already running."""
+        with self._inflight_lock:
+            if self._revalidation is not None and self._revalidation.is_alive():
+                return
+
+            def revalidate():
+                try:
+                    self._sync()
+                except Exception:
+                    pass  # The next read tries again; the breaker records the failure
+
+            self._revalidation = threading.Thread(target=revalidate, name='calendar-revalidate',
+                                                  daemon=True)
+            self._revalidation.start()
+
+    def _cache_changed(self, spans) -> None:
+        self._snapshot_dirty = True
+
+    def _save_snapshot_in_background(self) -> None:
+        """Write the event cache to its snapshot file (``GOOSE_CALENDAR_SNAPSHOT``)
+        on a background thread, if it changed since the last write.
+
+        Skipped while write-behind changes are unconfirmed, so a snapshot
+        only ever holds what Google has accepted.
+        """
+        if self._snapshot_path is None or not self._snapshot_dirty:
+            return
+        if self._writes is not None and self._writes.pending():
+            return
+        with self._inflight_lock:
+            if self._snapshot_writer is not None and self._snapshot_writer.is_alive():
+                return  # Picked up after the next sync
+            self._snapshot_dirty = False
+
+            def save():
+                window, synced_at = self._cache.window, self._cache.synced_at
+                if window is None:
+                    return
+                try:
+                    with tracing.span('snapshot.save', events=len(self._cache)):
+                        snapshot.save(self._snapshot_path, window, synced_at, self._cache.records())
+                except OSError:
+                    self._snapshot_dirty = True
+
+            self._snapshot_writer = threading.Thread(target=save, name='calendar-snapshot',
+                                                     daemon=True)
+            self._snapshot_writer.start()
+
+    def warm_up(self) -> bool:
+        """Load credentials, build the service and prefetch the near-term window.
+
+        Meant to run in the background at startup so the first tool call
+        finds everything ready (or joins the work already in progress).
+        Skipped when no stored token exists, since authenticating for the
+        first time needs the user. Returns whether the warm-up completed;
+        errors are left for the first tool call to report.
+        """
+        offline = bool(os.environ.get('GOOSE_CALENDAR_API_ROOT'))
+        if not offline and not os.path.exists(self._token_file):
+            return False
+        try:
+            with tracing.span('warmup'):
+                self._get_service()
+                if self._cache.enabled:
+                    self.prefetch()
+        except Exception:
+            return False
+        return True
+
+    def _execute_batch(self, requests: List[Any], method: str) -> List[Tuple[Any, Optional[Exception]]]:
+        """Send ``requests`` as one batch request; return ``(response, error)`` per request.
+
+        Calls failing with a retryable status are resent in a further batch,
+        up to twice, while the current call's deadline leaves time for it.
+        """
+        service = self._get_service()
+        results: List[Tuple[Any, Optional[Exception]]] = [(None, None)] * len(requests)
+        pending = list(range(len(requests)))
+        for attempt in range(3):
+            if attempt:
+                delay = 0.5 * (2 ** (attempt - 1))
+                left = deadline.remaining()
+                if left is not None and left <= delay:
+                    break  # Report the retryable errors rather than overrun the deadline
+                time.sleep(delay)
+                metrics.API_RETRIES.inc(method=method)
+            batch = service.new_batch_http_request()
+            for index in pending:
+                def callback(request_id, response, error, index=index):
+                    results[index] = (response, error)
+                batch.add(requests[index], callback=callback)
+            self._send(batch, f'{method}.batch', retries=0, http=self._http())
+            pending = [index for index in pending
+                       if isinstance(results[index][1], HttpError)
+                       and results[index][1].resp.status in metrics.RETRYABLE_STATUSES]
+            if not pending:
+                break
+        return results
+
+    def import_ics(self, path: str, progress: Optional[ProgressCallback] = None) -> str:
+        """Import every event in an iCalendar file into the primary calendar.
+
+        The file is parsed as a stream and events are sent with
+        ``events.import`` in batch requests, several batches at a time, so
+        memory stays flat and large migrations take minutes. Importing
+        matches on iCalUID, so running the same import again updates events
+        instead of duplicating them. If the call's deadline passes, the
+        batches already sent are reported and the rest of the file is left
+        for another run.
+        """
+        path = os.path.expanduser(path)
+        if not os.path.isfile(path):
+            raise InvalidInputError(f"ICS file not found: {path}")
+        self._send_pending_writes()
+        total = os.path.getsize(path)
+        service = self._get_service()
+        consumed = 0
+
+        def lines():
+            nonlocal consumed
+            with open(path, 'rb') as source:
+                for raw in source:
+                    consumed += len(raw)
+                    yield raw.decode('utf-8', errors='replace')
+
+        def send(bodies):
+            requests = [service.events().import_(calendarId='primary', body=body)
+                        for body in bodies]
+            return self._execute_batch(requests, 'events.import')
+
+        imported, errors = 0, []
+        stopped = False
+
+        def collect(future, position):
+            nonlocal imported, stopped
+            try:
+                results = future.result() if future.done() else deadline.wait(future)
+            except DeadlineExceededError:
+                stopped = True
+                return
+            for response, error in results:
+                if error is None:
+                    imported += 1
+                    self._cache.apply(response)
+                else:
+                    errors.append(error)
+            if progress is not None:
+                progress(position, total, f"Imported {imported} events")
+
+        events = ics.read_events(lines())
+        in_flight: deque = deque()
+        with tracing.span('ics.import'), ThreadPoolExecutor(BATCH_CONCURRENCY) as pool:
+            while not stopped:
+                if deadline.expired():
+                    stopped = True
+                    break
+                bodies = list(islice(events, BATCH_SIZE))
+                if not bodies:
+                    break
+                # Batches run under this call's deadline (and trace)
+                context = contextvars.copy_context()
+                in_flight.append((pool.submit(context.run, send, bodies), consumed))
+                if len(in_flight) >= BATCH_CONCURRENCY:
+                    collect(*in_flight.popleft())
+            while in_flight:
+                collect(*in_flight.popleft())
+
+        result = f"✅ Imported {imported} events from {path}"
+        if errors:
+            result += f"\\n⚠️ {len(errors)} events failed to import. First error: {errors[0]}"
+        if stopped:
+            read = consumed * 100 // max(total, 1)
+            result += (f"\\n⏱️ Stopped at the time limit after reading {read}% of the file. "
+                       "Run the import again to finish; events already imported are updated, "
+                       "not duplicated.")
+        return result
+
+    def export_ics(self, path: str, days_back: int = 365, days_ahead: int = 365,
+                   progress: Optional[ProgressCallback] = None) -> str:
+        """Write the primary calendar's events in a time range to an iCalendar file.
+
+        Pages are written as they arrive; recurring events are exported once
+        with their recurrence rules rather than instance by instance. If the
+        call's deadline passes, the pages read so far are written. The path
+        is checked by :func:`_export_file`.
+        """
+        path = _export_file(path, '.ics')
+        now = time.time()
+        written = 0
+        pages = _UntilDeadline(self._iter_pages(
+            timeMin=rfc3339(now - days_back * 86400),
+            timeMax=rfc3339(now + days_ahead * 86400),
+            singleEvents=False,
+        ))
+
+        def events():
+            nonlocal written
+            for page in pages:
+                yield from page
+                written += len(page)
+                if progress is not None:
+                    progress(written, None, f"Exported {written} events")
+
+        with tracing.span('ics.export'), _replacing(path, encoding='utf-8', newline='') as out:
+            count = ics.write_calendar(events(), out)
+        result = f"✅ Exported {count} events to {path}"
+        if pages.stopped:
+            result += ("\\n⏱️ Stopped at the time limit; the file holds the events read so far. "
+                       "Export a shorter range to get the rest.")
+        return result
+
+    def calendar_analytics(self, days_back: int = 90, days_ahead: int = 0,
+                           time_zone: str = 'America/New_York',
+                           export_path: Optional[str] = None) -> str:
+        """Summarize meeting load over a time range, optionally saving the columns.
+
+        Events are streamed page by page into NumPy columns; only the
+        aggregates are returned. ``export_path`` writes the columns to a
+        ``.npz`` file for further analysis, checked as ICS exports are. If
+        the call's deadline passes, the events read so far are summarized.
+        """
+        try:
+            from . import analytics
+        except ImportError:
+            raise CalendarError(
+                "Calendar analytics needs NumPy. Install it with: "
+                "pip install 'goose-calendar-extension[analytics]'"
+            )
+
+        if tz.gettz(time_zone) is None:
+            raise InvalidInputError(f"Unknown time zone: {time_zone}")
+        now = time.time()
+        with tracing.span('analytics.load'):
+            pages = _UntilDeadline(self._iter_pages(
+                timeMin=rfc3339(now - days_back * 86400),
+                timeMax=rfc3339(now + days_ahead * 86400),
+            ))
+            columns = analytics.EventColumns.from_pages(pages)
+        with tracing.span('analytics.summarize', events=len(columns)):
+            summary = analytics.summarize(columns, time_zone)
+        result = analytics.format_summary(summary, days_back, days_ahead)
+        if pages.stopped:
+            result += (f"\\n⏱️ Stopped at the time limit; these figures cover only the "
+                       f"{len(columns)} events read.")
+
+        if export_path:
+            export_path = _export_file(export_path, '.npz')
+            with _replacing(export_path, 'wb') as out:
+                columns.save(out)
+            result += f"\\n💾 Saved {len(columns)} events as columns to {export_path}"
+        return result
+
+    def search_events(self, query: str) -> List[EventRecord]:
+        """Search the next year of events, sharing identical in-flight requests."""
+        def fetch():
+            service = self._get_service()
+            now, future = _list_window(365)
+            return self._execute(service.events().list(
+                calendarId='primary',
+                timeMin=now,
+                timeMax=future,
+                q=query,
+                singleEvents=True,
+                orderBy='startTime'
+            ), 'events.list', convert=event_records)
+
+        return self._coalesce(('search', query), fetch)
+
+    def _match_one(self, query: str) -> Tuple[Optional[EventRecord], Optional[str]]:
+        """Resolve ``query`` to a single event, or to a message explaining why not.
+
+        The query is always searched on the server over the next year with
+        Google's own matching: a query naming one event in the cached window
+        may still name others later in the year, or match cached text that
+        ``q`` would not. Repeated searches are cheap, because they are
+        coalesced and revalidated through the response cache. The event found
+        carries the ETag its edit or delete is guarded by, so it is not fetched
+        again. In write-behind mode, events with writes not yet sent are taken
+        from the event cache instead (and matched locally), since Google does
+        not have them yet.
+        """
+        events = self.search_events(query)
+        if self._writes is not None:
+            events = self._with_pending_writes(events, query)
+        if not events:
+            return None, f"No events found matching '{query}'"
+        if len(events) > 1:
+            return None, format_ambiguous(events, query)
+        return events[0], None
+
+    def _with_pending_writes(self, events: List[EventRecord], query: str) -> List[EventRecord]:
+        """Server search results with unsent local inserts, edits and deletes applied."""
+        pending = self._writes.pending_events()
+        if not pending:
+            return events
+        terms = query.lower().split()
+        merged: Dict[str, EventRecord] = {}
+        for event in events:
+            if event.id not in pending:
+                merged[event.id] = event
+        for event_id, operation in pending.items():
+            record = self._cache.get(event_id) if operation != 'delete' else None
+            if record is not None and record.matches(terms):
+                merged[event_id] = record
+        return sorted(merged.values(), key=lambda event: event.start)
+
+
+    def _send_pending_writes(self) -> None:
+        """Wait until write-behind writes have reached Google.
+
+        Bulk writes (imports, shifts, duplicate deletion) go to Google
+        directly, reading events and their ETags from it. Queued writes are
+        sent first so the bulk write sees them, rather than failing on an
+        event Google does not have yet or making a queued edit's ETag stale.
+
+        Raises:
+            CalendarError: Writes were still waiting when the wait ended.
+        """
+        if self._writes is None or not self._writes.pending():
+            return
+        left = deadline.remaining()
+        timeout = PENDING_WRITES_WAIT_SECONDS if left is None else min(left, PENDING_WRITES_WAIT_SECONDS)
+        with tracing.span('writes.wait'):
+            sent = self._writes.wait(timeout)
+        if not sent:
+            raise CalendarError(
+                f"{self._writes.pending()} changes are still waiting to be saved to Google. "
+                "Try again once write_status shows they are saved.")
+
+    def list_events(self, days_ahead: int = 7, max_results: int = 10) -> str:
+        """List upcoming events as a formatted response.
+
+        While the event cache is fresh and covers the window, the response
+        comes from a pre-rendered agenda view.
+        """
+        if self._cache.enabled and days_ahead <= self._cache_days and self._cache.fresh():
+            now = time.time()
+            if self._cache.covers(now, now + days_ahead * 86400):
+                metrics.CACHE_REQUESTS.inc(cache='events', result='hit')
+                return self._agenda.get(days_ahead, max_results)
+        events, note = self._window(days_ahead, max_results)
+        with tracing.span('format', events=len(events)):
+            result = format_event_list(events, days_ahead)
+        if note:
+            result += f"\\n({note})"
+        return result
+
+    def find_events_with(self, person: str, days_ahead: int = 14, max_results: int = 10) -> str:
+        """List upcoming events that ``person`` (an email address or name)
+        organizes or attends.
+
+        Within the cached window this is a lookup in the cache's people
+        index. Longer windows are searched on the server and the results
+        checked against the people on each event, so a name that only
+        appears in a title or description does not match.
+        """
+        if not people.query_keys(person):
+            raise InvalidInputError("Give an email address or a name to look for.")
+        now = time.time()
+        end = now + days_ahead * 86400
+        if self._cache.enabled and days_ahead <= self._cache_days:
+            if not self._cache.covers(now, end):
+                metrics.CACHE_REQUESTS.inc(cache='people', result='miss')
+                self.prefetch()
+            elif not self._cache.fresh():
+                metrics.CACHE_REQUESTS.inc(cache='people', result='stale')
+                self._sync()
+            else:
+                metrics.CACHE_REQUESTS.inc(cache='people', result='hit')
+            events = self._cache.with_person(person, now, end, max_results)
+        else:
+            pages = self._iter_pages(timeMin=rfc3339(now), timeMax=rfc3339(end),
+                                     q=person, orderBy='startTime')
+            matching = (record for page in pages for record in map(EventRecord.from_api, page)
+                        if people.matches(record, person))
+            events = list(islice(matching, max_results))
+        with tracing.span('format', events=len(events)):
+            return format_people_events(events, person, days_ahead)
+
+    def add_event(
+        self,
+        title: str,
+        start_time: str,
+        end_time: Optional[str] = None,
+        description: Optional[str] = None,
+        location: Optional[str] = None,
+        all_day: bool = False,
+        event_id: Optional[str] = None
+    ) -> str:
+        """Create an event and confirm it.
+
+        ``event_id`` makes the insert idempotent: calling again with the same
+        ID (say, after a timeout) reports the event created the first time
+        instead of adding a copy.
+        """
+        if event_id is not None and not _EVENT_ID.fullmatch(event_id):
+            raise InvalidInputError(
+                "Event IDs must be 5 to 1024 characters of lowercase letters a-v and digits 0-9.")
+        start_dt = parse_time(start_time, 'start time')
+
+        # Parse end time or set default
+        if end_time:
+            end_dt = parse_time(end_time, 'end time')
+        else:
+            # Default to 1 hour duration for timed events, same day for all-day events
+            if all_day:
+                end_dt = start_dt
+            else:
+                end_dt = start_dt + timedelta(hours=1)
+
+        # Create event object
+        event = {'summary': title}
+
+        if all_day:
+            event['start'] = {'date': start_dt.date().isoformat()}
+            event['end'] = {'date': end_dt.date().isoformat()}
+        else:
+            event['start'] = {'dateTime': start_dt.isoformat(), 'timeZone': 'America/New_York'}
+            event['end'] = {'dateTime': end_dt.isoformat(), 'timeZone': 'America/New_York'}
+
+        if description:
+            event['description'] = description
+        if location:
+            event['location'] = location
+
+        if event_id is not None:
+            event['id'] = event_id
+            existing = self._cache.get(event_id)
+            if existing is not None:
+                return (f"✅ Event '{existing.summary or title}' already exists "
+                        f"(an earlier attempt created it). Event ID: {event_id}")
+
+        if self._writes is not None:
+            # Google accepts client-chosen IDs, which also make resends idempotent
+            event.setdefault('id', uuid.uuid4().hex)
+            self._writes.submit('insert', event['id'], event)
+            self._cache.apply(event)
+            return (f"✅ Event '{title}' created successfully! Event ID: {event['id']} "
+                    "(saving to Google in the background)")
+
+        service = self._get_service()
+        try:
+            created_event = self._execute(
+                service.events().insert(calendarId='primary', body=event), 'events.insert'
+            )
+        except HttpError as error:
+            if event_id is None or error.resp.status != 409:
+                raise
+            # The ID is taken: by an earlier attempt at this insert, or by an
+            # event since deleted (Google never reuses the IDs of those)
+            existing = self._execute(
+                service.events().get(calendarId='primary', eventId=event_id), 'events.get'
+            )
+            self._cache.apply(existing)
+            if existing.get('status') == 'cancelled':
+                raise InvalidInputError(
+                    f"Event ID {event_id} belonged to an event that was deleted; choose another.")
+            return (f"✅ Event '{existing.get('summary') or title}' already exists "
+                    f"(an earlier attempt created it). Event ID: {event_id}")
+        self._cache.apply(created_event)
+
+        return f"✅ Event '{title}' created successfully! Event ID: {created_event['id']}"
+
+    def edit_event(
+        self,
+        event_query: str,
+        new_title: Optional[str] = None,
+        new_start_time: Optional[str] = None,
+        new_end_time: Optional[str] = None,
+        new_description: Optional[str] = None,
+        new_location: Optional[str] = None
+    ) -> str:
+        """Find a single event matching ``event_query`` and update it."""
+        match, message = self._match_one(event_query)
+        if match is None:
+            return message
+
+        # Send only the fields that change
+        changes: Dict[str, Any] = {}
+        if new_title:
+            changes['summary'] = new_title
+        if new_description is not None:  # Allow empty string
+            changes['description'] = new_description
+        if new_location is not None:  # Allow empty string
+            changes['location'] = new_location
+
+        if new_start_time:
+            start_dt = parse_time(new_start_time, 'new start time')
+            changes['start'] = _event_time(match, start_dt)
+
+        if new_end_time:
+            end_dt = parse_time(new_end_time, 'new end time')
+            changes['end'] = _event_time(match, end_dt)
+
+        title = changes.get('summary', match.summary or 'Untitled Event')
+        if not changes:
+            return f"✅ Event '{title}' updated successfully!"
+
+        if self._writes is not None:
+            self._writes.submit('patch', match.id, changes, match.etag)
+            self._cache.put(match.patched(changes))
+            return f"✅ Event '{title}' updated successfully! (saving to Google in the background)"
+
+        service = self._get_service()
+        request = service.events().patch(calendarId='primary', eventId=match.id, body=changes)
+        if match.etag:
+            # Fail rather than overwrite a change made since the event was read
+            request.headers['If-Match'] = match.etag
+        try:
+            updated_event = self._execute(request, 'events.patch')
+        except HttpError as error:
+            if error.resp.status != 412:
+                raise
+            current = self._execute(
+                service.events().get(calendarId='primary', eventId=match.id), 'events.get'
+            )
+            self._cache.apply(current)
+            return (f"Event '{match.summary or 'Untitled Event'}' was changed elsewhere "
+                    "since it was read, so it was not updated. Please try again.")
+        self._cache.apply(updated_event)
+
+        return f"✅ Event '{title}' updated successfully!"
+
+    def delete_event(self, event_query: str) -> str:
+        """Find a single event matching ``event_query`` and delete it."""
+        event, message = self._match_one(event_query)
+        if event is None:
+            return message
+
+        event_title = event.summary or 'Untitled Event'
+
+        if self._writes is not None:
+            self._writes.submit('delete', event.id)
+            self._cache.remove(event.id)
+            return f"✅ Event '{event_title}' deleted successfully! (saving to Google in the background)"
+
+        service = self._get_service()
+        self._execute(
+            service.events().delete(calendarId='primary', eventId=event.id), 'events.delete'
+        )
+        self._cache.remove(event.id)
+
+        return f"✅ Event '{event_title}' deleted successfully!"
+
+    def write_status(self) -> str:
+        """Report writes still waiting to be sent in write-behind mode."""
+        if self._writes is None:
+            if self._writes_unavailable is not None:
+                return (f"⚠️ Write-behind is off: {self._writes_unavailable}. "
+                        "Changes are saved to Google before each tool returns.")
+            return "Write-behind is off; changes are saved to Google before each tool returns."
+        return self._writes.status()
+
+    def find_duplicates(self, days_back: int = 30, days_ahead: int = 365,
+                        delete: bool = False) -> str:
+        """Find events that are copies of another event, optionally deleting them.
+
+        One pass over the range groups events by :func:`_duplicate_key`; in
+        each group the earliest created event is kept and the rest are
+        duplicates. With ``delete`` those are deleted in batches, each
+        guarded by its ETag. Recurring event instances are left out, since
+        deleting one would only cancel that occurrence. If the call's
+        deadline passes, the events read so far are checked.
+        """
+        if delete:
+            self._send_pending_writes()
+        now = time.time()
+        kept: Dict[Tuple, Tuple[str, EventRecord]] = {}
+        copies: Dict[Tuple, List[EventRecord]] = {}
+        pages = _UntilDeadline(self._iter_pages(
+            timeMin=rfc3339(now - days_back * 86400),
+            timeMax=rfc3339(now + days_ahead * 86400),
+        ))
+        scanned = 0
+        with tracing.span('duplicates.scan'):
+            for page in pages:
+                scanned += len(page)
+                for item in page:
+                    if item.get('recurringEventId') or item.get('status') == 'cancelled':
+                        continue
+                    event = EventRecord.from_api(item)
+                    key = _duplicate_key(event)
+                    created = item.get('created', '')
+                    first = kept.get(key)
+                    if first is None:
+                        kept[key] = (created, event)
+                        continue
+                    if created < first[0]:
+                        kept[key], event = (created, event), first[1]
+                    copies.setdefault(key, []).append(event)
+
+        duplicates = [event for group in copies.values() for event in group]
+        partial = ("\\n⏱️ Stopped at the time limit after checking "
+                   f"{scanned} events; run again to check the rest.") if pages.stopped else ""
+        if not duplicates:
+            return f"No duplicate events found among {scanned} events.{partial}"
+
+        if not delete:
+            result = (f"Found {len(duplicates)} duplicate events, copies of "
+                      f"{len(copies)} events:\\n\\n")
+            groups = sorted(copies.items(), key=lambda group: group[0][1])
+            for key, group in groups[:20]:
+                event = kept[key][1]
+                result += (f"• {event.summary or 'No title'}: "
+                           f"{_format_move(event, _shifted(event, event.start, timedelta(0)))} "
+                           f"({len(group) + 1} copies)\\n")
+            if len(groups) > 20:
+                result += f"… and {len(groups) - 20} more\\n"
+            result += "Run again with delete to remove the copies, keeping the earliest created of each."
+            return result + partial
+
+        service = self._get_service()
+        deleted, errors, unsent = 0, [], 0
+        for index in range(0, len(duplicates), BATCH_SIZE):
+            if deadline.expired():
+                unsent = len(duplicates) - index
+                break
+            chunk = duplicates[index:index + BATCH_SIZE]
+            requests = []
+            for event in chunk:
+                request = service.events().delete(calendarId='primary', eventId=event.id)
+                if event.etag:
+                    request.headers['If-Match'] = event.etag
+                requests.append(request)
+            try:
+                with tracing.span('duplicates.delete', events=len(requests)):
+                    results = self._execute_batch(requests, 'events.delete')
+            except DeadlineExceededError:
+                unsent = len(duplicates) - index
+                break
+            for event, (_, error) in zip(chunk, results):
+                status = error.resp.status if isinstance(error, HttpError) else None
+                if error is None or status in (404, 410):
+                    self._cache.remove(event.id)
+                    deleted += 1
+                elif status == 412:
+                    errors.append(f"'{event.summary or 'No title'}' was changed elsewhere since it was read")
+                else:
+                    errors.append(f"'{event.summary or 'No title'}': {error}")
+        result = f"🧹 Deleted {deleted} duplicate events, keeping one of each of {len(copies)} events"
+        if errors:
+            result += f"\\n⚠️ {len(errors)} duplicates could not be deleted. First error: {errors[0]}"
+        if unsent:
+            result += (f"\\n⏱️ Stopped at the time limit before {unsent} duplicates were "
+                       "confirmed as deleted; run again to finish.")
+        return result + partial
+
+    def _select_events(self, start: datetime, end: datetime,
+                       query: Optional[str]) -> List[EventRecord]:
+        """Events starting in ``[start, end)`` that match ``query``, by start time.
+
+        ``start`` and ``end`` must be time-zone aware. Served from the event cache when it covers the range, otherwise listed.
+        """
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        terms = query.lower().split() if query else []
+        if self._cache.enabled and self._cache.covers(start_ts, end_ts):
+            if not self._cache.fresh():
+                self._sync()
+            events = self._cache.between(start_ts, end_ts)
+            events = [event for event in events if not terms or event.matches(terms)]
+        else:
+            params = {'q': query} if query else {}
+            events = [EventRecord.from_api(event) for event in self._list_all(
+                timeMin=rfc3339(start_ts), timeMax=rfc3339(end_ts), orderBy='startTime', **params)]
+
+        def starts_in_range(event: EventRecord) -> bool:
+            if event.all_day:
+                # An all-day event starts at local midnight of its date
+                day = datetime.fromtimestamp(event.start, tz.UTC).date()
+                midnight = datetime.combine(day, datetime.min.time(), start.tzinfo)
+                return start_ts <= midnight.timestamp() < end_ts
+            return start_ts <= event.start < end_ts
+        return [event for event in events if starts_in_range(event)]
+
+    def shift_events(
+        self,
+        range_start: str,
+        range_end: Optional[str] = None,
+        query: Optional[str] = None,
+        days: int = 0,
+        hours: int = 0,
+        minutes: int = 0,
+        dry_run: bool = False
+    ) -> str:
+        """Move every event starting in a range (and matching ``query``) by an offset.
+
+        Events are patched in batches, each guarded by its ETag. All-day
+        events only move by whole days. With ``dry_run`` nothing is changed
+        and the planned moves are listed instead. Events not confirmed as moved
+        when the call's deadline passes are reported.
+        """
+        offset = timedelta(days=days, hours=hours, minutes=minutes)
+        if not offset:
+            raise InvalidInputError("Give a non-zero offset in days, hours or minutes.")
+        start = parse_time(range_start, 'range start')
+        end = parse_time(range_end, 'range end') if range_end else start + timedelta(days=1)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=tz.gettz('America/New_York'))
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=tz.gettz('America/New_York'))
+        if end <= start:
+            raise InvalidInputError("The range end must be after the range start.")
+
+        if not dry_run:
+            self._send_pending_writes()
+        selected = self._select_events(start, end, query)
+        whole_days = offset % timedelta(days=1) == timedelta(0)
+        events = [event for event in selected if whole_days or not event.all_day]
+        skipped = len(selected) - len(events)
+        matching = f" matching '{query}'" if query else ""
+        if not events:
+            return (f"No events{matching} found starting between "
+                    f"{start:%Y-%m-%d %I:%M %p} and {end:%Y-%m-%d %I:%M %p}.")
+
+        moves = [(event, _shifted(event, event.start, offset), _shifted(event, event.end, offset))
+                 for event in events]
+        if dry_run:
+            result = f"Would move {len(moves)} events{matching} {_describe_offset(offset)}:\\n\\n"
+            for event, new_start, _ in moves[:20]:
+                current = _shifted(event, event.start, timedelta(0))
+                result += (f"• {event.summary or 'No title'}: {_format_move(event, current)} → "
+                           f"{_format_move(event, new_start)}\\n")
+            if len(moves) > 20:
+                result += f"… and {len(moves) - 20} more\\n"
+        else:
+            service = self._get_service()
+            moved, errors, unsent = 0, [], 0
+            for index in range(0, len(moves), BATCH_SIZE):
+                if deadline.expired():
+                    unsent = len(moves) - index
+                    break
+                requests = []
+                for event, new_start, new_end in moves[index:index + BATCH_SIZE]:
+                    request = service.events().patch(
+                        calendarId='primary', eventId=event.id,
+                        body={'start': _event_time(event, new_start), 'end': _event_time(event, new_end)})
+                    if event.etag:
+                        request.headers['If-Match'] = event.etag
+                    requests.append(request)
+                try:
+                    with tracing.span('shift.batch', events=len(requests)):
+                        results = self._execute_batch(requests, 'events.patch')
+                except DeadlineExceededError:
+                    unsent = len(moves) - index
+                    break
+                for (event, _, _), (response, error) in zip(moves[index:index + BATCH_SIZE], results):
+                    if error is None:
+                        self._cache.apply(response)
+                        moved += 1
+                    elif isinstance(error, HttpError) and error.resp.status == 412:
+                        errors.append(f"'{event.summary or 'No title'}' was changed elsewhere since it was read")
+                    else:
+                        errors.append(f"'{event.summary or 'No title'}': {error}")
+            result = f"✅ Moved {moved} events{matching} {_describe_offset(offset)}"
+            if errors:
+                result += f"\\n⚠️ {len(errors)} events could not be moved. First error: {errors[0]}"
+            if unsent:
+                result += (f"\\n⏱️ Stopped at the time limit before {unsent} events were "
+                           "confirmed as moved; list them before shifting again.")
+        if skipped:
+            result += f"\\nℹ️ {skipped} all-day events were left in place (they only move by whole days)."
+        return result
@@ -0,0 +1,25 @@
+"""Exceptions raised by the calendar engine.
+
+``toolkit.py`` and ``mcp_server.py`` translate these into their own error
+conventions. They are also importable from ``goose_calendar.engine``.
+"""
+
+
+class CalendarError(Exception):
+    """Base class for errors raised by the calendar engine."""
+
+
+class InvalidInputError(CalendarError):
+    """A tool argument could not be understood (e.g. an unparseable date)."""
+
+
+class AuthenticationError(CalendarError):
+    """Google OAuth authentication failed."""
+
+
+class ApiUnavailableError(CalendarError):
+    """Google Calendar keeps failing, so requests are not being sent for now."""
+
+
+class DeadlineExceededError(CalendarError):
+    """The tool call ran out of time, or the client cancelled it."""
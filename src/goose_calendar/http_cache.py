@@ -0,0 +1,111 @@
+"""Conditional-request cache for Calendar API reads.
+
+:class:`ResponseCache` is an httplib2 cache: given one, httplib2 stores GET
+responses with their ETags and revalidates them with ``If-None-Match``, so an
+unchanged response comes back as an empty ``304 Not Modified`` and is served
+from the stored copy. The cache additionally remembers the decoded JSON for
+each stored response, so revalidated responses are not parsed again.
+
+Entries are evicted least-recently-used first once the cache exceeds its
+byte or entry budget. A decoded body counts against the byte budget as
+:data:`DECODED_BYTES_PER_BYTE` times the size of its stored response, a
+rough measure of what the parsed objects take in memory. One cache is
+shared by all of an engine's per-thread HTTP clients.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from . import metrics
+
+# Estimated bytes of Python objects per byte of JSON they were decoded from.
+DECODED_BYTES_PER_BYTE = 4
+
+
+class ResponseCache:
+    """Bounded, thread-safe LRU store implementing httplib2's cache interface.
+
+    Args:
+        max_bytes: Largest total size of stored responses and their decoded bodies.
+        max_entries: Most responses kept at once.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, max_entries: int = 512):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._decoded: Dict[str, Tuple[str, Any, int]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    # httplib2 cache interface
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._size -= len(value)
+        decoded = self._decoded.pop(key, None)
+        if decoded is not None:
+            self._size -= decoded[2]
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            metrics.CACHE_REQUESTS.inc(cache='http', result='evicted')
+
+    # Decoded responses
+
+    def decoded(self, key: str, etag: str) -> Optional[Any]:
+        """Previously decoded body of the response stored under ``key`` with ``etag``."""
+        with self._lock:
+            entry = self._decoded.get(key)
+            return entry[1] if entry is not None and entry[0] == etag else None
+
+    def remember_decoded(self, key: str, etag: str, value: Any) -> None:
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is None:
+                return
+            previous = self._decoded.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            estimate = len(raw) * DECODED_BYTES_PER_BYTE
+            self._decoded[key] = (etag, value, estimate)
+            self._size += estimate
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        """Total bytes of stored responses and estimated bytes of decoded bodies."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        # httplib2 tests ``if self.cache``; an empty cache must still count
+        return True
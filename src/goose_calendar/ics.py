@@ -0,0 +1,258 @@
+"""Streaming iCalendar (RFC 5545) reading and writing.
+
+:func:`read_events` turns the lines of an ``.ics`` file into Calendar API
+event bodies one VEVENT at a time, and :func:`write_calendar` writes event
+resources out as they are produced, so neither direction holds a whole
+calendar in memory.
+
+Times with a ``TZID`` are kept in that zone (Google accepts IANA names); no
+VTIMEZONE components are read or written.
+"""
+
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dateutil import tz
+
+RECURRENCE_PROPERTIES = ('RRULE', 'EXRULE', 'RDATE', 'EXDATE')
+_DURATION = re.compile(
+    r'^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+)
+
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join folded content lines (continuations start with a space or tab)."""
+    current: Optional[str] = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split ``NAME;PARAM=x:value`` into its name, parameters and value."""
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ':' and not in_quotes:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        head, value = line, ''
+
+    name, *raw_params = head.split(';')
+    params = {}
+    for raw in raw_params:
+        key, _, param_value = raw.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r'\\([\\;,nN])', lambda m: '\n' if m.group(1) in 'nN' else m.group(1), text)
+
+
+def _escape(text: str) -> str:
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid DURATION: {value}")
+    parts = {key: int(amount or 0) for key, amount in match.groupdict().items() if key != 'sign'}
+    duration = timedelta(**parts)
+    return -duration if match.group('sign') == '-' else duration
+
+
+def _parse_time(value: str, params: Dict[str, str], default_time_zone: str) -> Dict[str, str]:
+    """Convert an iCalendar DATE or DATE-TIME into a Calendar API time object."""
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return {'date': datetime.strptime(value, '%Y%m%d').date().isoformat()}
+    if value.endswith('Z'):
+        moment = datetime.strptime(value[:-1], '%Y%m%dT%H%M%S')
+        return {'dateTime': moment.isoformat() + 'Z'}
+    moment = datetime.strptime(value, '%Y%m%dT%H%M%S')
+    return {'dateTime': moment.isoformat(), 'timeZone': params.get('TZID', default_time_zone)}
+
+
+def _shift(time: Dict[str, str], delta: timedelta) -> Dict[str, str]:
+    """A time object ``delta`` later than ``time``, in the same form."""
+    if 'date' in time:
+        day = datetime.strptime(time['date'], '%Y-%m-%d') + delta
+        return {'date': day.date().isoformat()}
+    shifted = dict(time)
+    utc = time['dateTime'].endswith('Z')
+    moment = datetime.fromisoformat(time['dateTime'].rstrip('Z')) + delta
+    shifted['dateTime'] = moment.isoformat() + ('Z' if utc else '')
+    return shifted
+
+
+def _person(value: str, params: Dict[str, str]) -> Dict[str, str]:
+    person = {'email': re.sub(r'^mailto:', '', value, flags=re.IGNORECASE)}
+    if params.get('CN'):
+        person['displayName'] = params['CN']
+    return person
+
+
+def read_events(lines: Iterable[str], default_time_zone: str = 'UTC') -> Iterator[Dict[str, Any]]:
+    """Yield an ``events.import`` body for each VEVENT in ``lines``.
+
+    Floating times (no ``Z`` and no ``TZID``) are placed in the calendar's
+    ``X-WR-TIMEZONE`` or ``default_time_zone``. Events without a UID get a
+    generated ``iCalUID``. Cancelled events and modified instances of
+    recurring events (``RECURRENCE-ID``, which share their series' UID) are
+    skipped.
+    """
+    event: Optional[Dict[str, Any]] = None
+    duration: Optional[timedelta] = None
+    nested = 0
+    overrides = False
+    for line in unfold(lines):
+        name, params, value = split_property(line)
+        if name == 'BEGIN':
+            if value.upper() == 'VEVENT' and event is None:
+                event, duration, nested, overrides = {}, None, 0, False
+            elif event is not None:
+                nested += 1  # e.g. a VALARM inside the event
+            continue
+        if name == 'END' and event is not None:
+            if nested:
+                nested -= 1
+                continue
+            if value.upper() == 'VEVENT':
+                status = event.pop('status', None)
+                if 'start' in event and status != 'cancelled' and not overrides:
+                    if status == 'tentative':
+                        event['status'] = status
+                    if 'end' not in event:
+                        default = timedelta(days=1) if 'date' in event['start'] else timedelta(0)
+                        event['end'] = _shift(event['start'], duration or default)
+                    if 'iCalUID' not in event:
+                        event['iCalUID'] = f"{uuid.uuid4().hex}@goose-calendar"
+                    yield event
+                event = None
+            continue
+        if event is None:
+            if name == 'X-WR-TIMEZONE' and value:
+                default_time_zone = value
+            continue
+        if nested:
+            continue
+
+        if name == 'SUMMARY':
+            event['summary'] = _unescape(value)
+        elif name == 'DESCRIPTION':
+            event['description'] = _unescape(value)
+        elif name == 'LOCATION':
+            event['location'] = _unescape(value)
+        elif name == 'UID':
+            event['iCalUID'] = value
+        elif name == 'DTSTART':
+            event['start'] = _parse_time(value, params, default_time_zone)
+        elif name == 'DTEND':
+            event['end'] = _parse_time(value, params, default_time_zone)
+        elif name == 'DURATION':
+            duration = _parse_duration(value)
+        elif name == 'RECURRENCE-ID':
+            overrides = True
+        elif name in RECURRENCE_PROPERTIES:
+            event.setdefault('recurrence', []).append(line)
+        elif name == 'STATUS':
+            event['status'] = value.lower()
+        elif name == 'TRANSP' and value.upper() == 'TRANSPARENT':
+            event['transparency'] = 'transparent'
+        elif name == 'ORGANIZER':
+            event['organizer'] = _person(value, params)
+        elif name == 'ATTENDEE':
+            event.setdefault('attendees', []).append(_person(value, params))
+
+
+def fold(line: str) -> str:
+    """Fold a content line to 75 octets per physical line, CRLF-terminated."""
+    if len(line.encode('utf-8')) <= 75:
+        return line + '\r\n'
+    parts: List[str] = []
+    current, size = '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def _format_time(name: str, time: Dict[str, str]) -> str:
+    """Render a Calendar API time object as a DTSTART/DTEND-style line."""
+    if 'date' in time:
+        return f"{name};VALUE=DATE:{time['date'].replace('-', '')}"
+    moment = datetime.fromisoformat(time['dateTime'].replace('Z', '+00:00'))
+    zone = time.get('timeZone')
+    zone_info = tz.gettz(zone) if zone else None
+    if zone_info is not None:
+        local = moment.astimezone(zone_info) if moment.tzinfo else moment
+        return f"{name};TZID={zone}:{local.strftime('%Y%m%dT%H%M%S')}"
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return f"{name}:{moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+
+
+def event_lines(event: Dict[str, Any], stamp: str) -> Iterator[str]:
+    """Unfolded content lines of the VEVENT for an event resource."""
+    yield 'BEGIN:VEVENT'
+    yield f"UID:{event.get('iCalUID') or event['id'] + '@google.com'}"
+    yield f"DTSTAMP:{stamp}"
+    yield _format_time('DTSTART', event['start'])
+    if 'end' in event:
+        yield _format_time('DTEND', event['end'])
+    if 'originalStartTime' in event:
+        yield _format_time('RECURRENCE-ID', event['originalStartTime'])
+    yield from event.get('recurrence', [])
+    for field, name in (('summary', 'SUMMARY'), ('description', 'DESCRIPTION'),
+                        ('location', 'LOCATION')):
+        if event.get(field):
+            yield f"{name}:{_escape(event[field])}"
+    if event.get('status') == 'tentative':
+        yield 'STATUS:TENTATIVE'
+    if event.get('transparency') == 'transparent':
+        yield 'TRANSP:TRANSPARENT'
+    people = [('ORGANIZER', event['organizer'])] if event.get('organizer', {}).get('email') else []
+    people += [('ATTENDEE', attendee) for attendee in event.get('attendees', [])
+               if attendee.get('email')]
+    for name, person in people:
+        cn = f';CN="{person["displayName"]}"' if person.get('displayName') else ''
+        yield f"{name}{cn}:mailto:{person['email']}"
+    yield 'END:VEVENT'
+
+
+def write_calendar(events: Iterable[Dict[str, Any]], out: TextIO,
+                   name: Optional[str] = None) -> int:
+    """Write ``events`` to ``out`` as a VCALENDAR and return how many were written."""
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//goose-calendar//EN', 'CALSCALE:GREGORIAN']
+    if name:
+        header.append(f"X-WR-CALNAME:{_escape(name)}")
+    out.writelines(fold(line) for line in header)
+    count = 0
+    for event in events:
+        if event.get('status') == 'cancelled' or 'start' not in event:
+            continue
+        out.writelines(fold(line) for line in event_lines(event, stamp))
+        count += 1
+    out.write(fold('END:VCALENDAR'))
+    return count
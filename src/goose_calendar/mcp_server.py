@@ -1,163 +1,146 @@
 """MCP Server for Google Calendar integration."""
 
+import contextlib
 import os
-import pickle
-from datetime import datetime, timedelta
-from typing import Optional
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import threading
+from typing import Any, Callable, Optional
+
+import anyio
 from googleapiclient.errors import HttpError
-from dateutil import parser as date_parser
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from mcp.shared.exceptions import McpError
 from mcp.types import ErrorData, INTERNAL_ERROR, INVALID_PARAMS
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from . import deadline, metrics, profiling
+from .accounts import AccountTokens, EnginePool
+from .engine import AuthenticationError, CalendarEngine, CalendarError, InvalidInputError
+from .metrics import instrument_tool
 
 # Initialize the MCP server
 mcp = FastMCP("calendar")
 
-class CalendarManager:
-    """Google Calendar manager for MCP server."""
-    
-    def __init__(self):
-        self._service = None
-        self._scopes = ['https://www.googleapis.com/auth/calendar']
-        self._credentials_file = os.path.expanduser('~/credentials.json')
-        self._token_file = os.path.expanduser('~/.goose_calendar_token.pickle')
-
-    def _get_credentials(self) -> Optional[Credentials]:
-        """Get or create Google Calendar API credentials."""
-        creds = None
-        
-        if os.path.exists(self._token_file):
-            with open(self._token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                except Exception:
-                    if os.path.exists(self._token_file):
-                        os.remove(self._token_file)
-                    creds = None
-            
-            if not creds:
-                if not os.path.exists(self._credentials_file):
-                    raise McpError(ErrorData(
-                        INVALID_PARAMS,
-                        f"Credentials file not found at {self._credentials_file}. "
-                        "Please download OAuth 2.0 credentials from Google Cloud Console."
-                    ))
-                
-                try:
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        self._credentials_file, self._scopes
-                    )
-                    creds = flow.run_local_server(port=0)
-                except Exception as e:
-                    if "access_denied" in str(e):
-                        raise McpError(ErrorData(
-                            INTERNAL_ERROR,
-                            "Error 403: access_denied - Your app needs Google verification. "
-                            "Add your email as a test user in Google Cloud Console OAuth consent screen."
-                        ))
-                    raise McpError(ErrorData(INTERNAL_ERROR, f"Authentication failed: {e}"))
-            
-            with open(self._token_file, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        return creds
-
-    def _get_service(self):
-        """Get the Google Calendar service."""
-        if self._service is None:
-            creds = self._get_credentials()
-            self._service = build('calendar', 'v3', credentials=creds)
-        return self._service
-
-# Initialize calendar manager
-calendar_manager = CalendarManager()
+# Initialize calendar engine; other accounts get pooled engines of their own
+calendar_manager = CalendarEngine()
+engines = EnginePool.from_environment(default_engine=calendar_manager)
+account_tokens = AccountTokens.from_environment()
+
+
+@contextlib.contextmanager
+def _tool_errors():
+    """Translate engine and Google API errors into MCP errors."""
+    try:
+        yield
+    except McpError:
+        raise
+    except (InvalidInputError, FileNotFoundError) as error:
+        raise McpError(ErrorData(code=INVALID_PARAMS, message=str(error)))
+    except (AuthenticationError, CalendarError) as error:
+        raise McpError(ErrorData(code=INTERNAL_ERROR, message=str(error)))
+    except HttpError as error:
+        raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Google Calendar API error: {error}"))
+    except Exception as error:
+        raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Unexpected error: {error}"))
+
+def _request_account() -> Optional[str]:
+    """Account for the current tool call.
+
+    A stdio server serves the local user's ``GOOSE_CALENDAR_ACCOUNT`` (or the
+    default account). Over HTTP, when ``GOOSE_CALENDAR_ACCOUNT_TOKENS`` is
+    configured, the account is the one the client's bearer token was issued
+    for; otherwise every client gets the default account.
+
+    Raises:
+        AuthenticationError: An HTTP client sent no bearer token, or an unknown one.
+    """
+    try:
+        request = mcp.get_context().request_context.request
+    except ValueError:
+        request = None
+    if request is None:
+        return os.environ.get('GOOSE_CALENDAR_ACCOUNT')
+    if not account_tokens:
+        return None
+    account = _bearer_account(request)
+    if account is None:
+        raise AuthenticationError("This server needs an Authorization: Bearer token issued "
+                                  "for your calendar account.")
+    return account
+
+def _bearer_account(request: Request) -> Optional[str]:
+    """Account of the request's ``Authorization: Bearer`` token, if it is a known one."""
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    return account_tokens.account(token.strip()) if scheme.lower() == 'bearer' else None
+
+async def _call(operation: str, *args: Any) -> str:
+    """Run a blocking engine operation on a worker thread.
+
+    Keeps the event loop free so concurrent tool calls (and, over HTTP,
+    concurrent clients) are not serialized behind one Google round trip.
+    The call runs under a deadline; if the client cancels it, the call
+    returns at once and the worker stops at its next deadline check.
+    """
+    with _tool_errors():
+        engine = engines.get(_request_account())
+    method: Callable[..., str] = getattr(engine, operation)
+    limit = deadline.for_operation(operation)
+
+    def run():
+        with _tool_errors(), deadline.bound(limit), profiling.profiled(operation):
+            return method(*args)
+    try:
+        return await anyio.to_thread.run_sync(run, abandon_on_cancel=True)
+    except anyio.get_cancelled_exc_class():
+        limit.cancel()
+        raise
 
 @mcp.tool()
-def list_events(days_ahead: int = 7, max_results: int = 10) -> str:
+@instrument_tool('mcp')
+async def list_events(days_ahead: int = 7, max_results: int = 10) -> str:
     """
     List upcoming calendar events.
-    
+
     Args:
         days_ahead: Number of days ahead to look for events (default: 7)
         max_results: Maximum number of events to return (default: 10)
-        
+
     Returns:
         String containing formatted list of events
     """
-    try:
-        service = calendar_manager._get_service()
-        
-        now = datetime.utcnow().isoformat() + 'Z'
-        end_time = (datetime.utcnow() + timedelta(days=days_ahead)).isoformat() + 'Z'
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            timeMax=end_time,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        if not events:
-            return f"No upcoming events found in the next {days_ahead} days."
-        
-        result = f"Upcoming events (next {days_ahead} days):\\n\\n"
-        
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            summary = event.get('summary', 'No title')
-            
-            if 'T' in start:  # Has time
-                dt = date_parser.parse(start)
-                formatted_time = dt.strftime('%Y-%m-%d at %I:%M %p')
-            else:  # All-day event
-                dt = date_parser.parse(start)
-                formatted_time = dt.strftime('%Y-%m-%d (All day)')
-            
-            location = event.get('location', '')
-            description = event.get('description', '')
-            
-            result += f"📅 **{summary}**\\n"
-            result += f"   🕒 {formatted_time}\\n"
-            if location:
-                result += f"   📍 {location}\\n"
-            if description:
-                result += f"   📝 {description[:100]}{'...' if len(description) > 100 else ''}\\n"
-            result += "\\n"
-        
-        return result
-        
-    except McpError:
-        raise
-    except HttpError as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Google Calendar API error: {error}"))
-    except Exception as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Unexpected error: {error}"))
+    return await _call('list_events', days_ahead, max_results)
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def find_events_with(person: str, days_ahead: int = 14, max_results: int = 10) -> str:
+    """
+    List upcoming events that a person organizes or attends, e.g. to find the
+    next meeting with someone.
+
+    Args:
+        person: Email address or name of the person
+        days_ahead: Number of days to look ahead (default: 14)
+        max_results: Maximum number of events to return (default: 10)
+
+    Returns:
+        String listing the events with their organizer and attendees
+    """
+    return await _call('find_events_with', person, days_ahead, max_results)
 
 @mcp.tool()
-def add_event(
+@instrument_tool('mcp')
+async def add_event(
     title: str,
     start_time: str,
     end_time: Optional[str] = None,
     description: Optional[str] = None,
     location: Optional[str] = None,
-    all_day: bool = False
+    all_day: bool = False,
+    event_id: Optional[str] = None
 ) -> str:
     """
     Add a new calendar event.
-    
+
     Args:
         title: Event title/summary
         start_time: Start time in natural language or ISO format
@@ -165,60 +148,19 @@ def add_event(
         description: Event description (optional)
         location: Event location (optional)
         all_day: Whether this is an all-day event (default: False)
-        
+        event_id: Your own ID for the event, 5-1024 characters of a-v and 0-9 (optional).
+            Retrying with the same ID never creates a second copy.
+
     Returns:
         String confirming event creation
     """
-    try:
-        service = calendar_manager._get_service()
-        
-        # Parse start time
-        try:
-            start_dt = date_parser.parse(start_time)
-        except Exception:
-            raise McpError(ErrorData(INVALID_PARAMS, f"Could not parse start time: {start_time}"))
-        
-        # Parse end time or set default
-        if end_time:
-            try:
-                end_dt = date_parser.parse(end_time)
-            except Exception:
-                raise McpError(ErrorData(INVALID_PARAMS, f"Could not parse end time: {end_time}"))
-        else:
-            if all_day:
-                end_dt = start_dt
-            else:
-                end_dt = start_dt + timedelta(hours=1)
-        
-        # Create event object
-        event = {'summary': title}
-        
-        if all_day:
-            event['start'] = {'date': start_dt.date().isoformat()}
-            event['end'] = {'date': end_dt.date().isoformat()}
-        else:
-            event['start'] = {'dateTime': start_dt.isoformat(), 'timeZone': 'America/New_York'}
-            event['end'] = {'dateTime': end_dt.isoformat(), 'timeZone': 'America/New_York'}
-        
-        if description:
-            event['description'] = description
-        if location:
-            event['location'] = location
-        
-        # Create the event
-        created_event = service.events().insert(calendarId='primary', body=event).execute()
-        
-        return f"✅ Event '{title}' created successfully! Event ID: {created_event['id']}"
-        
-    except McpError:
-        raise
-    except HttpError as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Google Calendar API error: {error}"))
-    except Exception as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Unexpected error: {error}"))
+    return await _call(
+        'add_event', title, start_time, end_time, description, location, all_day, event_id
+    )
 
 @mcp.tool()
-def edit_event(
+@instrument_tool('mcp')
+async def edit_event(
     event_query: str,
     new_title: Optional[str] = None,
     new_start_time: Optional[str] = None,
@@ -228,149 +170,267 @@ def edit_event(
 ) -> str:
     """
     Edit an existing calendar event.
-    
+
     Args:
         event_query: Search query to find the event (title, date, etc.)
         new_title: New event title (optional)
         new_start_time: New start time (optional)
-        new_end_time: New end time (optional)  
+        new_end_time: New end time (optional)
         new_description: New description (optional)
         new_location: New location (optional)
-        
+
     Returns:
         String confirming event update
     """
-    try:
-        service = calendar_manager._get_service()
-        
-        # Search for events
-        now = datetime.utcnow().isoformat() + 'Z'
-        future = (datetime.utcnow() + timedelta(days=365)).isoformat() + 'Z'
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            timeMax=future,
-            q=event_query,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        if not events:
-            return f"No events found matching '{event_query}'"
-        
-        if len(events) > 1:
-            result = f"Multiple events found matching '{event_query}'. Please be more specific:\\n\\n"
-            for i, event in enumerate(events[:5], 1):
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                summary = event.get('summary', 'No title')
-                result += f"{i}. {summary} ({start})\\n"
-            return result
-        
-        # Edit the found event
-        event = events[0]
-        event_id = event['id']
-        
-        if new_title:
-            event['summary'] = new_title
-        if new_description is not None:
-            event['description'] = new_description
-        if new_location is not None:
-            event['location'] = new_location
-        
-        if new_start_time:
-            try:
-                start_dt = date_parser.parse(new_start_time)
-                if 'date' in event['start']:
-                    event['start']['date'] = start_dt.date().isoformat()
-                else:
-                    event['start']['dateTime'] = start_dt.isoformat()
-            except Exception:
-                raise McpError(ErrorData(INVALID_PARAMS, f"Could not parse new start time: {new_start_time}"))
-        
-        if new_end_time:
-            try:
-                end_dt = date_parser.parse(new_end_time)
-                if 'date' in event['end']:
-                    event['end']['date'] = end_dt.date().isoformat()
-                else:
-                    event['end']['dateTime'] = end_dt.isoformat()
-            except Exception:
-                raise McpError(ErrorData(INVALID_PARAMS, f"Could not parse new end time: {new_end_time}"))
-        
-        # Update the event
-        service.events().update(
-            calendarId='primary',
-            eventId=event_id,
-            body=event
-        ).execute()
-        
-        return f"✅ Event '{event['summary']}' updated successfully!"
-        
-    except McpError:
-        raise
-    except HttpError as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Google Calendar API error: {error}"))
-    except Exception as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Unexpected error: {error}"))
+    return await _call(
+        'edit_event', event_query, new_title, new_start_time,
+        new_end_time, new_description, new_location
+    )
 
 @mcp.tool()
-def delete_event(event_query: str) -> str:
+@instrument_tool('mcp')
+async def delete_event(event_query: str) -> str:
     """
     Delete a calendar event.
-    
+
     Args:
         event_query: Search query to find the event to delete
-        
+
     Returns:
         String confirming event deletion
     """
-    try:
-        service = calendar_manager._get_service()
-        
-        # Search for events
-        now = datetime.utcnow().isoformat() + 'Z'
-        future = (datetime.utcnow() + timedelta(days=365)).isoformat() + 'Z'
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            timeMax=future,
-            q=event_query,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        if not events:
-            return f"No events found matching '{event_query}'"
-        
-        if len(events) > 1:
-            result = f"Multiple events found matching '{event_query}'. Please be more specific:\\n\\n"
-            for i, event in enumerate(events[:5], 1):
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                summary = event.get('summary', 'No title')
-                result += f"{i}. {summary} ({start})\\n"
-            return result
-        
-        # Delete the found event
-        event = events[0]
-        event_id = event['id']
-        event_title = event.get('summary', 'Untitled Event')
-        
-        service.events().delete(calendarId='primary', eventId=event_id).execute()
-        
-        return f"✅ Event '{event_title}' deleted successfully!"
-        
-    except McpError:
-        raise
-    except HttpError as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Google Calendar API error: {error}"))
-    except Exception as error:
-        raise McpError(ErrorData(INTERNAL_ERROR, f"Unexpected error: {error}"))
+    return await _call('delete_event', event_query)
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def shift_events(
+    range_start: str,
+    range_end: Optional[str] = None,
+    query: Optional[str] = None,
+    days: int = 0,
+    hours: int = 0,
+    minutes: int = 0,
+    dry_run: bool = False
+) -> str:
+    """
+    Move all events starting in a time range (optionally only those matching a
+    query) earlier or later by the same offset, in one call.
+
+    Args:
+        range_start: Start of the range, e.g. 2025-07-03 or 2025-07-03T12:00
+        range_end: End of the range (optional, default: one day after range_start)
+        query: Only move events whose title, description, location or attendees match (optional)
+        days: Days to move by; negative moves earlier (default: 0)
+        hours: Hours to move by (default: 0)
+        minutes: Minutes to move by (default: 0)
+        dry_run: List the planned moves without changing anything (default: false)
+
+    Returns:
+        String listing or confirming the moved events
+    """
+    return await _call('shift_events', range_start, range_end, query, days, hours, minutes, dry_run)
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def find_duplicates(days_back: int = 30, days_ahead: int = 365, delete: bool = False) -> str:
+    """
+    Find events that are copies of another event (same title, times and
+    location), e.g. left by retried inserts, and optionally delete the copies.
+
+    Args:
+        days_back: Days in the past to check (default: 30)
+        days_ahead: Days in the future to check (default: 365)
+        delete: Delete the copies, keeping the earliest created of each event (default: false)
+
+    Returns:
+        String listing the duplicates found, or confirming their deletion
+    """
+    return await _call('find_duplicates', days_back, days_ahead, delete)
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def write_status() -> str:
+    """
+    Show whether recent changes have been saved to Google Calendar yet
+    (write-behind mode), and any changes Google rejected.
+
+    Returns:
+        String describing pending and failed writes
+    """
+    return await _call('write_status')
+
+def _progress_reporter(ctx: Optional[Context]) -> Optional[Callable[[float, Optional[float], str], None]]:
+    """Forward engine progress from a worker thread as MCP progress notifications."""
+    if ctx is None:
+        return None
+
+    def report(done: float, total: Optional[float], message: str) -> None:
+        anyio.from_thread.run(ctx.report_progress, done, total, message)
+    return report
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def import_ics(path: str, ctx: Optional[Context] = None) -> str:
+    """
+    Import all events from an iCalendar (.ics) file into the calendar.
+
+    Args:
+        path: Path to the .ics file on the machine running the server
+
+    Returns:
+        String summarizing how many events were imported
+    """
+    return await _call('import_ics', path, _progress_reporter(ctx))
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def export_ics(
+    path: str,
+    days_back: int = 365,
+    days_ahead: int = 365,
+    ctx: Optional[Context] = None
+) -> str:
+    """
+    Export calendar events to an iCalendar (.ics) file.
+
+    Args:
+        path: Path of the .ics file to write on the machine running the server
+        days_back: Number of past days to include (default: 365)
+        days_ahead: Number of future days to include (default: 365)
+
+    Returns:
+        String summarizing how many events were exported
+    """
+    return await _call('export_ics', path, days_back, days_ahead, _progress_reporter(ctx))
+
+@mcp.tool()
+@instrument_tool('mcp')
+async def calendar_analytics(
+    days_back: int = 90,
+    days_ahead: int = 0,
+    time_zone: str = 'America/New_York',
+    export_path: Optional[str] = None
+) -> str:
+    """
+    Summarize calendar load: meeting hours per week, busiest weekdays and days,
+    and how much time goes to recurring events.
+
+    Args:
+        days_back: Number of past days to analyze (default: 90)
+        days_ahead: Number of future days to include (default: 0)
+        time_zone: IANA time zone used for days and weeks (default: America/New_York)
+        export_path: Optional .npz file to save the event columns to
+
+    Returns:
+        String containing the aggregated statistics
+    """
+    return await _call('calendar_analytics', days_back, days_ahead, time_zone, export_path)
+
+@mcp.tool()
+def calendar_metrics(format: str = 'prometheus') -> str:
+    """
+    Report tool latency, Google API call and cache metrics for this server.
+
+    Args:
+        format: 'prometheus' for Prometheus text format or 'json' (default: prometheus)
+
+    Returns:
+        String containing the current metrics
+    """
+    if format == 'json':
+        return metrics.REGISTRY.render_json()
+    if format != 'prometheus':
+        raise McpError(ErrorData(code=INVALID_PARAMS, message=f"Unknown metrics format: {format}"))
+    return metrics.REGISTRY.render_prometheus()
+
+# The tools whose calls run through _call, and so through profiling.profiled
+PROFILED_TOOLS = frozenset({
+    'list_events', 'find_events_with', 'add_event', 'edit_event', 'delete_event',
+    'shift_events', 'find_duplicates', 'write_status', 'import_ics', 'export_ics',
+    'calendar_analytics',
+})
+
+def calendar_profiling(
+    enabled: bool = True,
+    tools: Optional[str] = None,
+    directory: Optional[str] = None,
+    min_seconds: float = 0.0
+) -> str:
+    """
+    Turn CPU and memory profiling of tool calls on or off. Each profiled call
+    writes cProfile statistics, a tracemalloc snapshot and a text summary.
+
+    Args:
+        enabled: Profile calls from now on; false turns profiling off (default: true)
+        tools: Comma-separated tool names to profile, e.g. 'list_events' (default: all tools)
+        directory: Subdirectory of the profile directory (GOOSE_CALENDAR_PROFILE_DIR,
+            or ~/goose_calendar_profiles) to write to (default: the profile directory itself)
+        min_seconds: Only keep profiles of calls taking at least this long (default: 0)
+
+    Returns:
+        String describing the profiling settings now in effect
+    """
+    if not enabled:
+        profiling.configure(profiling.Settings())
+        return profiling.status()
+    root = os.path.realpath(os.path.expanduser(
+        os.environ.get('GOOSE_CALENDAR_PROFILE_DIR') or '~/goose_calendar_profiles'))
+    target = os.path.realpath(os.path.join(root, directory or ''))
+    if os.path.commonpath([root, target]) != root:
+        raise McpError(ErrorData(code=INVALID_PARAMS,
+                                 message=f"Profiles can only be written inside {root}"))
+    selected = frozenset(tool.strip() for tool in (tools or '').split(',') if tool.strip())
+    unknown = sorted(selected - PROFILED_TOOLS)
+    if unknown:
+        raise McpError(ErrorData(code=INVALID_PARAMS, message=f"Unknown tools: {', '.join(unknown)}"))
+    profiling.configure(profiling.Settings(target, selected or None, min_seconds))
+    return profiling.status()
+
+# Profiling writes files and slows every call, so it is only offered to
+# clients when the operator opts in
+if os.environ.get('GOOSE_CALENDAR_ADMIN_TOOLS', '').lower() in ('1', 'true', 'yes'):
+    mcp.tool()(calendar_profiling)
+
+@mcp.custom_route('/metrics', methods=['GET'])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint, served by the HTTP transports.
+
+    When ``GOOSE_CALENDAR_ACCOUNT_TOKENS`` is configured, scrapes need one of
+    its bearer tokens, like every other HTTP request.
+    """
+    if account_tokens and _bearer_account(request) is None:
+        return PlainTextResponse("A bearer token is required.\n", status_code=401,
+                                 headers={'WWW-Authenticate': 'Bearer'})
+    return PlainTextResponse(
+        metrics.REGISTRY.render_prometheus(), media_type='text/plain; version=0.0.4'
+    )
+
+def serve(transport: str = 'stdio', host: str = '127.0.0.1', port: int = 8000,
+          warmup: bool = False) -> None:
+    """Run the MCP server.
+
+    ``stdio`` serves a single client (one process per Goose session).
+    ``streamable-http`` and ``sse`` serve many clients from one long-lived
+    process that shares the engine's service, credentials and caches; each
+    client gets its own MCP session.
+
+    With ``warmup`` the default account's engine authenticates, builds its
+    service and prefetches upcoming events in the background while the
+    transport starts; a tool call arriving early joins that work.
+
+    Over HTTP no account, the default one included, starts the browser
+    sign-in on the server; sign in beforehand with ``goose-calendar login``.
+    """
+    mcp.settings.host = host
+    mcp.settings.port = port
+    if transport != 'stdio':
+        calendar_manager.interactive = False
+    metrics.start_from_environment()
+    if warmup:
+        threading.Thread(
+            target=calendar_manager.warm_up, name='calendar-warmup', daemon=True
+        ).start()
+    mcp.run(transport=transport)
 
 if __name__ == "__main__":
-    mcp.run()
+    serve()
@@ -0,0 +1,320 @@
+"""Lightweight in-process metrics for calendar tools and Google API calls.
+
+Counters and histograms are kept in a module-level registry and can be
+rendered in the Prometheus text exposition format or as JSON. Setting
+``GOOSE_CALENDAR_METRICS_FILE`` starts a background thread that rewrites that
+file every ``GOOSE_CALENDAR_METRICS_INTERVAL`` seconds (default 60); a path
+ending in ``.prom`` gets Prometheus text (for a node_exporter textfile
+collector), anything else gets JSON.
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from . import deadline, tracing
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# HTTP statuses worth retrying for requests that are safe to repeat.
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'PUT', 'PATCH', 'DELETE'})
+
+
+class _Metric:
+    """Base class for a labelled metric family."""
+
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = '') -> str:
+        parts = [f'{name}="{value}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{self._format_labels(key)} {value}"
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [{'labels': dict(zip(self.labelnames, key)), 'value': value}
+                    for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._values.items())
+        for key, (counts, total, count) in items:
+            for bound, bucket in zip(self.buckets, counts):
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{self._format_labels(key, le)} {bucket}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{self._format_labels(key, le)} {count}"
+            yield f"{self.name}_sum{self._format_labels(key)} {total}"
+            yield f"{self.name}_count{self._format_labels(key)} {count}"
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [{
+                'labels': dict(zip(self.labelnames, key)),
+                'buckets': dict(zip(map(str, self.buckets), state[0])),
+                'sum': state[1],
+                'count': state[2],
+            } for key, state in sorted(self._values.items())]
+
+
+class MetricsRegistry:
+    """Collection of metric families with Prometheus and JSON exporters."""
+
+    def __init__(self, prefix: str = 'goose_calendar'):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._dump_thread: Optional[threading.Thread] = None
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(f"{self.prefix}_{name}", help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{self.prefix}_{name}", help, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def reset(self) -> None:
+        """Clear every recorded value (metric definitions are kept)."""
+        for metric in self._metrics.values():
+            with metric._lock:
+                metric._values.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        return {
+            'timestamp': time.time(),
+            'metrics': {name: {'type': metric.kind, 'help': metric.help, 'values': metric.snapshot()}
+                        for name, metric in self._metrics.items()},
+        }
+
+    def render_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path: str) -> None:
+        """Atomically write the current metrics to ``path``."""
+        content = self.render_prometheus() if path.endswith('.prom') else self.render_json()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def start_periodic_dump(self, path: str, interval: float = 60.0) -> None:
+        """Rewrite ``path`` every ``interval`` seconds from a daemon thread."""
+        if self._dump_thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump(path)
+                except OSError:
+                    pass
+
+        self._dump_thread = threading.Thread(target=loop, name='metrics-dump', daemon=True)
+        self._dump_thread.start()
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALLS = REGISTRY.counter(
+    'tool_calls_total', 'Tool invocations by outcome.', ('frontend', 'tool', 'outcome'))
+TOOL_LATENCY = REGISTRY.histogram(
+    'tool_latency_seconds', 'End-to-end tool latency.', ('frontend', 'tool'))
+API_CALLS = REGISTRY.counter(
+    'api_calls_total', 'Google Calendar API calls by HTTP status.', ('method', 'status'))
+API_LATENCY = REGISTRY.histogram(
+    'api_latency_seconds', 'Google Calendar API call latency, including retries.', ('method',))
+API_RESPONSE_BYTES = REGISTRY.histogram(
+    'api_response_bytes', 'Google Calendar API response body size.', ('method',), BYTES_BUCKETS)
+API_RETRIES = REGISTRY.counter(
+    'api_retries_total', 'Google Calendar API calls retried after a transient error.', ('method',))
+CACHE_REQUESTS = REGISTRY.counter(
+    'cache_requests_total', 'Cache lookups by result.', ('cache', 'result'))
+TOKEN_REFRESHES = REGISTRY.counter(
+    'token_refreshes_total', 'OAuth token refreshes by outcome.', ('outcome',))
+TOKEN_REFRESH_LATENCY = REGISTRY.histogram(
+    'token_refresh_seconds', 'OAuth token refresh latency.')
+ACCOUNT_EVICTIONS = REGISTRY.counter(
+    'account_evictions_total', 'Per-account engines dropped from the pool.', ('reason',))
+QUEUED_WRITES = REGISTRY.counter(
+    'queued_writes_total', 'Write-behind operations by outcome.', ('operation', 'result'))
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    'circuit_breaker_transitions_total', 'Circuit breaker state changes.', ('state',))
+BREAKER_REJECTIONS = REGISTRY.counter(
+    'circuit_breaker_rejections_total', 'API calls refused while the circuit breaker was open.')
+
+
+def instrument_tool(frontend: str) -> Callable:
+    """Decorator recording call counts, outcomes and latency for a tool.
+
+    Works for both plain and ``async`` tool functions.
+    """
+    def decorator(fn: Callable) -> Callable:
+        tool = fn.__name__
+
+        @contextlib.contextmanager
+        def observe():
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                with tracing.span(f'tool.{tool}', frontend=frontend):
+                    yield
+                outcome = 'ok'
+            finally:
+                TOOL_LATENCY.observe(time.perf_counter() - started, frontend=frontend, tool=tool)
+                TOOL_CALLS.inc(frontend=frontend, tool=tool, outcome=outcome)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with observe():
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with observe():
+                return fn(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def execute(request, method: str, retries: int = 2, backoff: float = 0.5,
+            http: Optional[httplib2.Http] = None):
+    """Execute a Google API request, recording metrics and retrying transient errors.
+
+    Only idempotent HTTP methods are retried, so an ``events.insert`` that
+    timed out is never sent twice, and only while the current tool call's
+    deadline leaves time for the backoff. ``http`` overrides the client the
+    request was built with (e.g. a per-thread connection).
+    """
+    original_postproc = getattr(request, 'postproc', None)
+    if callable(original_postproc):
+        def postproc(resp, content):
+            # A revalidated (304) response is served from cache: nothing on the wire
+            size = 0 if getattr(resp, 'fromcache', False) else len(content or b'')
+            API_RESPONSE_BYTES.observe(size, method=method)
+            current = tracing.current_span()
+            if current is not None:
+                current.set_attribute('response_bytes', size)
+            return original_postproc(resp, content)
+        request.postproc = postproc
+
+    can_retry = getattr(request, 'method', 'GET') in IDEMPOTENT_METHODS
+    started = time.perf_counter()
+    attempt = 0
+    with tracing.span(f'api.{method}') as current:
+        try:
+            while True:
+                try:
+                    result = request.execute(http=http) if http is not None else request.execute()
+                except HttpError as error:
+                    status = error.resp.status
+                    API_CALLS.inc(method=method, status=str(status))
+                    if current is not None:
+                        current.set_attribute('http.status', status)
+                    delay = backoff * (2 ** attempt)
+                    left = deadline.remaining()
+                    if can_retry and attempt < retries and status in RETRYABLE_STATUSES \
+                            and (left is None or left > delay):
+                        attempt += 1
+                        API_RETRIES.inc(method=method)
+                        if current is not None:
+                            current.set_attribute('retries', attempt)
+                        time.sleep(delay)
+                        continue
+                    raise
+                except Exception:
+                    API_CALLS.inc(method=method, status='exception')
+                    raise
+                API_CALLS.inc(method=method, status='ok')
+                return result
+        finally:
+            API_LATENCY.observe(time.perf_counter() - started, method=method)
+
+
+def start_from_environment() -> None:
+    """Start the periodic metrics dump if ``GOOSE_CALENDAR_METRICS_FILE`` is set."""
+    path = os.environ.get('GOOSE_CALENDAR_METRICS_FILE')
+    if path:
+        interval = float(os.environ.get('GOOSE_CALENDAR_METRICS_INTERVAL', '60'))
+        REGISTRY.start_periodic_dump(os.path.expanduser(path), interval)
@@ -0,0 +1,75 @@
+"""Index of the people on cached events, for people-based lookups.
+
+Maps every attendee and organizer email address, its user name and the
+words of it and of every display name, to the IDs of the cached events
+they appear on. "Meetings with Dana" is then a dictionary lookup per word
+of the query rather than a full-text search of the calendar. The event
+cache keeps the index current as its own writes and delta syncs change
+events.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+from .records import EventRecord
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def person_keys(record: EventRecord) -> Set[str]:
+    """Everything a person on ``record`` may be looked up by, case-folded."""
+    keys: Set[str] = set()
+    for email in (record.organizer, *record.attendees):
+        if email:
+            user = email.split('@', 1)[0]
+            keys.update((email, user), _WORD.findall(user))
+    for name in record.names:
+        keys.update(_WORD.findall(name.casefold()))
+    return keys
+
+
+def query_keys(person: str) -> List[str]:
+    """Keys an event must have to match ``person``: a whole email address,
+    or every word of a name."""
+    person = person.strip().casefold()
+    if '@' in person:
+        return [person]
+    return _WORD.findall(person)
+
+
+def matches(record: EventRecord, person: str) -> bool:
+    """Whether ``person`` is the organizer or an attendee of ``record``."""
+    wanted = query_keys(person)
+    return bool(wanted) and person_keys(record).issuperset(wanted)
+
+
+class PeopleIndex:
+    """Event IDs by :func:`person_keys`. Not thread-safe; the cache guards it."""
+
+    def __init__(self, records: Iterable[EventRecord] = ()):
+        self._ids: Dict[str, Set[str]] = defaultdict(set)
+        for record in records:
+            self.add(record)
+
+    def add(self, record: EventRecord) -> None:
+        for key in person_keys(record):
+            self._ids[key].add(record.id)
+
+    def discard(self, record: EventRecord) -> None:
+        for key in person_keys(record):
+            ids = self._ids.get(key)
+            if ids is not None:
+                ids.discard(record.id)
+                if not ids:
+                    del self._ids[key]
+
+    def find(self, person: str) -> Set[str]:
+        """IDs of the events ``person`` is on."""
+        wanted = query_keys(person)
+        if not wanted:
+            return set()
+        found = set(self._ids.get(wanted[0], ()))
+        for key in wanted[1:]:
+            found &= self._ids.get(key, set())
+        return found
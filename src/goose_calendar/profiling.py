@@ -0,0 +1,146 @@
+"""Opt-in CPU and memory profiling of individual tool calls.
+
+When enabled, selected tool invocations run under :mod:`cProfile` and
+:mod:`tracemalloc`, and each one leaves three files in the profile
+directory, named ``<time>-<tool>-<pid>``:
+
+- ``.prof``: cProfile statistics, for ``python -m pstats`` or snakeviz;
+- ``.tracemalloc``: a tracemalloc snapshot, for ``tracemalloc.Snapshot.load``;
+- ``.txt``: the slowest functions by cumulative time and the lines that
+  allocated the most, with the call's duration and peak traced memory.
+
+Profiling is configured from the environment:
+
+- ``GOOSE_CALENDAR_PROFILE_DIR``: directory to write to; unset disables profiling.
+- ``GOOSE_CALENDAR_PROFILE_TOOLS``: comma-separated tools to profile (default: all).
+- ``GOOSE_CALENDAR_PROFILE_MIN_SECONDS``: only keep calls at least this slow (default 0).
+
+or at run time through the MCP server's ``calendar_profiling`` tool, which
+is registered only with ``GOOSE_CALENDAR_ADMIN_TOOLS`` set and writes only
+inside the profile directory.
+
+Only the thread running the tool is profiled, not the worker threads it
+starts (e.g. the batches of an import), and one call is profiled at a time:
+calls that start while another is being profiled run normally.
+"""
+
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import FrozenSet, Iterator, Optional
+
+# Frames kept per allocation, and rows in the text summary.
+TRACEMALLOC_FRAMES = 10
+SUMMARY_ROWS = 25
+
+
+class Settings:
+    """What to profile and where to write it."""
+
+    def __init__(self, directory: Optional[str] = None, tools: Optional[FrozenSet[str]] = None,
+                 min_seconds: float = 0.0):
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.tools = tools
+        self.min_seconds = min_seconds
+
+    def selects(self, tool: str) -> bool:
+        return self.directory is not None and (not self.tools or tool in self.tools)
+
+
+_settings = Settings()
+# Held while a call is profiled; cProfile and tracemalloc peaks are per process.
+_active = threading.Lock()
+
+
+def configure(settings: Optional[Settings] = None) -> None:
+    """Replace the active settings; ``None`` reads them from the environment."""
+    global _settings
+    if settings is None:
+        tools = os.environ.get('GOOSE_CALENDAR_PROFILE_TOOLS', '')
+        settings = Settings(
+            directory=os.environ.get('GOOSE_CALENDAR_PROFILE_DIR'),
+            tools=frozenset(tool.strip() for tool in tools.split(',') if tool.strip()) or None,
+            min_seconds=float(os.environ.get('GOOSE_CALENDAR_PROFILE_MIN_SECONDS', '0')),
+        )
+    _settings = settings
+
+
+def settings() -> Settings:
+    return _settings
+
+
+def status() -> str:
+    """Describe the profiling settings for the admin tool."""
+    current = _settings
+    if current.directory is None:
+        return "Profiling is off."
+    tools = ', '.join(sorted(current.tools)) if current.tools else "all tools"
+    result = f"Profiling {tools} into {current.directory}"
+    if current.min_seconds:
+        result += f", keeping calls that take at least {current.min_seconds:g}s"
+    return result
+
+
+@contextlib.contextmanager
+def profiled(tool: str) -> Iterator[None]:
+    """Profile the enclosed tool call if the settings select ``tool`` and no
+    other call is being profiled."""
+    current = _settings
+    if not current.selects(tool) or not _active.acquire(blocking=False):
+        yield
+        return
+    try:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            if seconds >= current.min_seconds:
+                _write(current.directory, tool, profiler, snapshot, seconds, peak)
+    finally:
+        _active.release()
+
+
+def _write(directory: str, tool: str, profiler: cProfile.Profile,
+           snapshot: tracemalloc.Snapshot, seconds: float, peak: int) -> None:
+    """Save one call's profile; a failure to write never fails the call."""
+    base = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{tool}-{os.getpid()}")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(base + '.prof')
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ])
+        snapshot.dump(base + '.tracemalloc')
+
+        text = io.StringIO()
+        text.write(f"{tool}: {seconds * 1000:.1f} ms, peak traced memory {peak / 1024:.0f} KiB\n\n")
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(SUMMARY_ROWS)
+        text.write("Top allocations by line:\n")
+        for stat in snapshot.statistics('lineno')[:SUMMARY_ROWS]:
+            text.write(f"{stat}\n")
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+    except OSError:
+        pass
+
+
+configure()
@@ -0,0 +1,145 @@
+"""Compact in-memory representation of calendar events.
+
+The Calendar API returns each event as a nested dict of a dozen or more
+keys. The engine keeps many of them around (the event cache, shared search
+results, the response cache's decoded bodies), so events are reduced once,
+when a response is decoded, to an :class:`EventRecord`: a ``__slots__``
+object holding only what the tools read, with start and end pre-parsed to
+integer epoch seconds and repeated strings (calendar IDs, time zones,
+attendee addresses) interned.
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil import parser as date_parser, tz
+
+
+def _moment(value: Dict[str, str]) -> datetime:
+    """Aware datetime of an event ``start``/``end`` object.
+
+    All-day dates are taken as midnight UTC; naive date-times (as in request
+    bodies built locally) in their ``timeZone``, or else UTC.
+    """
+    moment = date_parser.isoparse(value.get('dateTime') or value['date'])
+    if moment.tzinfo is None:
+        zone = tz.gettz(value['timeZone']) if 'dateTime' in value and value.get('timeZone') else None
+        moment = moment.replace(tzinfo=zone or timezone.utc)
+    return moment
+
+
+def event_bounds(event: Dict[str, Any]) -> Tuple[float, float]:
+    """Return ``(start, end)`` of an API event as epoch seconds."""
+    start = _moment(event['start']).timestamp()
+    end = _moment(event['end']).timestamp() if 'end' in event else start
+    return start, end
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else None
+
+
+class EventRecord:
+    """One calendar event, as read by the cache, search and formatting.
+
+    Records are shared between concurrent callers and must be treated as
+    read-only. ``start``/``end`` are epoch seconds; timed events keep the
+    UTC offset they were returned with so they are shown in that local time.
+    """
+
+    __slots__ = ('id', 'calendar', 'etag', 'summary', 'description', 'location',
+                 'start', 'end', 'all_day', 'utc_offset', 'time_zone',
+                 'recurring_event_id', 'organizer', 'attendees', 'names')
+
+    def __init__(self, id: str, calendar: str, etag: Optional[str], summary: Optional[str],
+                 description: str, location: str, start: int, end: int, all_day: bool,
+                 utc_offset: int, time_zone: Optional[str], recurring_event_id: Optional[str],
+                 organizer: Optional[str], attendees: Tuple[str, ...], names: Tuple[str, ...]):
+        self.id = id
+        self.calendar = calendar
+        self.etag = etag
+        self.summary = summary
+        self.description = description
+        self.location = location
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+        self.utc_offset = utc_offset
+        self.time_zone = time_zone
+        self.recurring_event_id = recurring_event_id
+        self.organizer = organizer
+        self.attendees = attendees
+        self.names = names
+
+    @classmethod
+    def from_api(cls, event: Dict[str, Any], calendar: str = 'primary') -> 'EventRecord':
+        """Build a record from an ``events`` resource."""
+        start = _moment(event['start'])
+        end = _moment(event['end']) if 'end' in event else start
+        organizer = event.get('organizer', {})
+        people = [organizer, *event.get('attendees', ())]
+        return cls(
+            id=event.get('id', ''),
+            calendar=sys.intern(calendar),
+            etag=event.get('etag'),
+            summary=event.get('summary'),
+            description=event.get('description', ''),
+            location=event.get('location', ''),
+            start=int(start.timestamp()),
+            end=int(end.timestamp()),
+            all_day='date' in event['start'],
+            utc_offset=int(start.utcoffset().total_seconds()),
+            time_zone=_intern(event['start'].get('timeZone')),
+            recurring_event_id=event.get('recurringEventId'),
+            organizer=_intern(organizer.get('email', '').lower()),
+            attendees=tuple(sys.intern(person['email'].lower())
+                            for person in event.get('attendees', ()) if person.get('email')),
+            names=tuple(sys.intern(person['displayName'])
+                        for person in people if person.get('displayName')),
+        )
+
+    def patched(self, changes: Dict[str, Any]) -> 'EventRecord':
+        """A copy with an ``events.patch`` body applied, as the API would apply it."""
+        record = EventRecord.__new__(EventRecord)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        record.etag = None
+        for field in ('summary', 'description', 'location'):
+            if field in changes:
+                setattr(record, field, changes[field])
+        if 'start' in changes:
+            start = _moment(changes['start'])
+            record.start = int(start.timestamp())
+            record.all_day = 'date' in changes['start']
+            record.utc_offset = int(start.utcoffset().total_seconds())
+            record.time_zone = _intern(changes['start'].get('timeZone'))
+        if 'end' in changes:
+            record.end = int(_moment(changes['end']).timestamp())
+        return record
+
+    def local_start(self) -> datetime:
+        """Start in the offset it was scheduled in (UTC midnight for all-day events)."""
+        return datetime.fromtimestamp(self.start, timezone(timedelta(seconds=self.utc_offset)))
+
+    def start_text(self) -> str:
+        """The start as the API would write it: a date, or an RFC 3339 date-time."""
+        if self.all_day:
+            return self.local_start().date().isoformat()
+        text = self.local_start().isoformat()
+        return text[:-6] + 'Z' if self.utc_offset == 0 else text
+
+    def matches(self, terms: List[str]) -> bool:
+        """Whether every lower-cased term occurs in the event's text or people,
+        roughly what the API's ``q`` parameter searches."""
+        text = '\n'.join((self.summary or '', self.description, self.location,
+                          self.organizer or '', *self.attendees, *self.names)).lower()
+        return all(term in text for term in terms)
+
+    def __repr__(self) -> str:
+        return f"EventRecord(id={self.id!r}, summary={self.summary!r}, start={self.start_text()!r})"
+
+
+def event_records(body: Dict[str, Any], calendar: str = 'primary') -> List[EventRecord]:
+    """Records for the items of an ``events.list`` response body."""
+    return [EventRecord.from_api(event, calendar) for event in body.get('items', [])]
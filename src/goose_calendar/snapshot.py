@@ -0,0 +1,191 @@
+"""On-disk snapshot of the event cache for fast cold starts.
+
+A snapshot holds the cached window, the time it was last synced (the
+``updatedMin`` anchor for the next delta sync) and every cached event, in
+one file:
+
+- a fixed header: magic, format version, window, sync time, event count
+  and the longest event duration;
+- an index of ``(start, end, offset, length)`` entries sorted by start;
+- an index of ``(hash of event ID, position)`` entries sorted by hash;
+- the events, each a compact JSON row of :class:`EventRecord` fields.
+
+At startup the file is memory-mapped and only the header is read, so
+opening it costs the same for any calendar size. Range and ID lookups
+bisect an index and decode just the events they return. Files with another
+version or that are cut short are ignored.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Container, Iterator, List, Optional, Tuple
+
+from .records import EventRecord
+
+MAGIC = b'GCALSNAP'
+
+# Bump whenever the layout or EventRecord's fields change.
+VERSION = 1
+
+_HEADER = struct.Struct('<8sIdddIq')
+_ENTRY = struct.Struct('<qqII')
+_ID_ENTRY = struct.Struct('<QI')
+
+
+def _id_hash(event_id: str) -> int:
+    """A hash of an event ID that is stable across processes."""
+    return int.from_bytes(hashlib.blake2b(event_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _row(record: EventRecord) -> list:
+    return [getattr(record, name) for name in EventRecord.__slots__]
+
+
+def _record(row: list) -> EventRecord:
+    record = EventRecord(*row)
+    record.calendar = sys.intern(record.calendar)
+    if record.time_zone:
+        record.time_zone = sys.intern(record.time_zone)
+    if record.organizer:
+        record.organizer = sys.intern(record.organizer)
+    record.attendees = tuple(sys.intern(email) for email in record.attendees)
+    record.names = tuple(sys.intern(name) for name in record.names)
+    return record
+
+
+class Snapshot:
+    """A memory-mapped snapshot file, read lazily."""
+
+    def __init__(self, buffer: mmap.mmap, window: Tuple[float, float], synced_at: float,
+                 count: int, max_duration: int):
+        self._buffer = buffer
+        self.window = window
+        self.synced_at = synced_at
+        self._count = count
+        self._max_duration = max_duration
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, index: int) -> Tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self._buffer, _HEADER.size + index * _ENTRY.size)
+
+    def _decode(self, offset: int, length: int) -> EventRecord:
+        return _record(json.loads(self._buffer[offset:offset + length]))
+
+    def _at(self, index: int) -> EventRecord:
+        _, _, offset, length = self._entry(index)
+        return self._decode(offset, length)
+
+    def _first_starting_at(self, moment: float) -> int:
+        """Index of the first event starting at or after ``moment``."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < moment:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def between(self, start: float, end: float, limit: Optional[int] = None) -> List[EventRecord]:
+        """Events overlapping ``[start, end)`` ordered by start time."""
+        records: List[EventRecord] = []
+        index = self._first_starting_at(start - self._max_duration)
+        while index < self._count and (limit is None or len(records) < limit):
+            event_start, event_end, offset, length = self._entry(index)
+            if event_start >= end:
+                break
+            if event_end > start:
+                records.append(self._decode(offset, length))
+            index += 1
+        return records
+
+    def next_start(self, after: float, skip: Container[str] = ()) -> float:
+        """Start of the first event starting at or after ``after`` whose ID
+        is not in ``skip`` (infinity if none)."""
+        for index in range(self._first_starting_at(after), self._count):
+            if not skip or self._at(index).id not in skip:
+                return self._entry(index)[0]
+        return float('inf')
+
+    def get(self, event_id: str) -> Optional[EventRecord]:
+        """The event with ID ``event_id``, if the snapshot has it."""
+        wanted = _id_hash(event_id)
+        base = _HEADER.size + self._count * _ENTRY.size
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if _ID_ENTRY.unpack_from(self._buffer, base + middle * _ID_ENTRY.size)[0] < wanted:
+                low = middle + 1
+            else:
+                high = middle
+        while low < self._count:
+            digest, index = _ID_ENTRY.unpack_from(self._buffer, base + low * _ID_ENTRY.size)
+            if digest != wanted:
+                break
+            record = self._at(index)
+            if record.id == event_id:
+                return record
+            low += 1
+        return None
+
+    def records(self) -> Iterator[EventRecord]:
+        """Decode every event, in start order."""
+        for index in range(self._count):
+            yield self._at(index)
+
+
+def load(path: str) -> Optional[Snapshot]:
+    """Map the snapshot at ``path``; None if it is missing, of another
+    version or incomplete."""
+    try:
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None  # Missing, unreadable or empty
+    if len(buffer) < _HEADER.size:
+        buffer.close()
+        return None
+    magic, version, start, end, synced_at, count, max_duration = _HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION \
+            or len(buffer) < _HEADER.size + count * (_ENTRY.size + _ID_ENTRY.size):
+        buffer.close()
+        return None
+    snapshot = Snapshot(buffer, (start, end), synced_at, count, max_duration)
+    if count:
+        _, _, offset, length = snapshot._entry(count - 1)
+        if len(buffer) < offset + length:
+            buffer.close()
+            return None  # Cut short before the last event
+    return snapshot
+
+
+def save(path: str, window: Tuple[float, float], synced_at: float,
+         records: List[EventRecord]) -> None:
+    """Write a snapshot of a cache's window and events, replacing ``path`` atomically."""
+    records = sorted(records, key=lambda record: record.start)
+    rows = [json.dumps(_row(record), separators=(',', ':')).encode('utf-8') for record in records]
+    offset = _HEADER.size + len(records) * (_ENTRY.size + _ID_ENTRY.size)
+    entries = []
+    for record, row in zip(records, rows):
+        entries.append(_ENTRY.pack(record.start, record.end, offset, len(row)))
+        offset += len(row)
+    ids = sorted((_id_hash(record.id), index) for index, record in enumerate(records))
+    max_duration = max((record.end - record.start for record in records), default=0)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial = f"{path}.tmp"
+    with open(partial, 'wb') as out:
+        out.write(_HEADER.pack(MAGIC, VERSION, window[0], window[1], synced_at,
+                               len(records), max_duration))
+        out.writelines(entries)
+        out.writelines(_ID_ENTRY.pack(digest, index) for digest, index in ids)
+        out.writelines(rows)
+    os.replace(partial, path)
@@ -1,157 +1,77 @@
 """Calendar toolkit for Goose AI Assistant."""
 
-import os
-import pickle
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import Any, Callable, Optional
+
 from googleapiclient.errors import HttpError
 from goose.toolkit.base import Toolkit, tool
-from dateutil import parser as date_parser
+
+from . import deadline, metrics, profiling
+from .engine import CalendarEngine, CalendarError
+from .metrics import instrument_tool
 
 
 class CalendarToolkit(Toolkit):
     """A toolkit for managing Google Calendar events."""
 
-    def __init__(self, notifier: Any = None):
+    def __init__(self, notifier: Any = None, engine: Optional[CalendarEngine] = None):
         """Initialize the Calendar toolkit."""
         super().__init__(notifier)
-        self._service = None
-        self._scopes = ['https://www.googleapis.com/auth/calendar']
-        self._credentials_file = os.path.expanduser('~/credentials.json')
-        self._token_file = os.path.expanduser('~/.goose_calendar_token.pickle')
-
-    def _get_credentials(self) -> Optional[Credentials]:
-        """Get or create Google Calendar API credentials."""
-        creds = None
-        
-        # Load existing token
-        if os.path.exists(self._token_file):
-            with open(self._token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If there are no valid credentials, get new ones
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                except Exception as e:
-                    # Delete the old token and start fresh
-                    if os.path.exists(self._token_file):
-                        os.remove(self._token_file)
-                    creds = None
-            
-            if not creds:
-                if not os.path.exists(self._credentials_file):
-                    raise FileNotFoundError(
-                        f"Credentials file not found at {self._credentials_file}. "
-                        "Please download your OAuth 2.0 credentials from Google Cloud Console."
-                    )
-                
-                try:
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        self._credentials_file, self._scopes
-                    )
-                    creds = flow.run_local_server(port=0)
-                except Exception as e:
-                    if "access_denied" in str(e):
-                        raise Exception(
-                            "Error 403: access_denied - Your app hasn't completed Google verification.\n"
-                            "Solutions:\n"
-                            "1. Go to Google Cloud Console > OAuth consent screen\n"
-                            "2. Add your email as a 'Test user'\n"
-                            "3. Ensure OAuth consent screen is properly configured\n"
-                            "4. Use the same Google account that's listed as a test user\n"
-                            "See project documentation for detailed setup instructions."
-                        )
-                    else:
-                        raise e
-            
-            # Save the credentials for next time
-            with open(self._token_file, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        return creds
-
-    def _get_service(self):
-        """Get the Google Calendar service."""
-        if self._service is None:
-            creds = self._get_credentials()
-            self._service = build('calendar', 'v3', credentials=creds)
-        return self._service
+        self._engine = engine or CalendarEngine()
+        metrics.start_from_environment()
+
+    def _progress(self, done: float, total: Optional[float], message: str) -> None:
+        """Relay bulk-operation progress to the Goose notifier, if there is one."""
+        if self.notifier is not None:
+            self.notifier.status(message)
+
+    def _run(self, operation: Callable[..., str], *args: Any) -> str:
+        """Run an engine operation under its deadline, reporting failures as
+        messages for the user."""
+        try:
+            name = operation.__name__
+            with deadline.bound(deadline.for_operation(name)), profiling.profiled(name):
+                return operation(*args)
+        except (CalendarError, FileNotFoundError) as error:
+            return str(error)
+        except HttpError as error:
+            return f"An error occurred: {error}"
+        except Exception as error:
+            return f"Unexpected error: {error}"
 
     @tool
+    @instrument_tool('toolkit')
     def list_events(self, days_ahead: int = 7, max_results: int = 10) -> str:
         """
         List upcoming calendar events.
-        
+
         Args:
             days_ahead: Number of days ahead to look for events (default: 7)
             max_results: Maximum number of events to return (default: 10)
-            
+
         Returns:
             String containing formatted list of events
         """
-        try:
-            service = self._get_service()
-            
-            # Get events from now to specified days ahead
-            now = datetime.utcnow().isoformat() + 'Z'
-            end_time = (datetime.utcnow() + timedelta(days=days_ahead)).isoformat() + 'Z'
-            
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=now,
-                timeMax=end_time,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            if not events:
-                return f"No upcoming events found in the next {days_ahead} days."
-            
-            result = f"Upcoming events (next {days_ahead} days):\\n\\n"
-            
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                summary = event.get('summary', 'No title')
-                
-                # Parse and format the date/time
-                if 'T' in start:  # Has time
-                    dt = date_parser.parse(start)
-                    formatted_time = dt.strftime('%Y-%m-%d at %I:%M %p')
-                else:  # All-day event
-                    dt = date_parser.parse(start)
-                    formatted_time = dt.strftime('%Y-%m-%d (All day)')
-                
-                location = event.get('location', '')
-                description = event.get('description', '')
-                
-                result += f"📅 **{summary}**\\n"
-                result += f"   🕒 {formatted_time}\\n"
-                if location:
-                    result += f"   📍 {location}\\n"
-                if description:
-                    result += f"   📝 {description[:100]}{'...' if len(description) > 100 else ''}\\n"
-                result += "\\n"
-            
-            return result
-            
-        except HttpError as error:
-            return f"An error occurred: {error}"
-        except FileNotFoundError as error:
-            return str(error)
-        except Exception as error:
-            return f"Unexpected error: {error}"
+        return self._run(self._engine.list_events, days_ahead, max_results)
 
     @tool
+    @instrument_tool('toolkit')
+    def find_events_with(self, person: str, days_ahead: int = 14, max_results: int = 10) -> str:
+        """
+        List upcoming events that a person organizes or attends, e.g. to find the
+        next meeting with someone.
+
+        Args:
+            person: Email address or name of the person
+            days_ahead: Number of days to look ahead (default: 14)
+            max_results: Maximum number of events to return (default: 10)
+
+        Returns:
+            String listing the events with their organizer and attendees, or error message
+        """
+        return self._run(self._engine.find_events_with, person, days_ahead, max_results)
+
+    @tool
+    @instrument_tool('toolkit')
     def add_event(
         self,
         title: str,
@@ -159,11 +79,12 @@ class CalendarToolkit(Toolkit):
         end_time: Optional[str] = None,
         description: Optional[str] = None,
         location: Optional[str] = None,
-        all_day: bool = False
+        all_day: bool = False,
+        event_id: Optional[str] = None
     ) -> str:
         """
         Add a new calendar event.
-        
+
         Args:
             title: Event title/summary
             start_time: Start time in natural language or ISO format
@@ -171,60 +92,19 @@ class CalendarToolkit(Toolkit):
             description: Event description (optional)
             location: Event location (optional)
             all_day: Whether this is an all-day event (default: False)
-            
+            event_id: Your own ID for the event, 5-1024 characters of a-v and 0-9 (optional).
+                Retrying with the same ID never creates a second copy.
+
         Returns:
             String confirming event creation or error message
         """
-        try:
-            service = self._get_service()
-            
-            # Parse start time
-            try:
-                start_dt = date_parser.parse(start_time)
-            except Exception:
-                return f"Could not parse start time: {start_time}"
-            
-            # Parse end time or set default
-            if end_time:
-                try:
-                    end_dt = date_parser.parse(end_time)
-                except Exception:
-                    return f"Could not parse end time: {end_time}"
-            else:
-                # Default to 1 hour duration for timed events, same day for all-day events
-                if all_day:
-                    end_dt = start_dt
-                else:
-                    end_dt = start_dt + timedelta(hours=1)
-            
-            # Create event object
-            event = {
-                'summary': title,
-            }
-            
-            if all_day:
-                event['start'] = {'date': start_dt.date().isoformat()}
-                event['end'] = {'date': end_dt.date().isoformat()}
-            else:
-                event['start'] = {'dateTime': start_dt.isoformat(), 'timeZone': 'America/New_York'}
-                event['end'] = {'dateTime': end_dt.isoformat(), 'timeZone': 'America/New_York'}
-            
-            if description:
-                event['description'] = description
-            if location:
-                event['location'] = location
-            
-            # Create the event
-            created_event = service.events().insert(calendarId='primary', body=event).execute()
-            
-            return f"✅ Event '{title}' created successfully!\\nEvent ID: {created_event['id']}"
-            
-        except HttpError as error:
-            return f"An error occurred: {error}"
-        except Exception as error:
-            return f"Unexpected error: {error}"
+        return self._run(
+            self._engine.add_event, title, start_time, end_time, description, location, all_day,
+            event_id
+        )
 
     @tool
+    @instrument_tool('toolkit')
     def edit_event(
         self,
         event_query: str,
@@ -236,7 +116,7 @@ class CalendarToolkit(Toolkit):
     ) -> str:
         """
         Edit an existing calendar event.
-        
+
         Args:
             event_query: Search query to find the event (title, date, etc.)
             new_title: New event title (optional)
@@ -244,134 +124,142 @@ class CalendarToolkit(Toolkit):
             new_end_time: New end time (optional)
             new_description: New description (optional)
             new_location: New location (optional)
-            
+
         Returns:
             String confirming event update or error message
         """
-        try:
-            service = self._get_service()
-            
-            # Search for events matching the query
-            now = datetime.utcnow().isoformat() + 'Z'
-            future = (datetime.utcnow() + timedelta(days=365)).isoformat() + 'Z'
-            
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=now,
-                timeMax=future,
-                q=event_query,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            if not events:
-                return f"No events found matching '{event_query}'"
-            
-            if len(events) > 1:
-                result = f"Multiple events found matching '{event_query}'. Please be more specific:\\n\\n"
-                for i, event in enumerate(events[:5], 1):
-                    start = event['start'].get('dateTime', event['start'].get('date'))
-                    summary = event.get('summary', 'No title')
-                    result += f"{i}. {summary} ({start})\\n"
-                return result
-            
-            # Edit the found event
-            event = events[0]
-            event_id = event['id']
-            
-            if new_title:
-                event['summary'] = new_title
-            if new_description is not None:  # Allow empty string
-                event['description'] = new_description
-            if new_location is not None:  # Allow empty string
-                event['location'] = new_location
-            
-            if new_start_time:
-                try:
-                    start_dt = date_parser.parse(new_start_time)
-                    if 'date' in event['start']:  # All-day event
-                        event['start']['date'] = start_dt.date().isoformat()
-                    else:  # Timed event
-                        event['start']['dateTime'] = start_dt.isoformat()
-                except Exception:
-                    return f"Could not parse new start time: {new_start_time}"
-            
-            if new_end_time:
-                try:
-                    end_dt = date_parser.parse(new_end_time)
-                    if 'date' in event['end']:  # All-day event
-                        event['end']['date'] = end_dt.date().isoformat()
-                    else:  # Timed event
-                        event['end']['dateTime'] = end_dt.isoformat()
-                except Exception:
-                    return f"Could not parse new end time: {new_end_time}"
-            
-            # Update the event
-            updated_event = service.events().update(
-                calendarId='primary',
-                eventId=event_id,
-                body=event
-            ).execute()
-            
-            return f"✅ Event '{event['summary']}' updated successfully!"
-            
-        except HttpError as error:
-            return f"An error occurred: {error}"
-        except Exception as error:
-            return f"Unexpected error: {error}"
+        return self._run(
+            self._engine.edit_event, event_query, new_title, new_start_time,
+            new_end_time, new_description, new_location
+        )
 
     @tool
+    @instrument_tool('toolkit')
     def delete_event(self, event_query: str) -> str:
         """
         Delete a calendar event.
-        
+
         Args:
             event_query: Search query to find the event to delete
-            
+
         Returns:
             String confirming event deletion or error message
         """
-        try:
-            service = self._get_service()
-            
-            # Search for events matching the query
-            now = datetime.utcnow().isoformat() + 'Z'
-            future = (datetime.utcnow() + timedelta(days=365)).isoformat() + 'Z'
-            
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=now,
-                timeMax=future,
-                q=event_query,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            if not events:
-                return f"No events found matching '{event_query}'"
-            
-            if len(events) > 1:
-                result = f"Multiple events found matching '{event_query}'. Please be more specific:\\n\\n"
-                for i, event in enumerate(events[:5], 1):
-                    start = event['start'].get('dateTime', event['start'].get('date'))
-                    summary = event.get('summary', 'No title')
-                    result += f"{i}. {summary} ({start})\\n"
-                return result
-            
-            # Delete the found event
-            event = events[0]
-            event_id = event['id']
-            event_title = event.get('summary', 'Untitled Event')
-            
-            service.events().delete(calendarId='primary', eventId=event_id).execute()
-            
-            return f"✅ Event '{event_title}' deleted successfully!"
-            
-        except HttpError as error:
-            return f"An error occurred: {error}"
-        except Exception as error:
-            return f"Unexpected error: {error}"
+        return self._run(self._engine.delete_event, event_query)
+
+    @tool
+    @instrument_tool('toolkit')
+    def shift_events(
+        self,
+        range_start: str,
+        range_end: Optional[str] = None,
+        query: Optional[str] = None,
+        days: int = 0,
+        hours: int = 0,
+        minutes: int = 0,
+        dry_run: bool = False
+    ) -> str:
+        """
+        Move all events starting in a time range (optionally only those matching a
+        query) earlier or later by the same offset, in one call.
+
+        Args:
+            range_start: Start of the range, e.g. 2025-07-03 or 2025-07-03T12:00
+            range_end: End of the range (optional, default: one day after range_start)
+            query: Only move events whose title, description, location or attendees match (optional)
+            days: Days to move by; negative moves earlier (default: 0)
+            hours: Hours to move by (default: 0)
+            minutes: Minutes to move by (default: 0)
+            dry_run: List the planned moves without changing anything (default: false)
+
+        Returns:
+            String listing or confirming the moved events, or error message
+        """
+        return self._run(
+            self._engine.shift_events, range_start, range_end, query, days, hours, minutes, dry_run
+        )
+
+    @tool
+    @instrument_tool('toolkit')
+    def find_duplicates(self, days_back: int = 30, days_ahead: int = 365, delete: bool = False) -> str:
+        """
+        Find events that are copies of another event (same title, times and
+        location), e.g. left by retried inserts, and optionally delete the copies.
+
+        Args:
+            days_back: Days in the past to check (default: 30)
+            days_ahead: Days in the future to check (default: 365)
+            delete: Delete the copies, keeping the earliest created of each event (default: false)
+
+        Returns:
+            String listing the duplicates found, or confirming their deletion, or error message
+        """
+        return self._run(self._engine.find_duplicates, days_back, days_ahead, delete)
+
+    @tool
+    @instrument_tool('toolkit')
+    def write_status(self) -> str:
+        """
+        Show whether recent changes have been saved to Google Calendar yet
+        (write-behind mode), and any changes Google rejected.
+
+        Returns:
+            String describing pending and failed writes
+        """
+        return self._run(self._engine.write_status)
+
+    @tool
+    @instrument_tool('toolkit')
+    def import_ics(self, path: str) -> str:
+        """
+        Import all events from an iCalendar (.ics) file into the calendar.
+
+        Args:
+            path: Path to the .ics file
+
+        Returns:
+            String summarizing how many events were imported or error message
+        """
+        return self._run(self._engine.import_ics, path, self._progress)
+
+    @tool
+    @instrument_tool('toolkit')
+    def export_ics(self, path: str, days_back: int = 365, days_ahead: int = 365) -> str:
+        """
+        Export calendar events to an iCalendar (.ics) file.
+
+        Args:
+            path: Path of the .ics file to write
+            days_back: Number of past days to include (default: 365)
+            days_ahead: Number of future days to include (default: 365)
+
+        Returns:
+            String summarizing how many events were exported or error message
+        """
+        return self._run(self._engine.export_ics, path, days_back, days_ahead, self._progress)
+
+    @tool
+    @instrument_tool('toolkit')
+    def calendar_analytics(
+        self,
+        days_back: int = 90,
+        days_ahead: int = 0,
+        time_zone: str = 'America/New_York',
+        export_path: Optional[str] = None
+    ) -> str:
+        """
+        Summarize calendar load: meeting hours per week, busiest weekdays and days,
+        and how much time goes to recurring events.
+
+        Args:
+            days_back: Number of past days to analyze (default: 90)
+            days_ahead: Number of future days to include (default: 0)
+            time_zone: IANA time zone used for days and weeks (default: America/New_York)
+            export_path: Optional .npz file to save the event columns to
+
+        Returns:
+            String containing the aggregated statistics or error message
+        """
+        return self._run(
+            self._engine.calendar_analytics, days_back, days_ahead, time_zone, export_path
+        )
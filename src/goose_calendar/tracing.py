@@ -0,0 +1,209 @@
+"""Optional structured tracing for calendar tool invocations.
+
+Each tool call opens a root span; credential loading, token refresh, service
+construction, Google API calls and output formatting open nested spans under
+it. Tracing is off unless an exporter is configured:
+
+- ``GOOSE_CALENDAR_TRACE_FILE``: append finished spans as JSON lines.
+- ``GOOSE_CALENDAR_OTLP_ENDPOINT``: POST finished traces as OTLP/HTTP JSON to
+  ``<endpoint>/v1/traces`` (any OTLP-compatible collector).
+
+When disabled, :func:`span` costs one context-variable lookup.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('goose_calendar_span', default=None)
+_exporters: List['Exporter'] = []
+
+
+class Span:
+    """A timed, named operation within a trace."""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+                 'attributes', 'error', '_children')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        # Finished descendants, collected on the root so a trace exports at once
+        self._children: List['Span'] = []
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class Exporter:
+    """Receives every finished trace as a list of spans, root last."""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class FileExporter(Exporter):
+    """Append spans as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = ''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in spans)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(lines)
+
+
+class OtlpHttpExporter(Exporter):
+    """Ship traces to an OTLP/HTTP JSON endpoint from a background thread.
+
+    Export never blocks a tool call: traces are queued and dropped if the
+    queue is full or the collector is unreachable.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = 'goose-calendar',
+                 max_queue: int = 1000, timeout: float = 5.0):
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+        self.service_name = service_name
+        self.timeout = timeout
+        self._queue: 'queue.Queue[List[Span]]' = queue.Queue(max_queue)
+        threading.Thread(target=self._run, name='otlp-exporter', daemon=True).start()
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            request = urllib.request.Request(
+                self.url, data=json.dumps(self.encode(spans)).encode('utf-8'),
+                headers={'Content-Type': 'application/json'}, method='POST')
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception:
+                pass
+
+    def encode(self, spans: List[Span]) -> dict:
+        """Encode spans as an OTLP ``ExportTraceServiceRequest``."""
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {'key': key, 'value': {'boolValue': value}}
+            if isinstance(value, int):
+                return {'key': key, 'value': {'intValue': str(value)}}
+            if isinstance(value, float):
+                return {'key': key, 'value': {'doubleValue': value}}
+            return {'key': key, 'value': {'stringValue': str(value)}}
+
+        return {'resourceSpans': [{
+            'resource': {'attributes': [attribute('service.name', self.service_name)]},
+            'scopeSpans': [{
+                'scope': {'name': 'goose_calendar'},
+                'spans': [{
+                    'traceId': span.trace_id,
+                    'spanId': span.span_id,
+                    'parentSpanId': span.parent_id or '',
+                    'name': span.name,
+                    'kind': 1,
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns),
+                    'attributes': [attribute(k, v) for k, v in span.attributes.items()],
+                    'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+                } for span in spans],
+            }],
+        }]}
+
+
+def configure(exporters: Optional[List[Exporter]] = None) -> None:
+    """Replace the active exporters; ``None`` reads them from the environment."""
+    if exporters is None:
+        exporters = []
+        if os.environ.get('GOOSE_CALENDAR_TRACE_FILE'):
+            exporters.append(FileExporter(os.environ['GOOSE_CALENDAR_TRACE_FILE']))
+        if os.environ.get('GOOSE_CALENDAR_OTLP_ENDPOINT'):
+            exporters.append(OtlpHttpExporter(os.environ['GOOSE_CALENDAR_OTLP_ENDPOINT']))
+    _exporters[:] = exporters
+
+
+def enabled() -> bool:
+    return bool(_exporters)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a span nested under the current one.
+
+    Yields the :class:`Span` (or ``None`` when tracing is disabled) so callers
+    can attach attributes discovered along the way.
+    """
+    if not _exporters:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        _finish(current, parent)
+
+
+def _finish(finished: Span, parent: Optional[Span]) -> None:
+    if parent is not None:
+        parent._children.extend(finished._children)
+        parent._children.append(finished)
+        finished._children = []
+        return
+    spans = finished._children + [finished]
+    finished._children = []
+    for exporter in list(_exporters):
+        try:
+            exporter.export(spans)
+        except Exception:
+            pass
+
+
+configure()
@@ -0,0 +1,375 @@
+"""Write-behind queue for event writes, backed by an on-disk journal.
+
+In write-behind mode ``add_event``, ``edit_event`` and ``delete_event``
+apply their change to the event cache, append it to a journal file and
+return. A background worker sends journaled writes to Google in batches,
+coalescing several writes to the same event into one request (an insert
+followed by edits becomes a single insert; an insert followed by a delete
+sends nothing). Writes still in the journal when the process stops are sent
+when the next process opens it.
+
+Inserts carry client-generated event IDs, so resending one after a crash is
+answered with 409 Conflict instead of creating a duplicate.
+
+A journal is used by one process at a time: its queue holds an exclusive
+lock on ``<journal>.lock`` for as long as the process runs, and a second
+process cannot open a queue on it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import IO, Any, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from . import metrics, tracing
+from .errors import CalendarError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Batch requests per flush hold at most this many calls (Google's maximum).
+BATCH_SIZE = 50
+
+# Longest wait between flush attempts while the API keeps failing.
+MAX_BACKOFF_SECONDS = 60.0
+
+_queues: Dict[str, 'WriteQueue'] = {}
+_queues_lock = threading.Lock()
+
+
+class JournalInUseError(CalendarError):
+    """Another process holds the journal's lock."""
+
+
+class Journal:
+    """Append-only JSON-lines file of queued writes and their completions.
+
+    Each write is one ``{"seq": ..., "operation": ...}`` line; completed
+    writes are recorded by ``{"done": [seq, ...]}`` lines. Every append is
+    flushed to disk before it returns. The file is truncated whenever no
+    writes are outstanding.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock_file: Optional[IO[bytes]] = None
+
+    def lock(self) -> None:
+        """Lock the journal against other processes until this one exits.
+
+        Raises:
+            JournalInUseError: Another process holds the lock.
+        """
+        handle = open(self.path + '.lock', 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.close()
+            raise JournalInUseError(
+                f"Another goose-calendar process is using the write-behind journal {self.path}"
+            )
+        self._lock_file = handle
+
+    def replay(self) -> List[Dict[str, Any]]:
+        """Writes recorded but not completed, in the order they were made."""
+        entries: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # A torn final line from a crash mid-append
+                    if 'done' in entry:
+                        for seq in entry['done']:
+                            entries.pop(seq, None)
+                    else:
+                        entries[entry['seq']] = entry
+        except FileNotFoundError:
+            pass
+        return list(entries.values())
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def truncate(self) -> None:
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _coalesce(writes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge queued writes per event into the fewest equivalent requests.
+
+    Returns one write per event, each with the ``seqs`` it stands for.
+    Writes that cancel out (insert then delete) come back with operation
+    ``None`` so they are completed without a request.
+    """
+    merged: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+    for write in writes:
+        event_id = write['event_id']
+        current = merged.get(event_id)
+        if current is None:
+            merged[event_id] = dict(write, seqs=[write['seq']])
+            continue
+        current['seqs'].append(write['seq'])
+        operation = write['operation']
+        if current['operation'] is None:
+            continue
+        if operation == 'delete':
+            current['operation'] = None if current['operation'] == 'insert' else 'delete'
+            current['body'] = None
+        elif operation == 'patch' and current['operation'] in ('insert', 'patch'):
+            current['body'] = {**current['body'], **write['body']}
+    return list(merged.values())
+
+
+class WriteQueue:
+    """Journaled event writes, flushed to the API by a background thread.
+
+    Use :meth:`for_journal` so a journal file is served by one queue per
+    process; ``engine`` is the :class:`~goose_calendar.engine.CalendarEngine`
+    whose service and cache the writes go through. Raises
+    :class:`JournalInUseError` if another process has a queue on ``path``.
+    """
+
+    def __init__(self, engine, path: str, flush_delay: float = 0.2):
+        self.engine = engine
+        self.flush_delay = flush_delay
+        self._journal = Journal(path)
+        self._journal.lock()
+        self._lock = threading.Condition()
+        self._pending: List[Dict[str, Any]] = self._journal.replay()
+        self._seq = max((write['seq'] for write in self._pending), default=0)
+        self._failures: List[str] = []
+        self._last_flush: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._worker: Optional[threading.Thread] = None
+        if self._pending:
+            self._start()
+
+    @classmethod
+    def for_journal(cls, engine, path: str) -> 'WriteQueue':
+        """The queue for ``path``, created on first use and afterwards
+        re-pointed at the newest engine for that account."""
+        path = os.path.abspath(os.path.expanduser(path))
+        with _queues_lock:
+            queue = _queues.get(path)
+            if queue is None:
+                queue = _queues[path] = cls(engine, path)
+            else:
+                queue.engine = engine
+            return queue
+
+    def submit(self, operation: str, event_id: str, body: Optional[Dict[str, Any]] = None,
+               etag: Optional[str] = None) -> None:
+        """Journal a write (``insert``, ``patch`` or ``delete``) for the worker to send."""
+        with self._lock:
+            self._seq += 1
+            write = {'seq': self._seq, 'operation': operation, 'event_id': event_id,
+                     'body': body, 'etag': etag, 'queued_at': time.time()}
+            self._journal.append(write)
+            self._pending.append(write)
+            self._lock.notify_all()
+        metrics.QUEUED_WRITES.inc(operation=operation, result='queued')
+        self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='calendar-writes', daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+            # Let a burst of writes arrive so they share a batch
+            time.sleep(max(self.flush_delay, backoff))
+            with self._lock:
+                writes = list(self._pending)
+            try:
+                self._flush(writes)
+            except Exception as error:
+                self._last_error = str(error)
+                backoff = min(max(2 * backoff, 1.0), MAX_BACKOFF_SECONDS)
+            else:
+                backoff = 0.0
+            finally:
+                with self._lock:
+                    self._lock.notify_all()
+
+    def _flush(self, writes: List[Dict[str, Any]]) -> None:
+        """Send ``writes``; completed ones leave the queue, retryable ones stay."""
+        engine = self.engine
+        done: List[int] = []
+        retry: Optional[str] = None
+        groups = _coalesce(writes)
+        for group in groups:
+            if group['operation'] is None:
+                done.extend(group['seqs'])
+                metrics.QUEUED_WRITES.inc(operation='insert', result='cancelled')
+        groups = [group for group in groups if group['operation'] is not None]
+
+        service = engine._get_service() if groups else None
+        for index in range(0, len(groups), BATCH_SIZE):
+            chunk = groups[index:index + BATCH_SIZE]
+            requests = [self._request(service, group) for group in chunk]
+            with tracing.span('writes.flush', writes=len(requests)):
+                results = engine._execute_batch(requests, 'events.write')
+            for group, (response, error) in zip(chunk, results):
+                operation = group['operation']
+                status = error.resp.status if isinstance(error, HttpError) else None
+                if operation == 'insert' and status == 409:
+                    # The ID is taken: by an earlier attempt at this insert, or
+                    # by an event since deleted (Google never reuses those IDs)
+                    try:
+                        response = engine._execute(service.events().get(
+                            calendarId='primary', eventId=group['event_id']), 'events.get')
+                    except Exception as lookup_error:
+                        retry = str(lookup_error)
+                        continue
+                    if response.get('status') == 'cancelled':
+                        self._fail(group, CalendarError("its ID belonged to an event that was deleted"))
+                        done.extend(group['seqs'])
+                        continue
+                    error = None
+                if error is None or (operation == 'delete' and status in (404, 410)):
+                    # 404/410: an earlier attempt already got through
+                    if response and operation != 'delete':
+                        engine._cache.apply(response)
+                    done.extend(group['seqs'])
+                    metrics.QUEUED_WRITES.inc(operation=operation, result='sent')
+                elif status is None or status in metrics.RETRYABLE_STATUSES:
+                    retry = str(error)
+                else:
+                    self._fail(group, error)
+                    done.extend(group['seqs'])
+
+        with self._lock:
+            finished = set(done)
+            self._pending = [write for write in self._pending if write['seq'] not in finished]
+            if finished:
+                if self._pending:
+                    self._journal.append({'done': sorted(finished)})
+                else:
+                    self._journal.truncate()
+            self._last_flush = time.time()
+            self._last_error = retry
+        if retry is not None:
+            raise RuntimeError(retry)
+
+    @staticmethod
+    def _request(service, group: Dict[str, Any]):
+        events = service.events()
+        if group['operation'] == 'insert':
+            return events.insert(calendarId='primary', body=group['body'])
+        if group['operation'] == 'patch':
+            request = events.patch(calendarId='primary', eventId=group['event_id'], body=group['body'])
+        else:
+            request = events.delete(calendarId='primary', eventId=group['event_id'])
+        if group.get('etag'):
+            request.headers['If-Match'] = group['etag']
+        return request
+
+    def _fail(self, group: Dict[str, Any], error: Exception) -> None:
+        """Record a write Google refused, and restore the cache to the server's copy."""
+        metrics.QUEUED_WRITES.inc(operation=group['operation'], result='failed')
+        title = (group.get('body') or {}).get('summary') or group['event_id']
+        status = error.resp.status if isinstance(error, HttpError) else None
+        reason = "it was changed elsewhere" if status == 412 else str(error)
+        with self._lock:
+            self._failures.append(f"{group['operation']} of '{title}' failed: {reason}")
+            del self._failures[:-20]
+        engine = self.engine
+        if group['operation'] == 'insert':
+            engine._cache.remove(group['event_id'])
+            return
+        try:
+            current = engine._execute(engine._get_service().events().get(
+                calendarId='primary', eventId=group['event_id']), 'events.get')
+        except HttpError:
+            engine._cache.remove(group['event_id'])
+        except Exception:
+            pass  # Left for the next cache sync to correct
+        else:
+            engine._cache.apply(current)
+
+    def overlay(self, cache) -> None:
+        """Re-apply unsent writes to ``cache`` after it was reloaded from the API."""
+        with self._lock:
+            writes = list(self._pending)
+        for write in writes:
+            if write['operation'] == 'insert':
+                cache.apply(write['body'])
+            elif write['operation'] == 'patch':
+                record = cache.get(write['event_id'])
+                if record is not None:
+                    cache.put(record.patched(write['body']))
+            else:
+                cache.remove(write['event_id'])
+
+    def pending_events(self) -> Dict[str, str]:
+        """The last queued operation for each event with writes not yet sent."""
+        with self._lock:
+            return {write['event_id']: write['operation'] for write in self._pending}
+
+    def pending(self) -> int:
+        """Number of writes not yet acknowledged by Google."""
+        with self._lock:
+            return len(self._pending)
+
+    def wait(self, timeout: float = 10.0) -> bool:
+        """Block until every queued write has been sent (or failed).
+
+        Returns False if writes are still pending after ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+        return True
+
+    def status(self) -> str:
+        """Describe the queue for the write-status tool."""
+        with self._lock:
+            pending = list(self._pending)
+            failures = list(self._failures)
+            last_flush, last_error = self._last_flush, self._last_error
+        if pending:
+            oldest = time.time() - min(write['queued_at'] for write in pending)
+            result = f"⏳ {len(pending)} writes waiting to be saved to Google (oldest {oldest:.0f}s ago)"
+        else:
+            result = "✅ All changes are saved to Google"
+        if last_flush is not None:
+            result += f"\\nLast sent: {datetime.fromtimestamp(last_flush):%Y-%m-%d %I:%M:%S %p}"
+        if last_error:
+            result += f"\\n⚠️ Last attempt failed and will be retried: {last_error}"
+        if failures:
+            result += f"\\n❌ {len(failures)} writes were rejected by Google:"
+            for failure in failures[-5:]:
+                result += f"\\n• {failure}"
+        return result
@@ -0,0 +1,113 @@
+"""Tests for the per-account engine pool."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.goose_calendar.accounts import DEFAULT_ACCOUNT, AccountTokens, EnginePool, token_path
+from src.goose_calendar.engine import AuthenticationError, CalendarEngine
+
+
+def _fake_engine(account, memory=0):
+    engine = Mock(spec=CalendarEngine)
+    engine.account = account
+    engine.memory_estimate.return_value = memory
+    return engine
+
+
+class TestEnginePool(unittest.TestCase):
+    """Test cases for EnginePool."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.default = _fake_engine(DEFAULT_ACCOUNT)
+        self.pool = EnginePool(default_engine=self.default, max_accounts=2,
+                               engine_factory=_fake_engine)
+
+    def test_default_account_uses_pinned_engine(self):
+        """No account, or the default account, returns the pinned engine."""
+        self.assertIs(self.pool.get(), self.default)
+        self.assertIs(self.pool.get(DEFAULT_ACCOUNT), self.default)
+        self.assertEqual(self.pool.accounts(), [])
+
+    def test_engines_are_reused_per_account(self):
+        """Repeated lookups for an account return the same engine."""
+        first = self.pool.get('alice')
+        self.assertIs(self.pool.get('alice'), first)
+        self.assertIsNot(self.pool.get('bob'), first)
+
+    def test_least_recently_used_account_is_evicted(self):
+        """Exceeding max_accounts drops the least recently used engine."""
+        alice = self.pool.get('alice')
+        self.pool.get('bob')
+        self.pool.get('alice')
+        self.pool.get('carol')
+
+        self.assertEqual(self.pool.accounts(), ['alice', 'carol'])
+        self.assertIs(self.pool.get('alice'), alice)
+
+    def test_memory_limit_evicts_oldest(self):
+        """Engines are dropped while the pool exceeds its memory budget."""
+        pool = EnginePool(default_engine=self.default, max_accounts=10, max_memory_bytes=250,
+                          engine_factory=lambda account: _fake_engine(account, memory=100))
+        for account in ('a', 'b', 'c'):
+            pool.get(account)
+
+        self.assertEqual(pool.accounts(), ['b', 'c'])
+        self.assertLessEqual(pool.memory_estimate(), 250)
+
+    def test_idle_engines_are_evicted(self):
+        """Engines unused for longer than idle_timeout are dropped."""
+        pool = EnginePool(default_engine=self.default, idle_timeout=60,
+                          engine_factory=_fake_engine)
+        with patch('src.goose_calendar.accounts.time.monotonic', return_value=0):
+            pool.get('alice')
+        with patch('src.goose_calendar.accounts.time.monotonic', return_value=61):
+            pool.get('bob')
+
+        self.assertEqual(pool.accounts(), ['bob'])
+
+    def test_accounts_get_separate_token_files(self):
+        """Each account's engine stores its token in its own file."""
+        with tempfile.TemporaryDirectory() as token_dir:
+            pool = EnginePool(default_engine=self.default, token_dir=token_dir)
+            alice = pool.get('alice@example.com')
+            bob = pool.get('bob@example.com')
+
+            self.assertEqual(os.path.dirname(alice._token_file), token_dir)
+            self.assertNotEqual(alice._token_file, bob._token_file)
+
+    def test_pooled_accounts_never_start_the_browser_sign_in(self):
+        """An account without a stored token is refused instead of prompting on the server."""
+        with tempfile.TemporaryDirectory() as token_dir:
+            pool = EnginePool(default_engine=self.default, token_dir=token_dir)
+            engine = pool.get('mallory@example.com')
+
+            with patch('src.goose_calendar.engine.InstalledAppFlow') as flow:
+                with self.assertRaises(AuthenticationError):
+                    engine._get_credentials()
+            flow.from_client_secrets_file.assert_not_called()
+
+    def test_token_path_keeps_default_location(self):
+        """The default account keeps the single-user token location."""
+        self.assertEqual(token_path(DEFAULT_ACCOUNT),
+                         os.path.expanduser('~/.goose_calendar_token.pickle'))
+        self.assertNotEqual(token_path('a/b'), token_path('a_b'))
+
+
+class TestAccountTokens(unittest.TestCase):
+    """Test cases for AccountTokens."""
+
+    def test_tokens_map_to_their_account_only(self):
+        """Known tokens name their account; unknown or empty tokens name none."""
+        tokens = AccountTokens({'s3cret-alice': 'alice@example.com'})
+
+        self.assertEqual(tokens.account('s3cret-alice'), 'alice@example.com')
+        self.assertIsNone(tokens.account('s3cret-bob'))
+        self.assertIsNone(tokens.account(''))
+        self.assertFalse(AccountTokens())
+
+
+if __name__ == '__main__':
+    unittest.main()
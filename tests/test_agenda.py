@@ -0,0 +1,85 @@
+"""Tests for pre-rendered agenda views."""
+
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.goose_calendar import agenda
+from src.goose_calendar.agenda import AgendaViews
+from src.goose_calendar.cache import EventCache, rfc3339
+from src.goose_calendar.engine import format_event_list
+
+
+def _event(event_id, start, end, summary):
+    return {'id': event_id, 'summary': summary,
+            'start': {'dateTime': rfc3339(start)}, 'end': {'dateTime': rfc3339(end)}}
+
+
+class TestAgendaViews(unittest.TestCase):
+    """Test cases for AgendaViews."""
+
+    def setUp(self):
+        """Load a cache with one event today and one in five days."""
+        self.now = time.time()
+        self.cache = EventCache(ttl=60)
+        self.render = Mock(side_effect=format_event_list)
+        self.views = AgendaViews(self.cache, self.render)
+        self.cache.load(self.now, self.now + 14 * 86400, [
+            _event('a', self.now + 3600, self.now + 7200, 'Standup'),
+            _event('b', self.now + 5 * 86400, self.now + 5 * 86400 + 3600, 'Offsite'),
+        ], synced_at=self.now)
+
+    def test_default_views_are_rendered_once_on_load(self):
+        """Loading renders today, two days and the week; reads render nothing."""
+        self.assertEqual(self.render.call_count, 0)
+        self.views.refresh()
+        self.assertEqual(self.render.call_count, 3)
+
+        week = self.views.get(7, 10)
+        self.views.get(1, 10)
+
+        self.assertEqual(self.render.call_count, 3)
+        now = time.time()
+        self.assertEqual(week, format_event_list(self.cache.between(now, now + 7 * 86400, 10), 7))
+        self.assertIn("Offsite", week)
+
+    def test_changes_rerender_only_the_views_they_touch(self):
+        """An event changed in five days re-renders the week but not today."""
+        self.views.refresh()
+        today = self.views.get(1, 10)
+        self.render.reset_mock()
+
+        moved = _event('b', self.now + 5 * 86400, self.now + 5 * 86400 + 3600, 'Offsite (moved)')
+        self.cache.merge([moved], synced_at=time.time())
+        self.views.refresh()
+
+        self.assertEqual([call.args[1] for call in self.render.call_args_list], [7])
+        self.assertIs(self.views.get(1, 10), today)
+        self.assertIn("Offsite (moved)", self.views.get(7, 10))
+
+    def test_a_burst_of_writes_is_rendered_once(self):
+        """Many writes in a row re-render each view once, after the refresh delay."""
+        self.views.refresh()
+        self.render.reset_mock()
+
+        for index in range(50):
+            self.cache.apply(_event(f'w{index}', self.now + 1800, self.now + 2400, f'Write {index}'))
+        self.assertEqual(self.render.call_count, 0)
+        time.sleep(agenda.REFRESH_DELAY + 0.2)
+
+        self.assertEqual(sorted(call.args[1] for call in self.render.call_args_list), [1, 2, 7])
+        self.assertIn("Write 49", self.views.get(1, 50))
+
+    def test_view_expires_when_a_listed_event_ends(self):
+        """Once a listed event is over the view is rendered again without it."""
+        ends = int(time.time()) + 1  # Records keep whole seconds
+        self.cache.apply(_event('c', self.now - 600, ends, 'Ending soon'))
+        self.assertIn("Ending soon", self.views.get(1, 10))
+
+        time.sleep(ends - time.time() + 0.05)
+
+        self.assertNotIn("Ending soon", self.views.get(1, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests for columnar calendar analytics."""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.goose_calendar.engine import CalendarEngine, InvalidInputError
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+
+def _timed(start, end, **extra):
+    return {'start': {'dateTime': start}, 'end': {'dateTime': end}, **extra}
+
+
+EVENTS = [
+    # Monday 2025-06-02 and Tuesday 2025-06-03, New York time
+    _timed('2025-06-02T09:00:00-04:00', '2025-06-02T10:00:00-04:00', recurringEventId='s1'),
+    _timed('2025-06-02T13:00:00-04:00', '2025-06-02T15:00:00-04:00'),
+    _timed('2025-06-03T21:30:00-04:00', '2025-06-03T22:00:00-04:00'),
+    # Following Monday
+    _timed('2025-06-09T09:00:00-04:00', '2025-06-09T10:00:00-04:00', recurringEventId='s1'),
+    {'start': {'date': '2025-06-04'}, 'end': {'date': '2025-06-05'}},
+]
+
+
+@unittest.skipUnless(HAS_NUMPY, "analytics extra (numpy) not installed")
+class TestAnalytics(unittest.TestCase):
+    """Test cases for EventColumns and summarize."""
+
+    def setUp(self):
+        """Build columns from the sample events."""
+        from src.goose_calendar import analytics
+        self.analytics = analytics
+        self.columns = analytics.EventColumns.from_pages([EVENTS[:2], EVENTS[2:]])
+
+    def test_summary_aggregates(self):
+        """Hours are grouped by local week, weekday and day."""
+        summary = self.analytics.summarize(self.columns, 'America/New_York')
+
+        self.assertEqual(summary['events'], 4)
+        self.assertEqual(summary['all_day_events'], 1)
+        self.assertAlmostEqual(summary['hours'], 4.5)
+        self.assertEqual(summary['weekly_hours'], {'2025-06-02': 3.5, '2025-06-09': 1.0})
+        self.assertEqual(summary['weekday_hours']['Mon'], 4.0)
+        # 21:30 in New York is already Wednesday in UTC, but counts as Tuesday
+        self.assertEqual(summary['weekday_hours']['Tue'], 0.5)
+        self.assertEqual(summary['busiest_days'][0], ('2025-06-02', 3.0))
+        self.assertAlmostEqual(summary['recurring_share'], 2 / 4.5)
+
+    def test_columns_round_trip_through_npz(self):
+        """Saved columns load back unchanged."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.npz')
+            self.columns.save(path)
+            loaded = self.analytics.EventColumns.load(path)
+
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual(loaded.calendar_ids, ['primary'])
+        self.assertTrue((loaded.start == self.columns.start).all())
+        self.assertTrue((loaded.recurring == self.columns.recurring).all())
+
+    def test_engine_reports_summary(self):
+        """The tool lists events once and returns only aggregates."""
+        engine = CalendarEngine()
+        service = Mock()
+        service.events().list().execute.return_value = {'items': EVENTS}
+
+        with patch.object(engine, '_get_service', return_value=service):
+            result = engine.calendar_analytics(days_back=30)
+
+        self.assertIn("4 timed events, 4.5 hours", result)
+        self.assertIn("Busiest days: 2025-06-02 (3.0h)", result)
+
+    def test_export_is_confined_to_the_export_directory(self):
+        """Columns are saved inside GOOSE_CALENDAR_EXPORT_DIR and nowhere else."""
+        engine = CalendarEngine()
+        service = Mock()
+        service.events().list().execute.return_value = {'items': EVENTS}
+
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.dict(os.environ, {'GOOSE_CALENDAR_EXPORT_DIR': directory}), \
+                patch.object(engine, '_get_service', return_value=service):
+            result = engine.calendar_analytics(days_back=30, export_path='load')
+            with self.assertRaises(InvalidInputError):
+                engine.calendar_analytics(days_back=30, export_path='/etc/load')
+
+            self.assertIn(os.path.join(directory, 'load.npz'), result)
+            self.assertEqual(os.listdir(directory), ['load.npz'])
+            self.assertEqual(len(self.analytics.EventColumns.load(os.path.join(directory, 'load.npz'))), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests for the API circuit breaker."""
+
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from googleapiclient.errors import HttpError
+
+from src.goose_calendar.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from src.goose_calendar.engine import ApiUnavailableError, CalendarEngine
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Failures must be consecutive; a success resets the count."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertTrue(breaker.is_open())
+
+    def test_half_open_lets_one_probe_through(self):
+        """After the reset timeout one probe is sent; its outcome decides the state."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+
+class TestEngineBreaker(unittest.TestCase):
+    """The engine stops calling a failing API."""
+
+    def test_open_breaker_fails_fast(self):
+        """Once open, requests are refused without reaching the service."""
+        engine = CalendarEngine()
+        engine._breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        service = Mock()
+        service.events().list().execute.side_effect = HttpError(Mock(status=404, reason='Not Found'), b'')
+
+        with patch.object(engine, '_get_service', return_value=service):
+            # Client errors show the API is up
+            for _ in range(3):
+                with self.assertRaises(HttpError):
+                    engine.search_events("lunch")
+            service.events().list().execute.side_effect = OSError("connection refused")
+            for _ in range(2):
+                with self.assertRaises(OSError):
+                    engine.search_events("lunch")
+            calls = service.events().list().execute.call_count
+
+            with self.assertRaises(ApiUnavailableError):
+                engine.search_events("lunch")
+
+        self.assertEqual(service.events().list().execute.call_count, calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Tests for per-call deadlines."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from googleapiclient.errors import HttpError
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+from src.goose_calendar import deadline, metrics
+from src.goose_calendar.deadline import Deadline
+from src.goose_calendar.engine import CalendarEngine, DeadlineExceededError
+
+
+class TestDeadline(unittest.TestCase):
+    """Test cases for Deadline."""
+
+    def test_expiry_cancellation_and_pauses(self):
+        """A deadline runs out, can be cancelled, and can leave time off the clock."""
+        limit = Deadline(0.05)
+        with limit.paused():
+            time.sleep(0.1)
+        self.assertFalse(limit.expired())
+        time.sleep(0.06)
+        with self.assertRaisesRegex(DeadlineExceededError, "time limit"):
+            limit.check()
+
+        unbounded = Deadline(0)
+        self.assertIsNone(unbounded.remaining())
+        unbounded.cancel()
+        self.assertEqual(unbounded.remaining(), 0.0)
+        with self.assertRaisesRegex(DeadlineExceededError, "cancelled"):
+            unbounded.check()
+
+    def test_bulk_tools_get_the_longer_limit(self):
+        """Bulk operations and other tools read separate settings."""
+        with patch.dict(os.environ, {'GOOSE_CALENDAR_TOOL_TIMEOUT': '5',
+                                     'GOOSE_CALENDAR_BULK_TIMEOUT': '0'}):
+            self.assertEqual(deadline.for_operation('list_events').seconds, 5)
+            self.assertIsNone(deadline.for_operation('import_ics').remaining())
+
+
+class TestEngineDeadlines(unittest.TestCase):
+    """The engine stops work that would outlive the call."""
+
+    def test_retries_are_skipped_without_time_for_the_backoff(self):
+        """A 503 is retried only if the backoff fits in the time left."""
+        request = Mock(method='GET')
+        request.execute.side_effect = HttpError(Mock(status=503, reason='Unavailable'), b'')
+
+        with deadline.bound(Deadline(0.2)), self.assertRaises(HttpError):
+            metrics.execute(request, 'events.list', backoff=0.5)
+        self.assertEqual(request.execute.call_count, 1)
+
+        request.execute.reset_mock()
+        with self.assertRaises(HttpError):
+            metrics.execute(request, 'events.list', backoff=0.01)
+        self.assertEqual(request.execute.call_count, 3)
+
+    def test_expired_call_sends_nothing(self):
+        """Requests are refused once the deadline has passed."""
+        engine = CalendarEngine()
+        service = Mock()
+        limit = Deadline(10)
+        limit.cancel()
+
+        with patch.object(engine, '_get_service', return_value=service), deadline.bound(limit):
+            with self.assertRaisesRegex(DeadlineExceededError, "cancelled"):
+                engine.search_events("lunch")
+
+        service.events().list().execute.assert_not_called()
+
+    def test_export_keeps_pages_read_before_the_deadline(self):
+        """An export cut short writes what it read and says so."""
+        engine = CalendarEngine()
+        page = [{'id': 'a', 'summary': 'Standup', 'start': {'dateTime': '2030-01-01T09:00:00Z'},
+                 'end': {'dateTime': '2030-01-01T09:30:00Z'}}]
+
+        def pages(**params):
+            yield page
+            deadline.current().cancel()  # The client gives up during the next request
+            deadline.check()
+            yield page
+
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(engine, '_iter_pages', side_effect=pages), deadline.bound(Deadline(10)):
+            path = os.path.join(directory, 'out.ics')
+            result = engine.export_ics(path)
+
+            self.assertIn("Exported 1 events", result)
+            self.assertIn("Stopped at the time limit", result)
+            with open(path, encoding='utf-8') as exported:
+                self.assertEqual(exported.read().count('BEGIN:VEVENT'), 1)
+
+    def test_waiter_with_time_left_fetches_after_the_owner_times_out(self):
+        """A shared request that outlives its owner's deadline is retried by the waiter."""
+        with FakeCalendarServer(synthetic_events(5, days=7), latency=0.6) as server, \
+                patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': server.url}):
+            engine = CalendarEngine()
+            engine._get_service()
+            results = {}
+
+            def call(name, seconds):
+                with deadline.bound(Deadline(seconds)):
+                    try:
+                        results[name] = engine.upcoming_events(7, 10)
+                    except DeadlineExceededError as error:
+                        results[name] = error
+
+            hurried = threading.Thread(target=call, args=('hurried', 0.3))
+            patient = threading.Thread(target=call, args=('patient', 60))
+            hurried.start()
+            time.sleep(0.1)
+            patient.start()
+            hurried.join()
+            patient.join()
+
+        self.assertIsInstance(results['hurried'], DeadlineExceededError)
+        self.assertEqual(len(results['patient']), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
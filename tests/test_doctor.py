@@ -0,0 +1,107 @@
+"""Tests for the goose-calendar doctor command."""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+from src.goose_calendar import doctor
+from src.goose_calendar.engine import CalendarEngine
+from src.goose_calendar.write_queue import Journal
+
+
+class TestDoctor(unittest.TestCase):
+    """Run the diagnostics against the offline Calendar API."""
+
+    def setUp(self):
+        self.server = FakeCalendarServer(synthetic_events(50, days=7)).start()
+        self.addCleanup(self.server.stop)
+        env = patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': self.server.url})
+        env.start()
+        self.addCleanup(env.stop)
+        importing = patch.object(doctor, '_time_import', return_value=doctor.Stage('import', 0.5))
+        importing.start()
+        self.addCleanup(importing.stop)
+        self.baseline = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+
+    def _run(self, **kwargs):
+        out = io.StringIO()
+        status = doctor.main(self.baseline, engine=CalendarEngine(), out=out, **kwargs)
+        return status, out.getvalue()
+
+    def test_reports_every_stage(self):
+        """Each stage gets a line, and the cache state is described."""
+        status, report = self._run()
+
+        self.assertEqual(status, 0)
+        for stage in ('import', 'service.build', 'events.list', 'cache.load'):
+            self.assertIn(f"✅ {stage}", report)
+        self.assertIn("50 events cached", report)
+        self.assertIn("slowest stage: import", report)
+
+    def test_compares_with_the_saved_baseline(self):
+        """A stage much slower than its baseline is flagged."""
+        self._run(save=True)
+        stages = doctor.load_baseline(self.baseline)
+        self.assertIn('events.list#2', stages)
+
+        with patch.object(doctor, '_time_import', return_value=doctor.Stage('import', 2.0)):
+            _, report = self._run()
+
+        self.assertIn("(baseline 500 ms) ⚠️ 4.0x slower", report)
+
+    def test_failed_stage_stops_the_run(self):
+        """A stage that fails is reported and the command exits non-zero."""
+        self.server.stop()
+
+        status, report = self._run()
+
+        self.assertEqual(status, 1)
+        self.assertIn("❌ events.list", report)
+        self.assertNotIn("cache.load", report)
+
+    def test_journal_and_snapshot_are_left_alone(self):
+        """Queued writes are counted, not sent, and no snapshot is written."""
+        directory = tempfile.mkdtemp()
+        token = os.path.join(directory, 'token.pickle')
+        write = {'seq': 1, 'operation': 'insert', 'event_id': 'queued001', 'etag': None,
+                 'queued_at': 0, 'body': {'id': 'queued001', 'summary': 'Queued',
+                                          'start': {'date': '2030-01-02'}, 'end': {'date': '2030-01-03'}}}
+        Journal(os.path.join(directory, 'token.journal')).append(write)
+
+        with patch.dict(os.environ, {'GOOSE_CALENDAR_WRITE_BEHIND': '1', 'GOOSE_CALENDAR_SNAPSHOT': '1'}), \
+                patch.object(doctor, 'CalendarEngine',
+                             side_effect=lambda **kwargs: CalendarEngine(token_file=token, **kwargs)):
+            stages = doctor.run()
+
+        self.assertIn("1 writes waiting to be sent", stages[-1].detail)
+        self.assertEqual(Journal(os.path.join(directory, 'token.journal')).replay(), [write])
+        self.assertEqual(self.server.store.get('primary', 'queued001')[0], 404)
+        self.assertEqual(sorted(os.listdir(directory)), ['token.journal'])
+
+
+
+class TestImportStage(unittest.TestCase):
+    """The import stage's interpreter, run for real."""
+
+    def test_import_leaves_journal_alone(self):
+        """The server imported for timing does not open the write-behind journal."""
+        home = tempfile.mkdtemp()
+        journal = os.path.join(home, '.goose_calendar_token.journal')
+        write = {'seq': 1, 'operation': 'delete', 'event_id': 'queued001', 'etag': None,
+                 'queued_at': 0, 'body': None}
+        Journal(journal).append(write)
+
+        with patch.dict(os.environ, {'HOME': home, 'GOOSE_CALENDAR_WRITE_BEHIND': '1',
+                                     'GOOSE_CALENDAR_SNAPSHOT': '1',
+                                     'GOOSE_CALENDAR_API_ROOT': 'http://127.0.0.1:9'}):
+            stage = doctor._time_import()
+
+        self.assertTrue(stage.ok, stage.detail)
+        self.assertEqual(Journal(journal).replay(), [write])
+        self.assertEqual(sorted(os.listdir(home)), ['.goose_calendar_token.journal'])
+
+if __name__ == '__main__':
+    unittest.main()
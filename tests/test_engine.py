@@ -0,0 +1,391 @@
+"""Tests for the shared calendar engine."""
+
+import os
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from googleapiclient.errors import HttpError
+
+from src.goose_calendar.cache import rfc3339
+from benchmarks.fake_calendar_api import FakeCalendarServer
+from src.goose_calendar.engine import (
+    CalendarEngine, InvalidInputError, format_ambiguous, format_event_list
+)
+from src.goose_calendar.records import EventRecord
+
+
+def _event(event_id, hours_from_now, summary='Meeting'):
+    start = time.time() + hours_from_now * 3600
+    return {'id': event_id, 'summary': summary, 'status': 'confirmed',
+            'start': {'dateTime': rfc3339(start)}, 'end': {'dateTime': rfc3339(start + 1800)}}
+
+
+class TestCalendarEngine(unittest.TestCase):
+    """Test cases for CalendarEngine."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.engine = CalendarEngine()
+
+    def test_concurrent_identical_reads_share_one_request(self):
+        """Identical in-flight reads are coalesced into a single API call."""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_execute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'items': [_event('a', 1, 'Standup')]}
+
+        mock_service = Mock()
+        mock_service.events().list().execute.side_effect = slow_execute
+
+        results = []
+        with patch.object(self.engine, '_get_service', return_value=mock_service):
+            threads = [
+                threading.Thread(target=lambda: results.append(self.engine.upcoming_events(7, 10)))
+                for _ in range(5)
+            ]
+            threads[0].start()
+            started.wait(5)
+            for thread in threads[1:]:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_coalesced_failure_propagates_and_clears(self):
+        """A failed request is reported to its caller and not remembered."""
+        mock_service = Mock()
+        mock_service.events().list().execute.side_effect = [
+            RuntimeError("boom"),
+            {'items': []},
+        ]
+
+        with patch.object(self.engine, '_get_service', return_value=mock_service):
+            with self.assertRaises(RuntimeError):
+                self.engine.search_events("lunch")
+            self.assertEqual(self.engine.search_events("lunch"), [])
+
+    def test_edit_event_does_not_mutate_shared_results(self):
+        """Edits apply to a copy of the (possibly shared) search result."""
+        found = {'id': 'e1', 'summary': 'Lunch', 'start': {'dateTime': '2025-07-03T12:00:00'},
+                 'end': {'dateTime': '2025-07-03T13:00:00'}}
+        mock_service = Mock()
+        mock_service.events().list().execute.return_value = {'items': [found]}
+
+        with patch.object(self.engine, '_get_service', return_value=mock_service):
+            result = self.engine.edit_event("Lunch", new_title="Brunch")
+
+        self.assertIn("Brunch", result)
+        self.assertEqual(found['summary'], 'Lunch')
+
+    def test_edit_event_patches_only_changed_fields_with_etag(self):
+        """Edits send a minimal patch guarded by the event's ETag."""
+        found = {'id': 'e1', 'etag': '"7"', 'summary': 'Lunch', 'attendees': [{'email': 'a@b.c'}],
+                 'start': {'dateTime': '2025-07-03T12:00:00', 'timeZone': 'America/New_York'},
+                 'end': {'dateTime': '2025-07-03T13:00:00', 'timeZone': 'America/New_York'}}
+        mock_service = Mock()
+        mock_service.events().list().execute.return_value = {'items': [found]}
+        request = mock_service.events().patch.return_value
+        request.headers = {}
+
+        with patch.object(self.engine, '_get_service', return_value=mock_service):
+            self.engine.edit_event("Lunch", new_location="Cafe",
+                                   new_start_time="2025-07-03T12:30:00")
+
+        body = mock_service.events().patch.call_args.kwargs['body']
+        self.assertEqual(set(body), {'location', 'start'})
+        self.assertEqual(body['start'], {'dateTime': '2025-07-03T12:30:00',
+                                         'timeZone': 'America/New_York'})
+        self.assertEqual(request.headers['If-Match'], '"7"')
+        mock_service.events().update.assert_not_called()
+
+    def test_edit_event_reports_concurrent_change(self):
+        """A failed If-Match precondition leaves the event unchanged."""
+        found = {'id': 'e1', 'etag': '"7"', 'summary': 'Lunch',
+                 'start': {'dateTime': '2025-07-03T12:00:00'}, 'end': {'dateTime': '2025-07-03T13:00:00'}}
+        mock_service = Mock()
+        mock_service.events().list().execute.return_value = {'items': [found]}
+        mock_service.events().patch().headers = {}
+        mock_service.events().patch().execute.side_effect = HttpError(
+            Mock(status=412, reason='Precondition Failed'), b'')
+
+        with patch.object(self.engine, '_get_service', return_value=mock_service):
+            result = self.engine.edit_event("Lunch", new_title="Brunch")
+
+        self.assertIn("changed elsewhere", result)
+        mock_service.events().get.assert_called_with(calendarId='primary', eventId='e1')
+
+
+class TestEventWindowCache(unittest.TestCase):
+    """Test cases for serving list_events from the event cache."""
+
+    def setUp(self):
+        """Set up an engine whose service is a mock."""
+        self.engine = CalendarEngine()
+        self.service = Mock()
+        patcher = patch.object(self.engine, '_get_service', return_value=self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_window_is_listed_once_then_served_from_cache(self):
+        """Repeated lists within the TTL reuse the prefetched window."""
+        self.service.events().list().execute.return_value = {
+            'items': [_event('b', 30), _event('a', 2)]}
+        self.service.events().list.reset_mock()
+
+        first = self.engine.window_events(7, 10)
+        second = self.engine.window_events(3, 1)
+
+        self.assertEqual(self.service.events().list.call_count, 1)
+        self.assertEqual([event.id for event in first], ['a', 'b'])
+        self.assertEqual([event.id for event in second], ['a'])
+
+    def test_writes_update_the_cache(self):
+        """Created and deleted events are reflected without re-listing."""
+        self.service.events().list().execute.return_value = {'items': [_event('a', 2)]}
+        self.engine.prefetch()
+        self.service.events().insert().execute.return_value = _event('new', 1, 'Lunch')
+
+        self.engine.add_event("Lunch", "2030-01-01T12:00:00")
+        self.assertEqual([e.id for e in self.engine.window_events(7, 10)], ['new', 'a'])
+
+        self.engine.delete_event("Meeting")
+        self.assertEqual([e.id for e in self.engine.window_events(7, 10)], ['new'])
+
+    def test_stale_cache_is_served_while_syncing_in_background(self):
+        """After the TTL cached events are returned at once and a delta
+        listing updates and removes them in the background."""
+        self.service.events().list().execute.return_value = {
+            'items': [_event('a', 2), _event('b', 3)]}
+        self.engine.prefetch()
+        self.engine._cache.synced_at -= self.engine._cache.ttl + 1
+
+        cancelled = dict(_event('b', 3), status='cancelled')
+        self.service.events().list().execute.return_value = {
+            'items': [_event('a', 4, 'Moved'), cancelled]}
+        self.service.events().list.reset_mock()
+
+        stale = self.engine.list_events(7, 10)
+        self.engine._revalidation.join(5)
+        events = self.engine.window_events(7, 10)
+
+        self.assertIn("refreshing in the background", stale)
+        self.assertIn('updatedMin', self.service.events().list.call_args.kwargs)
+        self.assertTrue(self.service.events().list.call_args.kwargs['showDeleted'])
+        self.assertEqual([(e.id, e.summary) for e in events], [('a', 'Moved')])
+
+    def test_very_stale_cache_is_served_when_the_api_fails(self):
+        """Past the staleness limit the sync is awaited, but failures fall back to the cache."""
+        self.service.events().list().execute.return_value = {'items': [_event('a', 2)]}
+        self.engine.prefetch()
+        self.engine._cache.synced_at -= 3600
+        self.service.events().list().execute.side_effect = HttpError(
+            Mock(status=503, reason='Backend Error'), b'')
+
+        result = self.engine.list_events(7, 10)
+
+        self.assertIn("Google Calendar is not responding; showing events cached 60 minutes ago", result)
+        self.assertIn("Meeting", result)
+
+    def test_edit_searches_the_year_even_with_one_cached_match(self):
+        """A query matching one cached event but several in the year is ambiguous."""
+        self.service.events().list().execute.return_value = {
+            'items': [_event('a', 2, 'Dentist'), _event('b', 3, 'Standup')]}
+        self.engine.prefetch()
+        self.service.events().list().execute.return_value = {
+            'items': [_event('a', 2, 'Dentist'), _event('c', 40, 'Dentist')]}
+
+        result = self.engine.edit_event("dentist", new_title="Dentist visit")
+
+        self.assertIn("Multiple events found matching 'dentist'", result)
+        self.service.events().patch.assert_not_called()
+        self.assertEqual(self.engine._cache.get('a').summary, 'Dentist')
+
+    def test_long_windows_bypass_the_cache(self):
+        """Windows beyond the cached horizon are listed directly."""
+        self.service.events().list().execute.return_value = {'items': []}
+        self.service.events().list.reset_mock()
+
+        self.engine.window_events(30, 10)
+
+        self.assertEqual(self.service.events().list.call_args.kwargs['maxResults'], 10)
+        self.assertEqual(len(self.engine._cache), 0)
+
+    def test_warm_up_prefetches_when_token_exists(self):
+        """Warm-up builds the service and loads the window; it is skipped without a token."""
+        self.service.events().list().execute.return_value = {'items': [_event('a', 2)]}
+
+        with patch('src.goose_calendar.engine.os.path.exists', return_value=False):
+            self.assertFalse(self.engine.warm_up())
+        self.assertIsNone(self.engine._cache.window)
+
+        with patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': 'http://127.0.0.1:1/'}):
+            self.assertTrue(self.engine.warm_up())
+        self.assertEqual(len(self.engine._cache), 1)
+
+
+class TestShiftEvents(unittest.TestCase):
+    """Bulk rescheduling against the offline Calendar API."""
+
+    def setUp(self):
+        """Seed a fake Calendar API with a day of meetings."""
+        self.server = FakeCalendarServer([
+            {'id': 'standup', 'summary': 'Standup',
+             'start': {'dateTime': '2030-03-08T09:00:00-05:00', 'timeZone': 'America/New_York'},
+             'end': {'dateTime': '2030-03-08T09:30:00-05:00', 'timeZone': 'America/New_York'}},
+            {'id': 'review', 'summary': 'Design review',
+             'start': {'dateTime': '2030-03-08T14:00:00-05:00', 'timeZone': 'America/New_York'},
+             'end': {'dateTime': '2030-03-08T15:00:00-05:00', 'timeZone': 'America/New_York'}},
+            {'id': 'offsite', 'summary': 'Offsite',
+             'start': {'date': '2030-03-08'}, 'end': {'date': '2030-03-09'}},
+            {'id': 'later', 'summary': 'Standup',
+             'start': {'dateTime': '2030-03-09T09:00:00-05:00'},
+             'end': {'dateTime': '2030-03-09T09:30:00-05:00'}},
+        ]).start()
+        self.addCleanup(self.server.stop)
+        env = patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': self.server.url})
+        env.start()
+        self.addCleanup(env.stop)
+        self.engine = CalendarEngine()
+
+    def _start(self, event_id):
+        return self.server.store.get('primary', event_id)[1]['start']
+
+    def test_dry_run_lists_moves_without_changing_anything(self):
+        """A dry run previews each move and sends no writes."""
+        result = self.engine.shift_events("2030-03-08", days=2, dry_run=True)
+
+        self.assertIn("Would move 3 events later by 2 days", result)
+        self.assertIn("• Standup: 2030-03-08 09:00 AM → 2030-03-10 09:00 AM", result)
+        self.assertIn("• Offsite: 2030-03-08 (All day) → 2030-03-10 (All day)", result)
+        self.assertEqual(self._start('standup')['dateTime'], '2030-03-08T09:00:00-05:00')
+
+    def test_shift_patches_matching_events_in_one_batch(self):
+        """Matching events in the range move together, keeping local time across DST."""
+        result = self.engine.shift_events("2030-03-08", query="standup", days=2)
+
+        self.assertIn("Moved 1 events matching 'standup' later by 2 days", result)
+        self.assertEqual(self.server.store.batches, 1)
+        self.assertEqual(self._start('standup'), {'dateTime': '2030-03-10T09:00:00-04:00',
+                                                  'timeZone': 'America/New_York'})
+        self.assertEqual(self._start('later')['dateTime'], '2030-03-09T09:00:00-05:00')
+
+    def test_partial_day_offsets_leave_all_day_events(self):
+        """All-day events only move by whole days."""
+        result = self.engine.shift_events("2030-03-08", hours=-1)
+
+        self.assertIn("Moved 2 events earlier by 1 hour", result)
+        self.assertIn("1 all-day events were left in place", result)
+        self.assertEqual(self._start('review')['dateTime'], '2030-03-08T13:00:00-05:00')
+        self.assertEqual(self._start('offsite'), {'date': '2030-03-08'})
+
+    def test_zero_offset_is_invalid(self):
+        """An offset of zero is rejected before anything is listed."""
+        with self.assertRaises(InvalidInputError):
+            self.engine.shift_events("2030-03-08")
+
+
+class TestFindDuplicates(unittest.TestCase):
+    """Duplicate detection and cleanup against the offline Calendar API."""
+
+    def setUp(self):
+        """Seed a fake Calendar API with a meeting created three times and a look-alike."""
+        start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        times = {'start': {'dateTime': start.isoformat()},
+                 'end': {'dateTime': (start + timedelta(hours=1)).isoformat()}}
+        self.server = FakeCalendarServer([
+            {'id': 'retry2', 'summary': 'Team  sync', 'location': 'Room 1',
+             'created': '2030-01-01T10:02:00Z', **times},
+            {'id': 'original', 'summary': 'Team sync', 'location': 'Room 1',
+             'created': '2030-01-01T10:00:00Z', **times},
+            {'id': 'retry1', 'summary': 'team sync', 'location': 'room 1',
+             'created': '2030-01-01T10:01:00Z', **times},
+            {'id': 'elsewhere', 'summary': 'Team sync', 'location': 'Room 2',
+             'created': '2030-01-01T10:03:00Z', **times},
+        ]).start()
+        self.addCleanup(self.server.stop)
+        env = patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': self.server.url})
+        env.start()
+        self.addCleanup(env.stop)
+        self.engine = CalendarEngine()
+
+    def _exists(self, event_id):
+        status, body = self.server.store.get('primary', event_id)
+        return status == 200 and body['status'] != 'cancelled'
+
+    def test_lists_copies_without_deleting(self):
+        """Events with the same normalized title, times and location are grouped."""
+        result = self.engine.find_duplicates()
+
+        self.assertIn("Found 2 duplicate events, copies of 1 events:\\n\\n", result)
+        self.assertIn("(3 copies)", result)
+        self.assertNotIn("\n", result)
+        self.assertTrue(all(self._exists(event_id) for event_id in ('retry1', 'retry2')))
+
+    def test_delete_keeps_the_earliest_created_in_one_batch(self):
+        """The copies go in a single batch request; the original and the look-alike stay."""
+        result = self.engine.find_duplicates(delete=True)
+
+        self.assertIn("Deleted 2 duplicate events", result)
+        self.assertEqual(self.server.store.batches, 1)
+        self.assertTrue(self._exists('original'))
+        self.assertTrue(self._exists('elsewhere'))
+        self.assertFalse(self._exists('retry1'))
+        self.assertFalse(self._exists('retry2'))
+        self.assertIn("No duplicate events found", self.engine.find_duplicates())
+
+    def test_add_event_with_an_id_is_idempotent(self):
+        """Retrying an insert with the same client ID does not create a copy."""
+        first = self.engine.add_event("Retro", "2030-01-15 10:00", event_id="retro0001")
+        second = self.engine.add_event("Retro", "2030-01-15 10:00", event_id="retro0001")
+
+        self.assertIn("created successfully", first)
+        self.assertIn("already exists", second)
+        self.assertTrue(self._exists('retro0001'))
+        with self.assertRaises(InvalidInputError):
+            self.engine.add_event("Retro", "2030-01-15 10:00", event_id="Not-Valid")
+
+
+class TestFormatting(unittest.TestCase):
+    """Test cases for response formatting."""
+
+    def test_format_event_list(self):
+        """Timed and all-day events are rendered with their details."""
+        events = [EventRecord.from_api(event) for event in [
+            {'summary': 'Standup', 'start': {'dateTime': '2025-07-03T09:00:00-04:00'},
+             'location': 'Room 4B'},
+            {'summary': 'Holiday', 'start': {'date': '2025-07-04'}, 'description': 'x' * 150},
+        ]]
+
+        result = format_event_list(events, 7)
+
+        self.assertIn("2025-07-03 at 09:00 AM", result)
+        self.assertIn("2025-07-04 (All day)", result)
+        self.assertIn("📍 Room 4B", result)
+        self.assertIn("x" * 100 + "...", result)
+
+    def test_format_ambiguous_lists_first_five(self):
+        """At most five candidate events are listed."""
+        events = [EventRecord.from_api({'summary': f'Sync {i}', 'start': {'date': '2025-07-04'}})
+                  for i in range(8)]
+
+        result = format_ambiguous(events, "Sync")
+
+        self.assertIn("5. Sync 4 (2025-07-04)", result)
+        self.assertNotIn("Sync 5", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests for the conditional-request response cache."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+from src.goose_calendar import metrics
+from src.goose_calendar.engine import CalendarEngine
+from src.goose_calendar.http_cache import DECODED_BYTES_PER_BYTE, ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache."""
+
+    def test_least_recently_used_entries_are_evicted_by_size(self):
+        """Storing past the byte budget drops the least recently read entries."""
+        cache = ResponseCache(max_bytes=25)
+        cache.set('a', b'x' * 10)
+        cache.set('b', b'x' * 10)
+        cache.get('a')
+        cache.set('c', b'x' * 10)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.size, 20)
+
+    def test_entry_limit(self):
+        """No more than max_entries responses are kept."""
+        cache = ResponseCache(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, b'x')
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('a'))
+
+    def test_decoded_bodies_follow_their_entry(self):
+        """Decoded bodies are returned for the matching ETag until the entry goes."""
+        cache = ResponseCache()
+        self.assertTrue(cache)
+        cache.set('a', b'raw')
+        cache.remember_decoded('a', '"1"', {'items': []})
+
+        self.assertEqual(cache.decoded('a', '"1"'), {'items': []})
+        self.assertIsNone(cache.decoded('a', '"2"'))
+        cache.delete('a')
+        self.assertIsNone(cache.decoded('a', '"1"'))
+
+    def test_decoded_bodies_count_against_the_byte_budget(self):
+        """Remembering a decoded body can evict older entries, and deleting frees it."""
+        cache = ResponseCache(max_bytes=10 + 10 * (1 + DECODED_BYTES_PER_BYTE))
+        cache.set('a', b'x' * 10)
+        cache.set('b', b'x' * 10)
+        self.assertEqual(cache.size, 20)
+
+        cache.remember_decoded('b', '"1"', {'items': []})
+        self.assertEqual(cache.size, 10 + 10 * (1 + DECODED_BYTES_PER_BYTE))
+        cache.get('a')
+        cache.remember_decoded('a', '"1"', {'items': []})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.size, 10 * (1 + DECODED_BYTES_PER_BYTE))
+        cache.delete('a')
+        self.assertEqual(cache.size, 0)
+
+
+class TestConditionalReads(unittest.TestCase):
+    """Repeated reads against the offline Calendar API."""
+
+    def test_unchanged_listing_is_revalidated_not_redownloaded(self):
+        """A repeated listing is a 304 served from cache until the calendar changes."""
+        with FakeCalendarServer(synthetic_events(200, days=30)) as server, \
+                patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': server.url,
+                                        'GOOSE_CALENDAR_CACHE_TTL': '0'}), \
+                patch('src.goose_calendar.engine._list_window',
+                      return_value=('2030-01-01T00:00:00Z', '2030-02-01T00:00:00Z')):
+            engine = CalendarEngine()
+            hits = metrics.CACHE_REQUESTS.value(cache='http', result='hit')
+
+            first = engine.upcoming_events(30, 250)
+            second = engine.upcoming_events(30, 250)
+            self.assertIs(second, first)
+            self.assertEqual(metrics.CACHE_REQUESTS.value(cache='http', result='hit'), hits + 1)
+
+            engine.add_event("Review", "2030-01-01T10:00:00")
+            third = engine.upcoming_events(30, 250)
+            self.assertIsNot(third, first)
+            self.assertEqual(metrics.CACHE_REQUESTS.value(cache='http', result='hit'), hits + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Tests for iCalendar import and export."""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+from src.goose_calendar import ics
+from src.goose_calendar.engine import CalendarEngine, InvalidInputError
+
+SAMPLE = (
+    "BEGIN:VCALENDAR\r\n"
+    "X-WR-TIMEZONE:Europe/Berlin\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:plan@example.com\r\n"
+    "DTSTART;TZID=America/New_York:20250101T090000\r\n"
+    "DURATION:PT1H30M\r\n"
+    "SUMMARY:Plan\\, review\\; and a summary long enough that it had to be fol\r\n"
+    " ded\r\n"
+    "DESCRIPTION:line1\\nline2\r\n"
+    "ATTENDEE;CN=\"Doe, Jane\":mailto:jane@example.com\r\n"
+    "RRULE:FREQ=WEEKLY;COUNT=3\r\n"
+    "BEGIN:VALARM\r\n"
+    "DESCRIPTION:Reminder\r\n"
+    "END:VALARM\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:plan@example.com\r\n"
+    "RECURRENCE-ID;TZID=America/New_York:20250108T090000\r\n"
+    "DTSTART;TZID=America/New_York:20250108T100000\r\n"
+    "SUMMARY:Moved occurrence\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART:20250102T100000\r\n"
+    "SUMMARY:Floating\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART;VALUE=DATE:20250103\r\n"
+    "SUMMARY:Holiday\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+class TestIcsFormat(unittest.TestCase):
+    """Test cases for reading and writing iCalendar data."""
+
+    def test_read_events(self):
+        """VEVENTs become import bodies; alarms and overrides are skipped."""
+        events = list(ics.read_events(io.StringIO(SAMPLE)))
+
+        self.assertEqual([e['summary'] for e in events][1:], ['Floating', 'Holiday'])
+        plan = events[0]
+        self.assertEqual(plan['summary'],
+                         'Plan, review; and a summary long enough that it had to be folded')
+        self.assertEqual(plan['description'], 'line1\nline2')
+        self.assertEqual(plan['end'], {'dateTime': '2025-01-01T10:30:00',
+                                       'timeZone': 'America/New_York'})
+        self.assertEqual(plan['attendees'], [{'email': 'jane@example.com', 'displayName': 'Doe, Jane'}])
+        self.assertEqual(plan['recurrence'], ['RRULE:FREQ=WEEKLY;COUNT=3'])
+        self.assertEqual(events[1]['start']['timeZone'], 'Europe/Berlin')
+        self.assertEqual(events[2]['end'], {'date': '2025-01-04'})
+        self.assertTrue(events[2]['iCalUID'])
+
+    def test_written_calendar_reads_back(self):
+        """Writing then reading events round-trips them, with folded lines."""
+        events = list(ics.read_events(io.StringIO(SAMPLE)))
+        out = io.StringIO()
+
+        self.assertEqual(ics.write_calendar(events, out), 3)
+        text = out.getvalue()
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in text.split('\r\n')))
+        self.assertEqual(list(ics.read_events(io.StringIO(text))), events)
+
+
+class TestIcsTransfer(unittest.TestCase):
+    """Import and export against the offline Calendar API."""
+
+    def setUp(self):
+        """Start a fake Calendar API and an engine pointed at it."""
+        self.server = FakeCalendarServer().start()
+        self.addCleanup(self.server.stop)
+        env = patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': self.server.url})
+        env.start()
+        self.addCleanup(env.stop)
+        self.engine = CalendarEngine()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_import_is_batched_and_idempotent(self):
+        """Events are sent in batches with progress, and re-importing updates them."""
+        path = os.path.join(self.directory.name, 'in.ics')
+        with open(path, 'w', newline='') as f:
+            ics.write_calendar(synthetic_events(120), f)
+        updates = []
+
+        result = self.engine.import_ics(path, progress=lambda *args: updates.append(args))
+        self.engine.import_ics(path)
+
+        self.assertIn("Imported 120 events", result)
+        self.assertEqual(self.server.store.batches, 6)
+        self.assertEqual(len(self.server.store.list('primary', {})[1]['items']), 120)
+        self.assertEqual(updates[-1][0], os.path.getsize(path))
+
+    def test_export_writes_every_event(self):
+        """Exported files contain each event in the range once."""
+        self.server.store.seed(synthetic_events(30, days=20))
+        path = os.path.join(self.directory.name, 'out.ics')
+
+        result = self.engine.export_ics(path, days_back=1, days_ahead=30)
+
+        self.assertIn("Exported 30 events", result)
+        with open(path, newline='') as f:
+            self.assertEqual(len(list(ics.read_events(f))), 30)
+
+    def test_exports_stay_inside_the_export_directory(self):
+        """With an export directory set, names resolve inside it and escapes are refused."""
+        with patch.dict(os.environ, {'GOOSE_CALENDAR_EXPORT_DIR': self.directory.name}):
+            result = self.engine.export_ics('backup', days_back=1, days_ahead=1)
+            with self.assertRaises(InvalidInputError):
+                self.engine.export_ics(os.path.join(self.directory.name, '..', 'escape.ics'))
+
+        self.assertIn(os.path.join(self.directory.name, 'backup.ics'), result)
+        self.assertTrue(os.path.isfile(os.path.join(self.directory.name, 'backup.ics')))
+
+    def test_export_never_replaces_other_files(self):
+        """Links and directories are not replaced, and a failed export leaves no partial file."""
+        target = os.path.join(self.directory.name, 'target.ics')
+        with open(target, 'w') as f:
+            f.write('keep')
+        os.symlink(target, os.path.join(self.directory.name, 'link.ics'))
+        os.mkdir(os.path.join(self.directory.name, 'folder.ics'))
+        for name in ('link.ics', 'folder.ics'):
+            with self.assertRaises(InvalidInputError):
+                self.engine.export_ics(os.path.join(self.directory.name, name))
+
+        with patch('src.goose_calendar.engine.ics.write_calendar', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.engine.export_ics(target)
+        with open(target) as f:
+            self.assertEqual(f.read(), 'keep')
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['folder.ics', 'link.ics', 'target.ics'])
+
+    def test_missing_file_is_invalid_input(self):
+        """A missing file is reported as bad input."""
+        with self.assertRaises(InvalidInputError):
+            self.engine.import_ics(os.path.join(self.directory.name, 'nope.ics'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for the Calendar MCP server."""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import anyio
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS
+
+from src.goose_calendar import deadline, mcp_server
+from src.goose_calendar.accounts import AccountTokens
+
+
+class TestMcpTools(unittest.TestCase):
+    """Test cases for the MCP tool functions."""
+
+    @patch.object(mcp_server.calendar_manager, '_get_service')
+    def test_list_events_no_events(self, mock_get_service):
+        """Test listing events when no events exist."""
+        mcp_server.calendar_manager._cache.clear()
+        mock_service = Mock()
+        mock_service.events().list().execute.return_value = {'items': []}
+        mock_get_service.return_value = mock_service
+
+        result = asyncio.run(mcp_server.list_events())
+
+        self.assertIn("No upcoming events found", result)
+
+    @patch.object(mcp_server.calendar_manager, '_get_service')
+    def test_add_event_bad_time_is_invalid_params(self, mock_get_service):
+        """Unparseable input surfaces as an INVALID_PARAMS MCP error."""
+        mock_get_service.return_value = Mock()
+
+        with self.assertRaises(McpError) as raised:
+            asyncio.run(mcp_server.add_event(title="Lunch", start_time="not a time at all"))
+
+        self.assertEqual(raised.exception.error.code, INVALID_PARAMS)
+        self.assertIn("Could not parse start time", raised.exception.error.message)
+
+    def test_cancelled_call_stops_its_worker(self):
+        """A client cancelling a call returns at once and cancels the worker's deadline."""
+        stopped = threading.Event()
+
+        def slow_list(days_ahead, max_results):
+            while not deadline.expired():
+                time.sleep(0.01)
+            stopped.set()
+            return "never seen"
+
+        async def cancel_soon():
+            with anyio.move_on_after(0.05):
+                await mcp_server._call('list_events', 7, 10)
+
+        with patch.object(mcp_server.calendar_manager, 'list_events', side_effect=slow_list):
+            asyncio.run(cancel_soon())
+            self.assertTrue(stopped.wait(2))
+
+
+class TestRequestAccount(unittest.TestCase):
+    """Accounts of HTTP requests come from their bearer token."""
+
+    def setUp(self):
+        tokens = patch.object(mcp_server, 'account_tokens', AccountTokens({'t-alice': 'alice'}))
+        tokens.start()
+        self.addCleanup(tokens.stop)
+
+    def _account(self, headers):
+        context = Mock()
+        context.request_context.request.headers = headers
+        with patch.object(mcp_server.mcp, 'get_context', return_value=context):
+            return mcp_server._request_account()
+
+    def test_bearer_token_selects_its_account(self):
+        """The account is the token's; a header naming another account is ignored."""
+        self.assertEqual(self._account({'authorization': 'Bearer t-alice',
+                                        'x-calendar-account': 'bob'}), 'alice')
+
+    def test_missing_or_unknown_token_is_refused(self):
+        """Without a known token no account, the default included, is served."""
+        for headers in ({}, {'authorization': 'Bearer t-bob'}, {'x-calendar-account': 'alice'}):
+            with self.assertRaises(mcp_server.AuthenticationError):
+                self._account(headers)
+
+    def test_metrics_need_a_known_token(self):
+        """/metrics is refused without a bearer token the server issued."""
+        refused = asyncio.run(mcp_server.metrics_endpoint(Mock(headers={})))
+        scraped = asyncio.run(mcp_server.metrics_endpoint(
+            Mock(headers={'authorization': 'Bearer t-alice'})))
+
+        self.assertEqual(refused.status_code, 401)
+        self.assertEqual(scraped.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
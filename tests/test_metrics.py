@@ -0,0 +1,71 @@
+"""Tests for calendar metrics."""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from googleapiclient.errors import HttpError
+
+from src.goose_calendar import metrics
+
+
+def _http_error(status):
+    return HttpError(Mock(status=status, reason='error'), b'{}')
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics registry and helpers."""
+
+    def setUp(self):
+        """Start every test from an empty registry."""
+        metrics.REGISTRY.reset()
+
+    def test_instrument_tool_records_outcomes(self):
+        """Successful and failing calls are counted separately."""
+        @metrics.instrument_tool('test')
+        def flaky(fail=False):
+            if fail:
+                raise ValueError("nope")
+            return "ok"
+
+        flaky()
+        with self.assertRaises(ValueError):
+            flaky(fail=True)
+
+        self.assertEqual(metrics.TOOL_CALLS.value(frontend='test', tool='flaky', outcome='ok'), 1)
+        self.assertEqual(metrics.TOOL_CALLS.value(frontend='test', tool='flaky', outcome='error'), 1)
+        self.assertEqual(metrics.TOOL_LATENCY.count(frontend='test', tool='flaky'), 2)
+
+    @patch('src.goose_calendar.metrics.time.sleep')
+    def test_execute_retries_idempotent_requests(self, mock_sleep):
+        """Transient errors on GET requests are retried and counted."""
+        request = Mock(method='GET', postproc=None)
+        request.execute.side_effect = [_http_error(503), {'items': []}]
+
+        self.assertEqual(metrics.execute(request, 'events.list'), {'items': []})
+        self.assertEqual(metrics.API_RETRIES.value(method='events.list'), 1)
+        self.assertEqual(metrics.API_CALLS.value(method='events.list', status='503'), 1)
+        self.assertEqual(metrics.API_CALLS.value(method='events.list', status='ok'), 1)
+
+    def test_execute_does_not_retry_inserts(self):
+        """A failed POST is surfaced immediately rather than risking duplicates."""
+        request = Mock(method='POST', postproc=None)
+        request.execute.side_effect = _http_error(503)
+
+        with self.assertRaises(HttpError):
+            metrics.execute(request, 'events.insert')
+        self.assertEqual(request.execute.call_count, 1)
+
+    def test_render_prometheus(self):
+        """Histograms render cumulative buckets, sum and count."""
+        metrics.API_LATENCY.observe(0.02, method='events.list')
+
+        text = metrics.REGISTRY.render_prometheus()
+
+        self.assertIn('# TYPE goose_calendar_api_latency_seconds histogram', text)
+        self.assertIn('goose_calendar_api_latency_seconds_bucket{method="events.list",le="0.025"} 1', text)
+        self.assertIn('goose_calendar_api_latency_seconds_bucket{method="events.list",le="0.01"} 0', text)
+        self.assertIn('goose_calendar_api_latency_seconds_count{method="events.list"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for the people index and people-based lookups."""
+
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.goose_calendar.cache import EventCache, rfc3339
+from src.goose_calendar.engine import CalendarEngine
+from src.goose_calendar.people import PeopleIndex
+from src.goose_calendar.records import EventRecord
+
+
+def _event(event_id, start, summary, attendees=(), organizer=None):
+    event = {'id': event_id, 'summary': summary,
+             'start': {'dateTime': rfc3339(start)}, 'end': {'dateTime': rfc3339(start + 1800)},
+             'attendees': list(attendees)}
+    if organizer:
+        event['organizer'] = organizer
+    return event
+
+
+DANA = {'email': 'Dana.Scully@example.com', 'displayName': 'Dana Scully'}
+FOX = {'email': 'fox@example.com', 'displayName': 'Fox Mulder'}
+
+
+class TestPeopleIndex(unittest.TestCase):
+    """Test cases for PeopleIndex."""
+
+    def test_lookup_by_email_user_name_and_name_words(self):
+        """A person is found by address, user name or any words of their name."""
+        now = time.time()
+        index = PeopleIndex([
+            EventRecord.from_api(_event('a', now, 'Case review', [DANA, FOX])),
+            EventRecord.from_api(_event('b', now, '1:1', [FOX], organizer=DANA)),
+            EventRecord.from_api(_event('c', now, 'Dana Scully birthday')),
+        ])
+
+        self.assertEqual(index.find('dana.scully@EXAMPLE.com'), {'a', 'b'})
+        self.assertEqual(index.find('dana'), {'a', 'b'})
+        self.assertEqual(index.find('Scully, Dana'), {'a', 'b'})
+        self.assertEqual(index.find('dana smith'), set())
+        self.assertEqual(index.find('fox'), {'a', 'b'})
+
+
+class TestCachePeople(unittest.TestCase):
+    """The cache's people index follows syncs and local writes."""
+
+    def setUp(self):
+        self.now = time.time()
+        self.cache = EventCache(ttl=60)
+        self.cache.load(self.now, self.now + 14 * 86400, [
+            _event('a', self.now + 3600, 'Case review', [DANA, FOX]),
+            _event('b', self.now + 7200, 'Standup', [FOX]),
+        ], synced_at=self.now)
+
+    def _with(self, person):
+        return [record.id for record in self.cache.with_person(person, self.now, self.now + 14 * 86400)]
+
+    def test_index_is_updated_by_delta_syncs(self):
+        """Attendees added or removed, and cancelled events, are reflected."""
+        self.assertEqual(self._with('dana'), ['a'])
+
+        self.cache.merge([
+            _event('b', self.now + 7200, 'Standup', [FOX, DANA]),
+            {'id': 'a', 'status': 'cancelled'},
+        ], synced_at=self.now)
+
+        self.assertEqual(self._with('dana'), ['b'])
+        self.assertEqual(self._with('fox@example.com'), ['b'])
+
+    def test_engine_answers_from_the_index(self):
+        """find_events_with needs no API search within the cached window."""
+        engine = CalendarEngine()
+        engine._service = Mock()
+        engine._cache.load(self.now, self.now + 15 * 86400, [
+            _event('a', self.now + 3600, 'Case review', [DANA, FOX]),
+            _event('b', self.now + 7200, 'Standup', [FOX]),
+        ], synced_at=time.time())
+
+        result = engine.find_events_with('Dana Scully')
+
+        self.assertIn("Events with 'Dana Scully'", result)
+        self.assertIn("Case review", result)
+        self.assertIn("dana.scully@example.com, fox@example.com", result)
+        self.assertNotIn("Standup", result)
+        engine._service.events().list.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
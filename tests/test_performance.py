@@ -0,0 +1,191 @@
+"""Performance regression tests for the calendar's hot paths.
+
+Each test runs an operation over a synthetic calendar (thousands of events,
+recurring series, long descriptions) and fails if it takes longer, or
+allocates more at its peak, than a budget set at several times its cost
+when written. Budgets catch order-of-magnitude regressions, not noise: no
+time budget is below 0.1 s, since a scheduler stall or a garbage collection
+can cost tens of milliseconds. Set ``GOOSE_CALENDAR_PERF_SCALE`` (e.g. ``3``)
+to loosen them on slow machines.
+"""
+
+import asyncio
+import os
+import time
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from benchmarks.fake_calendar_api import synthetic_events
+from src.goose_calendar import mcp_server
+from src.goose_calendar.engine import CalendarEngine, format_event_list, parse_time
+from src.goose_calendar.records import event_records
+
+try:
+    from src.goose_calendar.toolkit import CalendarToolkit
+except ImportError:  # goose is not installed
+    CalendarToolkit = None
+
+SCALE = float(os.environ.get('GOOSE_CALENDAR_PERF_SCALE', '1'))
+
+# Times in seconds and peak allocations in bytes
+KIB, MIB = 1024, 1024 * 1024
+
+
+def synthetic_calendar(count: int = 3000, series: int = 20, occurrences: int = 10):
+    """``count`` one-off events plus ``series`` recurring series of
+    ``occurrences`` instances with long descriptions, all within the next
+    14 days."""
+    events = synthetic_events(count, days=14)
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    description = "Agenda and notes. " * 250  # About 4.5 KB
+    for number in range(series):
+        for occurrence in range(occurrences):
+            begin = start + timedelta(days=occurrence * 14 / occurrences, hours=number % 8)
+            events.append({
+                'id': f"series{number:03d}_{occurrence:03d}",
+                'recurringEventId': f"series{number:03d}",
+                'summary': f"Weekly sync {number}",
+                'description': description,
+                'start': {'dateTime': begin.isoformat(), 'timeZone': 'UTC'},
+                'end': {'dateTime': (begin + timedelta(minutes=30)).isoformat(), 'timeZone': 'UTC'},
+                'attendees': [{'email': f"person{index}@example.com"} for index in range(8)],
+            })
+    return events
+
+
+def cached_engine(events) -> CalendarEngine:
+    """An engine whose event cache holds ``events`` and whose API is a Mock."""
+    engine = CalendarEngine()
+    engine._service = Mock()
+    engine._service.events().list().execute.return_value = {'items': []}
+    engine._service.events().insert().execute.side_effect = lambda **kwargs: {
+        'id': 'created', 'summary': 'Created',
+        'start': {'dateTime': '2030-01-15T10:00:00Z'}, 'end': {'dateTime': '2030-01-15T11:00:00Z'}}
+    now = time.time()
+    engine._cache.load(now - 3600, now + 15 * 86400, events, synced_at=now)
+    return engine
+
+
+class BudgetAssertions:
+    """Time and peak-allocation budgets for a callable."""
+
+    def assertWithinBudget(self, operation, seconds: float, peak_bytes: int, repeat: int = 5):
+        """Best-of-``repeat`` time and the peak traced allocation of one run."""
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            operation()
+            best = min(best, time.perf_counter() - started)
+        tracemalloc.start()
+        try:
+            operation()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLessEqual(best, seconds * SCALE,
+                             f"took {best * 1000:.1f} ms, budget {seconds * 1000:.0f} ms")
+        self.assertLessEqual(peak, peak_bytes * SCALE,
+                             f"peaked at {peak / KIB:.0f} KiB, budget {peak_bytes / KIB:.0f} KiB")
+
+
+class TestEnginePerformance(BudgetAssertions, unittest.TestCase):
+    """Budgets for the engine functions behind every tool."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.events = synthetic_calendar()
+        cls.records = event_records({'items': cls.events})
+
+    def test_decoding_api_events(self):
+        """Parsing event times while decoding a large listing."""
+        self.assertWithinBudget(lambda: event_records({'items': self.events}), 0.75, 4 * MIB)
+
+    def test_formatting_a_long_list(self):
+        """Rendering 2500 events, the API's page size."""
+        self.assertWithinBudget(lambda: format_event_list(self.records[:2500], 14), 0.2, 4 * MIB)
+
+    def test_parsing_tool_times(self):
+        """Parsing the time formats users pass to add_event and shift_events."""
+        texts = ['2030-01-15 10:00', 'Jan 5 2031 4:30 PM', '2030-03-08T12:00:00-05:00',
+                 'March 8, 2030 9am', 'Friday 3pm']
+        self.assertWithinBudget(lambda: [parse_time(texts[i % 5], 'time') for i in range(500)],
+                                0.3, 256 * KIB)
+
+
+class FrontendBudgets(BudgetAssertions):
+    """Tool-level budgets, run against each front end by the subclasses."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.events = synthetic_calendar()
+
+    def setUp(self):
+        self.engine = cached_engine(self.events)
+
+    def call(self, tool: str, **kwargs) -> str:
+        raise NotImplementedError
+
+    def test_list_events_renders_long_windows(self):
+        """Listing (and so formatting) windows not seen before."""
+        sizes = iter(range(100, 100000))
+
+        def list_new_window():
+            return self.call('list_events', days_ahead=7, max_results=next(sizes) % 50 + 200)
+        self.assertWithinBudget(list_new_window, 0.2, 1 * MIB)
+
+    def test_repeated_list_events(self):
+        """A hot agenda window is a lookup."""
+        self.call('list_events', days_ahead=7, max_results=10)
+        self.assertWithinBudget(lambda: [self.call('list_events') for _ in range(20)], 0.2, 256 * KIB)
+
+    def test_event_lookup_by_query(self):
+        """delete_event resolves its query with one search."""
+        self.assertWithinBudget(lambda: self.call('delete_event', event_query="quarterly offsite"),
+                                0.1, 256 * KIB)
+
+    def test_find_events_with_uses_the_people_index(self):
+        """find_events_with looks people up in the cache, not by scanning it."""
+        def look_up_people():
+            for person in ["kim@example.com", "Dana", "person3"] * 10:
+                self.call('find_events_with', person=person)
+        self.assertWithinBudget(look_up_people, 0.1, 256 * KIB)
+
+    def test_add_event_parses_times(self):
+        """add_event parses start and end times."""
+        self.assertWithinBudget(lambda: self.call('add_event', title="Review",
+                                                  start_time='March 8, 2030 9am',
+                                                  end_time='March 8, 2030 10:30am'),
+                                0.1, 256 * KIB)
+
+
+class TestMcpServerPerformance(FrontendBudgets, unittest.TestCase):
+    """Budgets through the MCP server's async tools."""
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        engines = patch.object(mcp_server.engines, 'get', return_value=self.engine)
+        engines.start()
+        self.addCleanup(engines.stop)
+
+    def call(self, tool: str, **kwargs) -> str:
+        return self.loop.run_until_complete(getattr(mcp_server, tool)(**kwargs))
+
+
+@unittest.skipIf(CalendarToolkit is None, "goose is not installed")
+class TestToolkitPerformance(FrontendBudgets, unittest.TestCase):
+    """Budgets through CalendarToolkit."""
+
+    def setUp(self):
+        super().setUp()
+        self.toolkit = CalendarToolkit(engine=self.engine)
+
+    def call(self, tool: str, **kwargs) -> str:
+        return getattr(self.toolkit, tool)(**kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
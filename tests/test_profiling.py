@@ -0,0 +1,98 @@
+"""Tests for per-tool profiling."""
+
+import asyncio
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import Mock, patch
+
+from mcp.shared.exceptions import McpError
+
+from src.goose_calendar import mcp_server, profiling
+
+
+def _work():
+    return sorted(str(number) for number in range(20000))
+
+
+class TestProfiled(unittest.TestCase):
+    """Test cases for profiling.profiled."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(profiling.configure, profiling.Settings())
+
+    def _files(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_selected_tool_writes_profile_snapshot_and_summary(self):
+        """A profiled call leaves readable cProfile and tracemalloc files."""
+        profiling.configure(profiling.Settings(self.directory, frozenset({'list_events'})))
+
+        with profiling.profiled('list_events'):
+            _work()
+        with profiling.profiled('add_event'):
+            _work()
+
+        files = self._files()
+        self.assertEqual([os.path.splitext(name)[1] for name in files], ['.prof', '.tracemalloc', '.txt'])
+        self.assertTrue(all('-list_events-' in name for name in files))
+        stats = pstats.Stats(os.path.join(self.directory, files[0]))
+        self.assertTrue(any(function[2] == '_work' for function in stats.stats))
+        tracemalloc.Snapshot.load(os.path.join(self.directory, files[1]))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_fast_calls_and_disabled_profiling_write_nothing(self):
+        """Calls under the minimum duration, or with profiling off, leave no files."""
+        profiling.configure(profiling.Settings(self.directory, min_seconds=60))
+        with profiling.profiled('list_events'):
+            _work()
+        profiling.configure(profiling.Settings())
+        with profiling.profiled('list_events'):
+            _work()
+
+        self.assertEqual(self._files(), [])
+
+    def test_admin_tool_profiles_mcp_calls(self):
+        """calendar_profiling turns on profiling for later tool calls."""
+        engine = Mock()
+        engine.list_events.side_effect = lambda *args: _work() and "events"
+        with patch.object(mcp_server.engines, 'get', return_value=engine), \
+                patch.dict(os.environ, {'GOOSE_CALENDAR_PROFILE_DIR': self.directory}):
+            status = mcp_server.calendar_profiling(tools='list_events')
+            asyncio.run(mcp_server.list_events())
+
+        self.assertIn(f"Profiling list_events into {os.path.realpath(self.directory)}", status)
+        self.assertEqual(len(self._files()), 3)
+        self.assertEqual(mcp_server.calendar_profiling(enabled=False), "Profiling is off.")
+
+    def test_admin_tool_is_opt_in_and_confined_to_the_profile_directory(self):
+        """The tool is not offered by default and writes only under GOOSE_CALENDAR_PROFILE_DIR."""
+        tools = asyncio.run(mcp_server.mcp.list_tools())
+        self.assertNotIn('calendar_profiling', [tool.name for tool in tools])
+
+        with patch.dict(os.environ, {'GOOSE_CALENDAR_PROFILE_DIR': self.directory}):
+            status = mcp_server.calendar_profiling(directory='nightly')
+            for escape in ('..', '/tmp', '../elsewhere'):
+                with self.assertRaises(McpError):
+                    mcp_server.calendar_profiling(directory=escape)
+
+        self.assertIn(os.path.join(os.path.realpath(self.directory), 'nightly'), status)
+
+    def test_admin_tool_only_accepts_profiled_tools(self):
+        """Tool names are checked against the tools that are profiled, not engine methods."""
+        tools = {tool.name for tool in asyncio.run(mcp_server.mcp.list_tools())}
+        self.assertEqual(tools - {'calendar_metrics'}, mcp_server.PROFILED_TOOLS)
+
+        with patch.dict(os.environ, {'GOOSE_CALENDAR_PROFILE_DIR': self.directory}):
+            for name in ('warm_up', 'prefetch', 'close', 'calendar_metrics'):
+                with self.assertRaisesRegex(McpError, f"Unknown tools: {name}"):
+                    mcp_server.calendar_profiling(tools=name)
+            status = mcp_server.calendar_profiling(tools='export_ics, list_events')
+
+        self.assertIn("Profiling export_ics, list_events", status)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for compact event records."""
+
+import json
+import tracemalloc
+import unittest
+
+from benchmarks.fake_calendar_api import synthetic_events
+from src.goose_calendar.records import EventRecord, event_records
+
+EVENT = {
+    'id': 'e1', 'etag': '"3"', 'summary': 'Design review',
+    'start': {'dateTime': '2025-07-03T09:00:00-04:00', 'timeZone': 'America/New_York'},
+    'end': {'dateTime': '2025-07-03T10:30:00-04:00', 'timeZone': 'America/New_York'},
+    'organizer': {'email': 'Sam@Example.com', 'displayName': 'Sam Lee'},
+    'attendees': [{'email': 'kim@example.com'}, {'email': 'alex@example.com'}],
+}
+
+
+class TestEventRecord(unittest.TestCase):
+    """Test cases for EventRecord."""
+
+    def test_from_api_parses_times_once(self):
+        """Start and end become integer epoch seconds; the offset is kept for display."""
+        record = EventRecord.from_api(EVENT)
+
+        self.assertEqual(record.start, 1751547600)
+        self.assertEqual(record.end - record.start, 5400)
+        self.assertIsInstance(record.start, int)
+        self.assertEqual(record.start_text(), '2025-07-03T09:00:00-04:00')
+        self.assertEqual(record.local_start().hour, 9)
+        self.assertFalse(record.all_day)
+
+    def test_all_day_and_utc_events(self):
+        """All-day events keep their date; UTC times are written with Z."""
+        all_day = EventRecord.from_api({'start': {'date': '2025-07-04'}, 'end': {'date': '2025-07-05'}})
+        utc = EventRecord.from_api({'start': {'dateTime': '2025-07-04T12:00:00Z'}})
+
+        self.assertTrue(all_day.all_day)
+        self.assertEqual(all_day.start_text(), '2025-07-04')
+        self.assertEqual(utc.start_text(), '2025-07-04T12:00:00Z')
+        self.assertEqual(utc.end, utc.start)
+
+    def test_repeated_strings_are_shared(self):
+        """Calendar IDs, time zones and attendee addresses are interned."""
+        first, second = event_records({'items': [EVENT, dict(EVENT, id='e2')]},
+                                      calendar='team@example.com')
+
+        self.assertIs(first.calendar, second.calendar)
+        self.assertIs(first.time_zone, second.time_zone)
+        self.assertIs(first.attendees[0], second.attendees[0])
+        self.assertEqual(first.organizer, 'sam@example.com')
+
+    def test_matches_text_and_people(self):
+        """Every term must appear in the event's text, attendees or names."""
+        record = EventRecord.from_api(EVENT)
+
+        self.assertTrue(record.matches(['design', 'kim@']))
+        self.assertTrue(record.matches(['sam', 'lee']))
+        self.assertFalse(record.matches(['design', 'dana']))
+
+    def test_records_are_smaller_than_api_dicts(self):
+        """A listing held as records takes well under half the memory of the dicts."""
+        body = json.dumps({'items': synthetic_events(2000)})
+
+        tracemalloc.start()
+        try:
+            events = json.loads(body)['items']
+            as_dicts = tracemalloc.get_traced_memory()[0]
+            records = event_records(json.loads(body))
+            as_records = tracemalloc.get_traced_memory()[0] - as_dicts
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(records), len(events))
+        self.assertLess(as_records, as_dicts / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Tests for event cache snapshots."""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from benchmarks.fake_calendar_api import FakeCalendarServer, synthetic_events
+from src.goose_calendar import snapshot
+from src.goose_calendar.cache import EventCache
+from src.goose_calendar.engine import CalendarEngine
+from src.goose_calendar.records import EventRecord
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test cases for writing and mapping snapshots."""
+
+    def setUp(self):
+        """Save a snapshot of 200 synthetic events."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'token.snapshot')
+        self.records = [EventRecord.from_api(event) for event in synthetic_events(200, days=14)]
+        self.now = time.time()
+        snapshot.save(self.path, (self.now, self.now + 14 * 86400), self.now, self.records)
+
+    def test_reads_match_the_saved_events(self):
+        """Range, ID and next-start lookups agree with the records saved."""
+        saved = snapshot.load(self.path)
+        start, end = self.now + 86400, self.now + 3 * 86400
+        expected = sorted((r for r in self.records if r.end > start and r.start < end),
+                          key=lambda r: r.start)
+
+        self.assertEqual(len(saved), 200)
+        self.assertEqual(saved.synced_at, self.now)
+        self.assertEqual([r.id for r in saved.between(start, end)], [r.id for r in expected])
+        self.assertEqual(len(saved.between(start, end, 5)), 5)
+        self.assertEqual(saved.get('syn0000042').summary, self.records[42].summary)
+        self.assertEqual(saved.get('syn0000042').attendees, self.records[42].attendees)
+        self.assertIsNone(saved.get('missing'))
+        self.assertEqual(saved.next_start(start), min(r.start for r in self.records if r.start >= start))
+
+    def test_other_versions_and_partial_files_are_ignored(self):
+        """A snapshot from another format version or cut short is not used."""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(data[:-10])
+        self.assertIsNone(snapshot.load(self.path))
+
+        with patch.object(snapshot, 'VERSION', snapshot.VERSION + 1):
+            snapshot.save(self.path, (0, 1), 0, self.records)
+        self.assertIsNone(snapshot.load(self.path))
+        self.assertIsNone(snapshot.load(os.path.join(self.directory.name, 'missing')))
+
+    def test_cache_applies_deltas_without_decoding_the_snapshot(self):
+        """Changes are layered over an attached snapshot."""
+        cache = EventCache()
+        cache.attach(snapshot.load(self.path))
+        first = cache.between(self.now, self.now + 14 * 86400, 2)
+
+        with patch.object(snapshot.Snapshot, 'records', side_effect=AssertionError("decoded")):
+            cache.merge([{'id': first[0].id, 'status': 'cancelled'},
+                         {'id': 'new', 'summary': 'Added', 'start': {'dateTime': '2100-01-01T00:00:00Z'},
+                          'end': {'dateTime': '2100-01-01T01:00:00Z'}}],
+                        synced_at=time.time())
+            head = cache.between(self.now, self.now + 14 * 86400, 2)
+
+        self.assertEqual(head[0].id, first[1].id)
+        self.assertIsNone(cache.get(first[0].id))
+        self.assertEqual(len(cache), 200 - 1)  # The new event is outside the window
+        self.assertNotIn(first[0].id, [r.id for r in cache.records()])
+
+
+class TestEngineSnapshot(unittest.TestCase):
+    """A restarted engine starts from the snapshot and syncs only changes."""
+
+    def test_restart_serves_the_snapshot_then_syncs_deltas(self):
+        """The second engine lists from the snapshot and merges one change."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        server = FakeCalendarServer(synthetic_events(300, days=14)).start()
+        self.addCleanup(server.stop)
+        token = os.path.join(directory.name, 'token.pickle')
+        env = {'GOOSE_CALENDAR_API_ROOT': server.url, 'GOOSE_CALENDAR_SNAPSHOT': '1'}
+        with patch.dict(os.environ, env):
+            first = CalendarEngine(token_file=token)
+            first.prefetch()
+            first._snapshot_writer.join()
+
+            second = CalendarEngine(token_file=token)
+            # Only the background rewrite of the snapshot decodes every event
+            with patch.object(snapshot.Snapshot, 'records', side_effect=AssertionError("decoded")), \
+                    patch.object(second, '_save_snapshot_in_background'):
+                self.assertEqual(second.list_events(7, 10), first.list_events(7, 10))
+                event = second._cache.between(time.time(), time.time() + 7 * 86400, 1)[0]
+                server.store.update('primary', event.id, {'summary': 'Renamed'}, None, merge=True)
+                second._sync()
+
+            self.assertIn("Renamed", second.list_events(7, 10))
+            self.assertEqual(len(second._cache), len(first._cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,20 +12,20 @@ class TestCalendarToolkit(unittest.TestCase):
         """Set up test fixtures."""
         self.toolkit = CalendarToolkit()
 
-    @patch('src.goose_calendar.toolkit.build')
-    @patch('src.goose_calendar.toolkit.Credentials')
+    @patch('src.goose_calendar.engine.build')
+    @patch('src.goose_calendar.engine.Credentials')
     def test_get_service(self, mock_creds, mock_build):
         """Test service initialization."""
         mock_service = Mock()
         mock_build.return_value = mock_service
         
-        with patch.object(self.toolkit, '_get_credentials', return_value=mock_creds):
-            service = self.toolkit._get_service()
+        with patch.object(self.toolkit._engine, '_get_credentials', return_value=mock_creds):
+            service = self.toolkit._engine._get_service()
             
         self.assertEqual(service, mock_service)
         mock_build.assert_called_once_with('calendar', 'v3', credentials=mock_creds)
 
-    @patch('src.goose_calendar.toolkit.CalendarToolkit._get_service')
+    @patch('src.goose_calendar.engine.CalendarEngine._get_service')
     def test_list_events_no_events(self, mock_get_service):
         """Test listing events when no events exist."""
         mock_service = Mock()
@@ -37,7 +37,7 @@ class TestCalendarToolkit(unittest.TestCase):
         
         self.assertIn("No upcoming events found", result)
 
-    @patch('src.goose_calendar.toolkit.CalendarToolkit._get_service')
+    @patch('src.goose_calendar.engine.CalendarEngine._get_service')
     def test_add_event_success(self, mock_get_service):
         """Test successful event creation."""
         mock_service = Mock()
@@ -0,0 +1,90 @@
+"""Tests for calendar tracing."""
+
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+
+from src.goose_calendar import mcp_server, tracing
+
+
+class _MemoryExporter(tracing.Exporter):
+    """Collect exported traces in memory."""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for spans and exporters."""
+
+    def setUp(self):
+        """Route spans to an in-memory exporter."""
+        self.exporter = _MemoryExporter()
+        tracing.configure([self.exporter])
+
+    def tearDown(self):
+        """Disable tracing again."""
+        tracing.configure([])
+
+    def test_disabled_tracing_yields_none(self):
+        """Without exporters spans are no-ops."""
+        tracing.configure([])
+        with tracing.span('noop') as span:
+            self.assertIsNone(span)
+
+    def test_nested_spans_export_as_one_trace(self):
+        """Children share the root's trace id and are exported with it."""
+        with tracing.span('root') as root:
+            with tracing.span('child') as child:
+                pass
+
+        self.assertEqual(len(self.exporter.traces), 1)
+        names = [span.name for span in self.exporter.traces[0]]
+        self.assertEqual(names, ['child', 'root'])
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_id, root.span_id)
+
+    def test_errors_are_recorded(self):
+        """An exception escaping a span marks it as failed."""
+        with self.assertRaises(ValueError):
+            with tracing.span('failing'):
+                raise ValueError("bad")
+
+        self.assertEqual(self.exporter.traces[0][0].error, "ValueError: bad")
+
+    @patch.object(mcp_server.calendar_manager, '_get_service')
+    def test_tool_invocation_traces_api_and_format(self, mock_get_service):
+        """A tool call produces a root span with cache, API and format children."""
+        mcp_server.calendar_manager._cache.clear()
+        mock_service = Mock()
+        mock_service.events().list().execute.return_value = {'items': [
+            {'id': 'a', 'summary': 'Standup', 'start': {'dateTime': '2025-07-03T09:00:00-04:00'}},
+        ]}
+        mock_get_service.return_value = mock_service
+
+        asyncio.run(mcp_server.list_events(days_ahead=3, max_results=5))
+
+        spans = self.exporter.traces[-1]
+        self.assertEqual(spans[-1].name, 'tool.list_events')
+        self.assertEqual({span.name for span in spans[:-1]},
+                         {'cache.load', 'api.events.list', 'format'})
+
+    def test_otlp_encoding(self):
+        """Spans are encoded in the OTLP JSON structure."""
+        with tracing.span('root', events=3):
+            pass
+        exporter = tracing.OtlpHttpExporter.__new__(tracing.OtlpHttpExporter)
+        exporter.service_name = 'test'
+
+        encoded = exporter.encode(self.exporter.traces[0])
+
+        span = encoded['resourceSpans'][0]['scopeSpans'][0]['spans'][0]
+        self.assertEqual(span['name'], 'root')
+        self.assertEqual(span['attributes'], [{'key': 'events', 'value': {'intValue': '3'}}])
+
+
+if __name__ == '__main__':
+    unittest.main()
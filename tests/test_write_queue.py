@@ -0,0 +1,177 @@
+"""Tests for the write-behind queue."""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from benchmarks.fake_calendar_api import FakeCalendarServer
+from src.goose_calendar.engine import CalendarEngine, CalendarError
+from src.goose_calendar.write_queue import Journal, JournalInUseError, WriteQueue, _coalesce
+
+
+class TestCoalesce(unittest.TestCase):
+    """Test cases for merging queued writes."""
+
+    def test_writes_to_one_event_are_merged(self):
+        """Inserts absorb later edits, edits merge, and insert+delete cancel out."""
+        writes = [
+            {'seq': 1, 'operation': 'insert', 'event_id': 'a', 'body': {'summary': 'A'}},
+            {'seq': 2, 'operation': 'patch', 'event_id': 'b', 'body': {'summary': 'B'}, 'etag': '"1"'},
+            {'seq': 3, 'operation': 'patch', 'event_id': 'a', 'body': {'location': 'Here'}},
+            {'seq': 4, 'operation': 'patch', 'event_id': 'b', 'body': {'location': 'There'}},
+            {'seq': 5, 'operation': 'insert', 'event_id': 'c', 'body': {'summary': 'C'}},
+            {'seq': 6, 'operation': 'delete', 'event_id': 'c', 'body': None},
+        ]
+
+        a, b, c = _coalesce(writes)
+
+        self.assertEqual((a['operation'], a['body'], a['seqs']),
+                         ('insert', {'summary': 'A', 'location': 'Here'}, [1, 3]))
+        self.assertEqual((b['operation'], b['body'], b['etag']),
+                         ('patch', {'summary': 'B', 'location': 'There'}, '"1"'))
+        self.assertIsNone(c['operation'])
+        self.assertEqual(c['seqs'], [5, 6])
+
+
+TOMORROW = (datetime.now() + timedelta(days=1)).replace(microsecond=0).isoformat()
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Write-behind mode against the offline Calendar API."""
+
+    def setUp(self):
+        """Start a fake Calendar API and a write-behind engine with its own journal."""
+        self.server = FakeCalendarServer().start()
+        self.addCleanup(self.server.stop)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        env = patch.dict(os.environ, {'GOOSE_CALENDAR_API_ROOT': self.server.url,
+                                      'GOOSE_CALENDAR_WRITE_BEHIND': '1'})
+        env.start()
+        self.addCleanup(env.stop)
+        self.engine = CalendarEngine(token_file=os.path.join(self.directory.name, 'token.pickle'))
+        self.engine.prefetch()
+
+    def _server_events(self):
+        return self.server.store.list('primary', {})[1]['items']
+
+    def test_writes_apply_locally_then_flush_as_one_batch(self):
+        """Writes are visible immediately and reach Google coalesced."""
+        created = self.engine.add_event("Review", TOMORROW)
+        self.engine.edit_event("Review", new_location="Room 4")
+
+        self.assertIn("saving to Google in the background", created)
+        self.assertIn("⏳ ", self.engine.write_status())
+        self.assertEqual(self.engine._match_one("review")[0].location, "Room 4")
+
+        self.assertTrue(self.engine._writes.wait())
+        events = self._server_events()
+        self.assertEqual([(e['summary'], e['location']) for e in events], [("Review", "Room 4")])
+        self.assertEqual(self.server.store.batches, 1)
+        self.assertTrue(created.split("Event ID: ")[1].startswith(events[0]['id']))
+        self.assertIn("All changes are saved", self.engine.write_status())
+
+    def test_pending_writes_survive_a_restart(self):
+        """Writes journaled by a stopped process are sent by the next one."""
+        journal = os.path.join(self.directory.name, 'restart.journal')
+        Journal(journal).append({'seq': 1, 'operation': 'insert', 'event_id': 'abc123def',
+                                 'etag': None, 'queued_at': 0, 'body': {
+                                     'id': 'abc123def', 'summary': 'Offline plan',
+                                     'start': {'date': '2030-01-02'}, 'end': {'date': '2030-01-03'}}})
+
+        queue = WriteQueue(self.engine, journal, flush_delay=0)
+
+        self.assertTrue(queue.wait())
+        self.assertEqual([e['id'] for e in self._server_events()], ['abc123def'])
+        self.assertEqual(Journal(journal).replay(), [])
+        # A crash before the completion was journaled resends; the ID prevents a duplicate
+        queue._flush([{'seq': 2, 'operation': 'insert', 'event_id': 'abc123def', 'etag': None,
+                       'body': {'id': 'abc123def', 'summary': 'Offline plan',
+                                'start': {'date': '2030-01-02'}, 'end': {'date': '2030-01-03'}}}])
+        self.assertEqual(len(self._server_events()), 1)
+
+    def test_journal_in_use_turns_write_behind_off(self):
+        """A second process cannot share a journal; its writes go straight to Google."""
+        token = os.path.join(self.directory.name, 'other.pickle')
+        # Journal locks are per open file, so this stands in for another process
+        other = Journal(os.path.join(self.directory.name, 'other.journal'))
+        other.lock()
+        with self.assertRaises(JournalInUseError):
+            WriteQueue(self.engine, os.path.join(self.directory.name, 'other.journal'))
+
+        with patch('sys.stderr'):
+            engine = CalendarEngine(token_file=token)
+        result = engine.add_event("Direct", TOMORROW)
+
+        self.assertIsNone(engine._writes)
+        self.assertNotIn("background", result)
+        self.assertEqual([e['summary'] for e in self._server_events()], ["Direct"])
+        self.assertIn("Another goose-calendar process is using the write-behind journal",
+                      engine.write_status())
+
+    def test_bulk_writes_send_queued_writes_first(self):
+        """A shift sees a queued insert and edit on Google instead of racing them."""
+        self.engine._writes.flush_delay = 1.0
+        self.addCleanup(setattr, self.engine._writes, 'flush_delay', 0.2)
+        self.engine.add_event("Planning", TOMORROW)
+        self.engine.edit_event("Planning", new_location="Room 2")
+
+        result = self.engine.shift_events(TOMORROW[:10], days=1)
+
+        self.assertIn("Moved 1 events", result)
+        event, = self._server_events()
+        self.assertEqual(event['location'], "Room 2")
+        self.assertTrue(event['start']['dateTime'].startswith(
+            (datetime.fromisoformat(TOMORROW) + timedelta(days=1)).date().isoformat()))
+        self.assertEqual(self.engine._writes.pending(), 0)
+        self.assertNotIn("rejected", self.engine.write_status())
+
+    def test_bulk_write_refused_while_writes_cannot_be_sent(self):
+        """If queued writes do not reach Google in time, the bulk write is not attempted."""
+        self.engine._writes.flush_delay = 60
+        self.addCleanup(setattr, self.engine._writes, 'flush_delay', 0.2)
+        self.engine.add_event("Planning", TOMORROW)
+
+        with patch('src.goose_calendar.engine.PENDING_WRITES_WAIT_SECONDS', 0.1), \
+                self.assertRaisesRegex(CalendarError, "1 changes are still waiting"):
+            self.engine.find_duplicates(delete=True)
+
+    def test_queued_insert_of_a_deleted_events_id_is_rejected(self):
+        """A 409 for an ID a deleted event had is a failure, not an earlier attempt."""
+        body = {'id': 'gone00001', 'summary': 'Old', 'start': {'date': '2030-01-02'},
+                'end': {'date': '2030-01-03'}}
+        self.server.store.insert('primary', dict(body))
+        self.server.store.delete('primary', 'gone00001', None)
+
+        self.engine._writes.submit('insert', 'gone00001', dict(body, summary='New'))
+        self.engine._cache.apply(dict(body, summary='New'))
+        self.engine._writes.wait()
+
+        status = self.engine.write_status()
+        self.assertIn("insert of 'New' failed: its ID belonged to an event that was deleted", status)
+        self.assertIsNone(self.engine._cache.get('gone00001'))
+
+    def test_rejected_write_is_reported_and_cache_restored(self):
+        """An edit that loses an ETag race is listed by the status tool."""
+        self.engine.add_event("Standup", TOMORROW)
+        self.engine._writes.wait()
+        self.engine.prefetch()
+        event_id = self._server_events()[0]['id']
+        self.engine._writes.flush_delay = 1.0
+        self.addCleanup(setattr, self.engine._writes, 'flush_delay', 0.2)
+
+        self.engine.edit_event("Standup", new_location="Cafe")
+        # Changed on Google after the edit was queued, before it is sent
+        self.server.store.update('primary', event_id, {'summary': 'Standup (moved)'}, None, merge=True)
+        self.engine._writes.wait()
+
+        status = self.engine.write_status()
+        self.assertIn("1 writes were rejected", status)
+        self.assertIn("changed elsewhere", status)
+        self.assertEqual(self.engine._cache.get(event_id).summary, 'Standup (moved)')
+
+
+if __name__ == '__main__':
+    unittest.main()